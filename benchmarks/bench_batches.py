@@ -0,0 +1,156 @@
+"""
+Throughput of `/v1/batches` through the full gateway stack against benchmarks.mock_upstream.
+
+For each batch size, uploads a generated JSONL batch (streamed, so the client stays small too), reads
+the NDJSON results and reports items per second, time to the first result, item status counts and
+the gateway's resident memory (sampled from its /metrics while the batch runs), which should stay flat
+as the batch grows. `--per-request` also sends the same items as one /v1/chat/completions call each,
+`--concurrency` at a time, for comparison.
+
+Stack options are those of benchmarks.load_test; `--start-stack` drops tenant rate limits unless --keep-rate-limits.
+
+    python -m benchmarks.bench_batches --start-stack [--sizes 100 1000 10000] [--per-request]
+        [--mock-args "--latency-ms 80"]
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import orjson
+
+from benchmarks.load_test import start_stack
+
+RSS_PATTERN = re.compile(rb"^process_resident_memory_bytes (\S+)$", re.MULTILINE)
+RSS_SAMPLE_INTERVAL_SECONDS = 0.25
+
+
+def build_item(args: argparse.Namespace, index: int) -> Dict[str, Any]:
+    """
+    Unique prompts, so request coalescing and response caching do not flatter the numbers.
+    """
+    content = f"batch item {index}: " + "x" * args.prompt_chars
+    return {"model": args.model, "messages": [{"role": "user", "content": content}], "max_tokens": args.max_tokens}
+
+
+async def iter_batch(args: argparse.Namespace, run: int, size: int) -> AsyncIterator[bytes]:
+    for index in range(size):
+        yield orjson.dumps({"custom_id": f"{run}-{index}", "body": build_item(args, run * 10_000_000 + index)}, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def get_rss(client: httpx.AsyncClient) -> Optional[float]:
+    try:
+        match = RSS_PATTERN.search((await client.get("/metrics")).content)
+    except httpx.HTTPError:
+        return None
+    return float(match.group(1)) if match else None
+
+
+async def sample_rss(client: httpx.AsyncClient, samples: List[float]) -> None:
+    while True:
+        rss = await get_rss(client)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(RSS_SAMPLE_INTERVAL_SECONDS)
+
+
+async def run_batch(client: httpx.AsyncClient, args: argparse.Namespace, run: int, size: int) -> Dict[str, Any]:
+    status_counts: Dict[str, int] = {}
+    rss_samples: List[float] = []
+    sampler = asyncio.create_task(sample_rss(client, rss_samples))
+    start = time.perf_counter()
+    first_result: Optional[float] = None
+    try:
+        async with client.stream("POST", "/v1/batches", content=iter_batch(args, run, size), headers={"Content-Type": "application/x-ndjson"}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if first_result is None:
+                    first_result = time.perf_counter() - start
+                status = str(orjson.loads(line)["status_code"])
+                status_counts[status] = status_counts.get(status, 0) + 1
+    finally:
+        sampler.cancel()
+    elapsed = time.perf_counter() - start
+    items = sum(status_counts.values())
+    return {
+        "mode": "batch",
+        "items": items,
+        "elapsed_seconds": round(elapsed, 3),
+        "items_per_second": round(status_counts.get("200", 0) / elapsed, 2) if elapsed else 0.0,
+        "first_result_ms": round((first_result or 0.0) * 1000, 1),
+        "status_counts": dict(sorted(status_counts.items())),
+        "peak_rss_mb": round(max(rss_samples) / 1024 / 1024, 1) if rss_samples else None,
+    }
+
+
+async def run_per_request(client: httpx.AsyncClient, args: argparse.Namespace, run: int, size: int) -> Dict[str, Any]:
+    status_counts: Dict[str, int] = {}
+    counter = iter(range(size))
+
+    async def client_loop() -> None:
+        for index in counter:
+            try:
+                status = str((await client.post("/v1/chat/completions", json=build_item(args, run * 10_000_000 + index))).status_code)
+            except httpx.HTTPError:
+                status = "0"
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": "per_request",
+        "items": size,
+        "elapsed_seconds": round(elapsed, 3),
+        "items_per_second": round(status_counts.get("200", 0) / elapsed, 2) if elapsed else 0.0,
+        "status_counts": dict(sorted(status_counts.items())),
+    }
+
+
+async def run_benchmark(url: str, args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + 2, max_keepalive_connections=args.concurrency + 2)
+    headers = {"Authorization": f"Bearer {args.api_key}"}
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=httpx.Timeout(args.timeout, read=None)) as client:
+        print(f"{'mode':>12} {'items':>7} {'seconds':>8} {'items/s':>8} {'first ms':>9} {'peak RSS MB':>12}  statuses")
+        for run, size in enumerate(args.sizes, start=1):
+            results = [await run_batch(client, args, run, size)]
+            if args.per_request:
+                results.append(await run_per_request(client, args, -run, size))
+            for result in results:
+                print(f"{result['mode']:>12} {result['items']:>7} {result['elapsed_seconds']:>8.2f} {result['items_per_second']:>8.1f} {result.get('first_result_ms', '-'):>9} {result.get('peak_rss_mb') or '-':>12}  {result['status_counts']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:6061", help="gateway to benchmark when not using --start-stack")
+    parser.add_argument("--api-key", default="xyz_api_key_for_acme")
+    parser.add_argument("--model", default="gpt-3.5-turbo")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="batch sizes, one batch each")
+    parser.add_argument("--per-request", action="store_true", help="also send every item as its own chat completion")
+    parser.add_argument("--concurrency", type=int, default=32, help="clients of --per-request")
+    parser.add_argument("--prompt-chars", type=int, default=400)
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--start-stack", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="gateway APP_WORKERS with --start-stack")
+    parser.add_argument("--gateway-port", type=int, default=6161)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--mock-args", default="", help="extra benchmarks.mock_upstream arguments with --start-stack")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="run with the tenants' configured rate limits and quotas")
+    parser.add_argument("--verbose", action="store_true", help="show the stack's own output")
+    args = parser.parse_args()
+
+    if args.start_stack:
+        with start_stack(args) as url:
+            asyncio.run(run_benchmark(url, args))
+    else:
+        asyncio.run(run_benchmark(args.url, args))
+
+
+if __name__ == "__main__":
+    main()
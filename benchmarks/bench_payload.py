@@ -0,0 +1,62 @@
+"""
+Request body decoding cost for /v1/chat/completions.
+
+Compares the former double stdlib parse (validate_model_for_tenant and chat_completions
+each calling request.json()) with the single shared orjson parse of get_json_payload.
+
+    python -m benchmarks.bench_payload [--iterations 200]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+import orjson
+
+SIZES = {"1KB": 1024, "100KB": 100 * 1024, "1MB": 1024 * 1024}
+
+
+def build_body(size: int) -> bytes:
+    """
+    Multi-turn chat payload of roughly `size` bytes.
+    """
+    turn = "The quick brown fox jumps over the lazy dog. " * 4
+    messages: List[Dict[str, str]] = []
+    payload: Dict[str, Any] = {"model": "gpt-3.5-turbo", "temperature": 0, "messages": messages}
+    while len(orjson.dumps(payload)) < size:
+        messages.append({"role": "user" if len(messages) % 2 == 0 else "assistant", "content": turn})
+    return orjson.dumps(payload)
+
+
+def parse_twice_stdlib(body: bytes) -> Any:
+    json.loads(body)
+    return json.loads(body)
+
+
+def parse_once_orjson(body: bytes) -> Any:
+    return orjson.loads(body)
+
+
+def measure(func: Callable[[bytes], Any], body: bytes, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(body)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'body':>6} {'bytes':>9} {'2x json us':>11} {'1x orjson us':>13} {'speedup':>8}")
+    for label, size in SIZES.items():
+        body = build_body(size)
+        legacy_us = measure(parse_twice_stdlib, body, args.iterations)
+        orjson_us = measure(parse_once_orjson, body, args.iterations)
+        print(f"{label:>6} {len(body):>9} {legacy_us:>11.1f} {orjson_us:>13.1f} {legacy_us / orjson_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
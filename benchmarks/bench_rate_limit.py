@@ -0,0 +1,32 @@
+"""
+Hot-path cost of the per-tenant rate limiter (request bucket, token bucket and quota checks).
+
+    python -m benchmarks.bench_rate_limit [--iterations 200000]
+"""
+
+import argparse
+import time
+
+from src.helpers.models.pydantic.auth import RateLimits, Tenant
+from src.services.rate_limit import InMemoryCounterBackend, RateLimiter
+
+PAYLOAD = {"model": "gpt-4", "max_tokens": 64, "messages": [{"role": "user", "content": "Classify this sentence as positive or negative."}]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    # limits high enough that nothing is rejected, so every check runs its full path
+    tenant = Tenant(id="bench", api_key="bench", quota=10**12, rate_limits=RateLimits(requests_per_second=10**9, tokens_per_minute=10**12))
+    for label, limiter in (("sharded", RateLimiter(workers=4)), ("shared backend", RateLimiter(workers=4, backend=InMemoryCounterBackend()))):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            limiter.check_request(tenant, PAYLOAD)
+        elapsed_us = (time.perf_counter() - start) / args.iterations * 1_000_000
+        print(f"{label:>15}: {elapsed_us:.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
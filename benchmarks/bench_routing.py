@@ -0,0 +1,117 @@
+"""
+Per-request routing overhead as the models catalog grows.
+
+Compares the compiled RoutingIndex against the former nested catalog scans for the
+lookups route_request performs on every call (policy, primary selection, failover list).
+
+    python -m benchmarks.bench_routing [--sizes 10 100 1000 5000] [--iterations 20000]
+"""
+
+import argparse
+import functools
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.services.route import ModelRouter
+
+PROVIDERS = ["openai", "azure_openai", "anthropic", "google", "xyzcloud", "partnerai"]
+MODELS_PER_SERIES = 50
+
+
+def build_catalog(model_count: int) -> Dict[str, Any]:
+    catalog: Dict[str, Any] = {}
+    for index in range(model_count):
+        series_name = f"series-{index // MODELS_PER_SERIES}"
+        series = catalog.setdefault(series_name, {"id": series_name, "models": []})
+        providers = [PROVIDERS[index % len(PROVIDERS)], PROVIDERS[(index + 1) % len(PROVIDERS)]]
+        series["models"].append({"name": f"model-{index}", "providers": [{"name": name, "base_url": "http://localhost", "prompt_pricing": {"text": 0.001 * (i + 1)}} for i, name in enumerate(providers)]})
+    return catalog
+
+
+def build_policies(catalog: Dict[str, Any], tenant_count: int = 100) -> Dict[str, Any]:
+    policies: Dict[str, Any] = {"global": {"failover_order": PROVIDERS}}
+    for tenant_index in range(tenant_count):
+        policies[f"tenant-{tenant_index}"] = {series_name: {"primary_providers": PROVIDERS[:3], "failover_order": PROVIDERS[::-1]} for series_name in list(catalog)[tenant_index % 3 :: 3]}
+    return policies
+
+
+class LegacyRouter:
+    """
+    The nested scans ModelRouter and RoutingPolicyEngine performed before the routing index.
+    """
+
+    def __init__(self, catalog: Dict[str, Any], policies: Dict[str, Any]):
+        self.catalog = catalog
+        self.policies = policies
+
+    def get_series_by_model_name(self, model_name: str) -> Optional[str]:
+        for series_name, series_info in self.catalog.items():
+            for model in series_info.get("models", []):
+                if model.get("name") == model_name:
+                    return series_name
+        return None
+
+    def get_tenant_policy(self, tenant_id: str, model_name: str) -> Dict:
+        series_name = self.get_series_by_model_name(model_name)
+        if not series_name:
+            return {}
+        tenant_policy = self.policies.get(tenant_id, {})
+        if series_name in tenant_policy:
+            return tenant_policy[series_name]
+        if series_name in self.policies:
+            return self.policies[series_name]
+        return self.policies.get("global", {})
+
+    def get_provider_info(self, model_name: str, provider_name: str) -> Optional[Dict]:
+        for series in self.catalog.values():
+            for model in series.get("models", []):
+                if model.get("name") == model_name:
+                    for provider in model.get("providers", []):
+                        if provider["name"] == provider_name:
+                            return provider
+        return None
+
+
+def route_legacy(router: LegacyRouter, tenant_id: str, model_name: str) -> List[str]:
+    policy = router.get_tenant_policy(tenant_id, model_name)
+    candidates = [name for name in policy.get("primary_providers", []) if router.get_provider_info(model_name, name)]
+    failover = [name for name in router.get_tenant_policy(tenant_id, model_name).get("failover_order", []) if name not in candidates[:1]]
+    return [name for name in candidates[:1] + failover if router.get_provider_info(model_name, name)]
+
+
+def route_indexed(router: ModelRouter, tenant_id: str, model_name: str) -> List[str]:
+    primary = router.select_primary_provider(tenant_id, model_name)
+    failover = router.routing_engine.get_failover_providers(tenant_id, model_name, primary or "")
+    return [name for name in [primary or ""] + failover if router.get_provider_info(model_name, name)]
+
+
+def measure(func: Callable[[str, str], Any], model_count: int, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        # spread lookups over the whole catalog so scans pay their average cost
+        func(f"tenant-{i % 100}", f"model-{(i * 7919) % model_count}")
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'models':>8} {'legacy us/req':>14} {'indexed us/req':>15} {'index build ms':>15}")
+    for model_count in args.sizes:
+        catalog = build_catalog(model_count)
+        policies = build_policies(catalog)
+        build_start = time.perf_counter()
+        router = ModelRouter(models_catalog=catalog, routing_policies=policies)
+        build_ms = (time.perf_counter() - build_start) * 1000
+        legacy = LegacyRouter(catalog, policies)
+        # the scans are O(catalog); cap their iterations so large sizes finish
+        legacy_us = measure(functools.partial(route_legacy, legacy), model_count, max(200, args.iterations * 100 // model_count))
+        indexed_us = measure(functools.partial(route_indexed, router), model_count, args.iterations)
+        print(f"{model_count:>8} {legacy_us:>14.2f} {indexed_us:>15.2f} {build_ms:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Provider scoring and selection cost as the candidate list widens.
+
+Times ScoringEngine.select (cost, latency, error rate and load scoring plus selection)
+for each selection strategy over synthetic candidates.
+
+    python -m benchmarks.bench_scoring [--widths 2 8 32 128 1024] [--iterations 20000]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from src.services.scoring import ProviderCandidate, ScoringSettings, scoring_engine, selection_strategies
+
+
+def build_candidates(width: int) -> List[ProviderCandidate]:
+    rng = random.Random(width)
+    return [
+        ProviderCandidate(
+            name=f"provider-{index}",
+            rank=(rng.random() < 0.05, rng.random() < 0.05, rng.random() < 0.2),
+            cost=rng.uniform(0.0005, 0.05),
+            latency_ms=rng.uniform(50, 2000),
+            error_rate=rng.uniform(0, 0.2),
+            load=rng.randint(0, 50),
+        )
+        for index in range(width)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--widths", type=int, nargs="+", default=[2, 8, 32, 128, 1024])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'width':>6} " + " ".join(f"{selection + ' us':>16}" for selection in selection_strategies))
+    for width in args.widths:
+        candidates = build_candidates(width)
+        iterations = max(10, args.iterations // width)
+        timings = []
+        for selection in selection_strategies:
+            settings = ScoringSettings(selection=selection)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                scoring_engine.select(candidates, settings)
+            timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+        print(f"{width:>6} " + " ".join(f"{timing:>16.2f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
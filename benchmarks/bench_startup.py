@@ -0,0 +1,59 @@
+"""
+Cold-start time of one uvicorn worker.
+
+Every run is a fresh interpreter, as a spawned worker is: it times `import main`
+and then the application lifespan startup (config load, router, tenant index, HTTP pools).
+
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+import orjson
+
+CHILD = """
+import asyncio, time, orjson
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def startup() -> None:
+    async with main.app_server.router.lifespan_context(main.app_server):
+        pass
+
+asyncio.run(startup())
+ready = time.perf_counter()
+print(orjson.dumps({"import_ms": (imported - start) * 1000, "startup_ms": (ready - imported) * 1000}).decode())
+"""
+
+
+def run_worker() -> Tuple[float, float, float]:
+    """
+    (import ms, lifespan startup ms, total ms) of one fresh worker.
+    """
+    result = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, check=True)
+    timings = orjson.loads(result.stdout.strip().splitlines()[-1])
+    return timings["import_ms"], timings["startup_ms"], timings["import_ms"] + timings["startup_ms"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rows: List[Tuple[float, float, float]] = []
+    print(f"{'run':>4} {'import ms':>10} {'startup ms':>11} {'total ms':>9}")
+    for run in range(1, args.runs + 1):
+        row = run_worker()
+        rows.append(row)
+        print(f"{run:>4} {row[0]:>10.1f} {row[1]:>11.1f} {row[2]:>9.1f}")
+    medians = [statistics.median(column) for column in zip(*rows, strict=True)]
+    print(f"{'p50':>4} {medians[0]:>10.1f} {medians[1]:>11.1f} {medians[2]:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Prompt token estimation cost for 1K to 200K-token prompts.
+
+Compares the former `len(str(payload))` usage figure with the per-family heuristic
+estimate and, when `tiktoken` is installed, exact tokenization (which routing runs off
+the event loop above OFFLOAD_THRESHOLD_CHARS).
+
+    python -m benchmarks.bench_tokens [--iterations 20]
+"""
+
+import argparse
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+from src.helpers.utilities.custom.tokens import FAMILY_ENCODINGS, TokenCounter, get_token_counter
+
+SIZES = {"1K": 1_000, "8K": 8_000, "32K": 32_000, "128K": 128_000, "200K": 200_000}
+SENTENCE = "The quick brown fox jumps over the lazy dog. "  # about 10 tokens
+
+
+def build_payload(tokens: int) -> Dict[str, Any]:
+    """
+    Chat payload of roughly `tokens` prompt tokens, split over 20-message turns.
+    """
+    turns = 20
+    content = SENTENCE * max(1, tokens // 10 // turns)
+    messages: List[Dict[str, str]] = [{"role": "user" if i % 2 == 0 else "assistant", "content": content} for i in range(turns)]
+    return {"model": "gpt-4", "max_tokens": 512, "messages": messages}
+
+
+def measure(func: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    heuristic = TokenCounter(None)
+    exact = get_token_counter("gpt") if "gpt" in FAMILY_ENCODINGS else None
+    exact = exact if exact is not None and exact.is_exact else None
+
+    print(f"{'prompt':>6} {'estimate':>9} {'len(str) us':>12} {'heuristic us':>13} {'exact us':>10}")
+    for label, tokens in SIZES.items():
+        payload = build_payload(tokens)
+        legacy_us = measure(partial(str, payload), args.iterations)
+        heuristic_us = measure(partial(heuristic.count_prompt, payload), args.iterations)
+        exact_us = f"{measure(partial(exact.count_prompt, payload), max(1, args.iterations // 10)):>10.1f}" if exact else f"{'n/a':>10}"
+        print(f"{label:>6} {heuristic.count_prompt(payload):>9} {legacy_us:>12.1f} {heuristic_us:>13.1f} {exact_us}")
+
+
+if __name__ == "__main__":
+    main()
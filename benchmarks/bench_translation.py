@@ -0,0 +1,93 @@
+"""
+Per-provider request/response translation cost.
+
+For each adapter, compares the former path (payload splatted into a new dict, encoded by httpx's
+`json=` with the stdlib, upstream body decoded with `response.json()` and re-encoded by ORJSONResponse)
+with the translators (one orjson encode of the provider body, orjson decode of the upstream bytes,
+then the same ORJSONResponse encode). Reports CPU time and peak bytes allocated per request.
+
+    python -m benchmarks.bench_translation [--turns 1 20 200] [--iterations 2000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+import orjson
+
+from benchmarks.mock_upstream import build_anthropic_response, build_gemini_response, build_openai_response
+from src.helpers.adapters.anthropic import AnthropicAdapter
+from src.helpers.adapters.base import BaseProviderAdapter
+from src.helpers.adapters.google import GoogleGeminiAdapter
+from src.helpers.adapters.openai import OpenAIAdapter
+
+SENTENCE = "The quick brown fox jumps over the lazy dog. "
+COMPLETION_WORDS = [f"word{index}" for index in range(256)]
+PROVIDERS: Dict[str, Tuple[type, Callable[..., Dict[str, Any]]]] = {
+    "openai": (OpenAIAdapter, build_openai_response),
+    "anthropic": (AnthropicAdapter, build_anthropic_response),
+    "google": (GoogleGeminiAdapter, build_gemini_response),
+}
+
+
+def build_payload(turns: int) -> Dict[str, Any]:
+    messages: List[Dict[str, str]] = [{"role": "system", "content": "You are terse."}]
+    messages += [{"role": "user" if index % 2 == 0 else "assistant", "content": SENTENCE * 20} for index in range(turns)]
+    return {"model": "bench-model", "messages": messages, "max_tokens": 256, "temperature": 0.2}
+
+
+def legacy_cycle(provider: str, payload: Dict[str, Any], body: bytes) -> bytes:
+    if provider == "openai":
+        data = {"model": "bench-model", **payload}
+    else:
+        data = {"model": "bench-model", "prompt": payload.get("prompt", ""), "max_tokens_to_sample": payload.get("max_tokens", 100), **payload}
+    json.dumps(data, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+    return orjson.dumps(json.loads(body))
+
+
+def translated_cycle(adapter: BaseProviderAdapter, payload: Dict[str, Any], body: bytes) -> bytes:
+    adapter.encode_request("bench-model", payload, False)
+    return orjson.dumps(adapter.decode_response(body, "bench-model"))
+
+
+def measure(cycle: Callable[[], Any], iterations: int) -> Tuple[float, int]:
+    """
+    (CPU microseconds, peak bytes allocated) per request.
+    """
+    start = time.process_time()
+    for _ in range(iterations):
+        cycle()
+    cpu_us = (time.process_time() - start) / iterations * 1_000_000
+    tracemalloc.start()
+    cycle()
+    tracemalloc.reset_peak()
+    cycle()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cpu_us, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[1, 20, 200])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'provider':>9} {'turns':>5} {'body KB':>8} {'legacy us':>10} {'new us':>8} {'legacy peak KB':>15} {'new peak KB':>12}")
+    for provider, (adapter_class, build_response) in PROVIDERS.items():
+        adapter = adapter_class({"name": provider, "base_url": "http://mock", "api_key_internal": "bench"})
+        body = orjson.dumps(build_response("bench-id", "bench-model", COMPLETION_WORDS, 1000))
+        for turns in args.turns:
+            payload = build_payload(turns)
+            iterations = max(10, args.iterations // turns)
+            legacy_us, legacy_peak = measure(partial(legacy_cycle, provider, payload, body), iterations)
+            new_us, new_peak = measure(partial(translated_cycle, adapter, payload, body), iterations)
+            body_kb = len(adapter.encode_request("bench-model", payload, False)) / 1024
+            print(f"{provider:>9} {turns:>5} {body_kb:>8.1f} {legacy_us:>10.1f} {new_us:>8.1f} {legacy_peak / 1024:>15.1f} {new_peak / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Load test of `/v1/chat/completions` through the full gateway stack (auth, rate limiting, routing,
+failover, middleware) against benchmarks.mock_upstream.
+
+With `--start-stack` the mock upstream and a gateway (APP_WORKERS=--workers) are started as
+subprocesses, with UPSTREAM_BASE_URL_OVERRIDE pointing at the mock and, unless --keep-rate-limits,
+a copy of the configs without tenant rate limits and quotas. Otherwise `--url` must be serving.
+
+Prints (and with --output writes) one JSON document: commit, settings, throughput, status counts and
+p50/p95/p99 latency (plus time to first chunk for streams). `--compare` prints the change against an
+earlier result and exits 1 when throughput or p99 regressed by more than --max-regression percent.
+
+    python -m benchmarks.load_test --start-stack [--concurrency 32] [--duration 20] [--stream-ratio 0.2]
+        [--mock-args "--latency-ms 80 --provider-error-rate openai=0.2"] [--output load.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+import orjson
+import yaml
+
+CONFIG_FILES = ("models_catalog.yaml", "tenants.yaml", "routing_policies.yaml")
+READY_TIMEOUT_SECONDS = 60.0
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+@dataclass(slots=True)
+class RequestResult:
+    status: int
+    latency: float
+    ttft: Optional[float]
+    stream: bool
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an ascending sequence.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(fraction * len(sorted_values) + 0.5) - 1))]
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    summary = {name: round(percentile(values, fraction) * 1000, 3) for name, fraction in PERCENTILES.items()}
+    summary["mean"] = round(sum(values) / len(values) * 1000, 3) if values else 0.0
+    summary["max"] = round(values[-1] * 1000, 3) if values else 0.0
+    return summary
+
+
+def get_commit() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+# --------------------------
+# Stack
+# --------------------------
+def write_config_dir(target: str, keep_rate_limits: bool, routing_policies: Optional[str] = None) -> None:
+    for file_name in CONFIG_FILES:
+        shutil.copy(os.path.join("config", file_name), os.path.join(target, file_name))
+    if routing_policies:
+        shutil.copy(routing_policies, os.path.join(target, "routing_policies.yaml"))
+    if keep_rate_limits:
+        return
+    with open(os.path.join(target, "tenants.yaml"), encoding="utf-8") as file:
+        tenants = yaml.safe_load(file)
+    for tenant in tenants.values():
+        tenant.pop("rate_limits", None)
+        tenant["quota"] = 0
+    with open(os.path.join(target, "tenants.yaml"), "w", encoding="utf-8") as file:
+        yaml.safe_dump(tenants, file)
+
+
+def wait_until_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args!r} exited with {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready within {READY_TIMEOUT_SECONDS}s")
+
+
+@contextmanager
+def start_stack(args: argparse.Namespace, env: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """
+    Mock upstream plus gateway subprocesses; yields the gateway URL. `env` is added to the gateway's environment.
+    """
+    processes: List[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="load_test_config_") as config_dir:
+        write_config_dir(config_dir, args.keep_rate_limits, getattr(args, "routing_policies", None))
+        mock_command = [sys.executable, "-m", "benchmarks.mock_upstream", "--port", str(args.mock_port), *shlex.split(args.mock_args)]
+        gateway_env = {
+            **os.environ,
+            "APP_IP": "127.0.0.1",
+            "APP_PORT": str(args.gateway_port),
+            "APP_RELOAD": "False",
+            "APP_WORKERS": str(args.workers),
+            "CONFIG_DIR": config_dir,
+            "UPSTREAM_BASE_URL_OVERRIDE": f"http://127.0.0.1:{args.mock_port}/{{provider}}",
+            **(env or {}),
+        }
+        output = None if args.verbose else subprocess.DEVNULL
+        try:
+            processes.append(subprocess.Popen(mock_command, stdout=output, stderr=output))
+            wait_until_ready(f"http://127.0.0.1:{args.mock_port}/models", processes[-1])
+            processes.append(subprocess.Popen([sys.executable, "main.py"], env=gateway_env, stdout=output, stderr=output))
+            gateway_url = f"http://127.0.0.1:{args.gateway_port}"
+            wait_until_ready(f"{gateway_url}/health/", processes[-1])
+            yield gateway_url
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+# --------------------------
+# Load generation
+# --------------------------
+def build_payload(args: argparse.Namespace, index: int, stream: bool) -> Dict[str, Any]:
+    """
+    Every prompt is unique so request coalescing and response caching do not flatter the numbers.
+    """
+    content = f"load test request {index}: " + "x" * args.prompt_chars
+    return {"model": args.model, "messages": [{"role": "user", "content": content}], "max_tokens": args.max_tokens, "stream": stream}
+
+
+async def send_request(client: httpx.AsyncClient, args: argparse.Namespace, index: int) -> RequestResult:
+    stream = args.stream_ratio > 0 and (index * args.stream_ratio) % 1 + args.stream_ratio >= 1
+    payload = build_payload(args, index, stream)
+    start = time.perf_counter()
+    ttft: Optional[float] = None
+    try:
+        if not stream:
+            response = await client.post("/v1/chat/completions", json=payload)
+            return RequestResult(response.status_code, time.perf_counter() - start, None, False)
+        async with client.stream("POST", "/v1/chat/completions", json=payload) as response:
+            async for _ in response.aiter_raw():
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            return RequestResult(response.status_code, time.perf_counter() - start, ttft, True)
+    except httpx.HTTPError:
+        # status 0: transport failure or client timeout
+        return RequestResult(0, time.perf_counter() - start, ttft, stream)
+
+
+async def generate_load(client: httpx.AsyncClient, args: argparse.Namespace, duration: float, max_requests: int) -> List[RequestResult]:
+    """
+    `concurrency` closed-loop clients, each sending its next request as soon as the previous one completes.
+    """
+    results: List[RequestResult] = []
+    deadline = time.perf_counter() + duration
+    counter = iter(range(max_requests or sys.maxsize))
+
+    async def client_loop() -> None:
+        for index in counter:
+            if time.perf_counter() >= deadline:
+                return
+            results.append(await send_request(client, args, index))
+
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+    return results
+
+
+def summarize(args: argparse.Namespace, results: List[RequestResult], elapsed: float) -> Dict[str, Any]:
+    status_counts: Dict[str, int] = {}
+    for result in results:
+        status_counts[str(result.status)] = status_counts.get(str(result.status), 0) + 1
+    succeeded = [result for result in results if 200 <= result.status < 300]
+    streamed = [result for result in succeeded if result.stream and result.ttft is not None]
+    return {
+        **get_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "settings": {"model": args.model, "concurrency": args.concurrency, "duration": args.duration, "requests": args.requests, "stream_ratio": args.stream_ratio, "prompt_chars": args.prompt_chars, "workers": args.workers if args.start_stack else None, "mock_args": args.mock_args if args.start_stack else None},
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "error_rate": round(1 - len(succeeded) / len(results), 5) if results else 0.0,
+        "throughput_rps": round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+        "status_counts": dict(sorted(status_counts.items())),
+        "latency_ms": summarize_latencies([result.latency for result in succeeded]),
+        "ttft_ms": summarize_latencies([result.ttft for result in streamed if result.ttft is not None]) if streamed else None,
+    }
+
+
+async def run_load(url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"Authorization": f"Bearer {args.api_key}"}
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=args.timeout) as client:
+        if args.warmup > 0:
+            await generate_load(client, args, args.warmup, 0)
+        start = time.perf_counter()
+        results = await generate_load(client, args, args.duration, args.requests)
+        elapsed = time.perf_counter() - start
+    return summarize(args, results, elapsed)
+
+
+# --------------------------
+# Comparison
+# --------------------------
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> bool:
+    """
+    Print the change of the headline figures; False when throughput dropped or p99 grew by more than `max_regression` percent.
+    """
+    rows = [("throughput_rps", baseline["throughput_rps"], current["throughput_rps"], -1)]
+    rows += [(f"latency {name} ms", baseline["latency_ms"][name], current["latency_ms"][name], 1) for name in PERCENTILES]
+    regressed = False
+    print(f"{'metric':>18} {'baseline':>10} {'current':>10} {'change':>8}", file=sys.stderr)
+    for name, before, after, worse_sign in rows:
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:>18} {before:>10.2f} {after:>10.2f} {change:>+7.1f}%", file=sys.stderr)
+        if name in ("throughput_rps", "latency p99 ms") and change * worse_sign > max_regression:
+            regressed = True
+    return not regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:6061", help="gateway to load when not using --start-stack")
+    parser.add_argument("--api-key", default="xyz_api_key_for_acme")
+    parser.add_argument("--model", default="gpt-3.5-turbo")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of measured load")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0: duration only)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load first")
+    parser.add_argument("--stream-ratio", type=float, default=0.0, help="fraction of requests sent with stream=true")
+    parser.add_argument("--prompt-chars", type=int, default=400)
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--start-stack", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="gateway APP_WORKERS with --start-stack")
+    parser.add_argument("--gateway-port", type=int, default=6161)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--mock-args", default="", help="extra benchmarks.mock_upstream arguments with --start-stack")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="load with the tenants' configured rate limits and quotas")
+    parser.add_argument("--verbose", action="store_true", help="show the stack's own output")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="percent regression tolerated by --compare")
+    args = parser.parse_args()
+
+    if args.start_stack:
+        with start_stack(args) as url:
+            result = asyncio.run(run_load(url, args))
+    else:
+        result = asyncio.run(run_load(args.url, args))
+
+    document = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+    print(document.decode())
+    if args.output:
+        with open(args.output, "wb") as file:
+            file.write(document + b"\n")
+    if args.compare:
+        with open(args.compare, "rb") as file:
+            baseline = orjson.loads(file.read())
+        if not compare(baseline, result, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Local OpenAI-compatible upstream for load tests, standing in for every provider.
+
+Serves OpenAI `/chat/completions`, Anthropic `/messages` and Gemini `/models/{model}:generateContent`
+(each as JSON or SSE stream) and `/models`, optionally under a `/{provider}` prefix so failure
+profiles can differ per provider. Point the gateway at it with
+
+    UPSTREAM_BASE_URL_OVERRIDE=http://127.0.0.1:9100/{provider}
+
+    python -m benchmarks.mock_upstream [--port 9100] [--latency-distribution lognormal] [--latency-ms 50]
+        [--latency-spread 0.5] [--error-rate 0.0] [--error-status 503] [--retry-after 1]
+        [--provider-error-rate openai=1.0]
+        [--completion-words 16] [--chunk-interval-ms 5]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import orjson
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+from src.config.orjson import ORJSONResponse
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+@dataclass(frozen=True)
+class MockSettings:
+    """
+    `latency_ms` is the time to the full response (or to the first chunk when streaming): constant for `fixed`,
+    `latency_ms * (1 +/- latency_spread)` for `uniform`, and a lognormal with that median and sigma `latency_spread`.
+    """
+
+    latency_distribution: str = "lognormal"
+    latency_ms: float = 50.0
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: Optional[float] = None
+    provider_error_rates: Mapping[str, float] = field(default_factory=dict)
+    completion_words: int = 16
+    chunk_interval_ms: float = 5.0
+
+    def sample_latency(self) -> float:
+        """
+        Seconds until the response (or first chunk) is sent.
+        """
+        if self.latency_distribution == "uniform":
+            latency_ms = random.uniform(self.latency_ms * (1 - self.latency_spread), self.latency_ms * (1 + self.latency_spread))
+        elif self.latency_distribution == "lognormal":
+            latency_ms = random.lognormvariate(math.log(self.latency_ms), self.latency_spread) if self.latency_ms > 0 else 0.0
+        else:
+            latency_ms = self.latency_ms
+        return max(0.0, latency_ms) / 1000
+
+    def should_fail(self, provider: Optional[str]) -> bool:
+        error_rate = self.provider_error_rates.get(provider or "", self.error_rate)
+        return error_rate > 0 and random.random() < error_rate
+
+
+def get_prompt_chars(payload: Mapping[str, Any]) -> int:
+    return sum(len(message.get("content") or "") for message in payload.get("messages") or () if isinstance(message, dict) and isinstance(message.get("content"), str))
+
+
+def build_openai_response(completion_id: str, model: str, words: List[str], prompt_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words), "total_tokens": prompt_tokens + len(words)},
+    }
+
+
+def build_anthropic_response(completion_id: str, model: str, words: List[str], prompt_tokens: int) -> Dict[str, Any]:
+    return {"id": completion_id, "type": "message", "role": "assistant", "model": model, "content": [{"type": "text", "text": " ".join(words)}], "stop_reason": "end_turn", "usage": {"input_tokens": prompt_tokens, "output_tokens": len(words)}}
+
+
+def build_gemini_response(completion_id: str, model: str, words: List[str], prompt_tokens: int) -> Dict[str, Any]:
+    return {
+        "candidates": [{"index": 0, "content": {"role": "model", "parts": [{"text": " ".join(words)}]}, "finishReason": "STOP"}],
+        "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": len(words), "totalTokenCount": prompt_tokens + len(words)},
+        "modelVersion": model,
+        "responseId": completion_id,
+    }
+
+
+def encode_event(data: Mapping[str, Any], event: Optional[str] = None) -> bytes:
+    return (f"event: {event}\n".encode() if event else b"") + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def iter_openai_events(completion_id: str, model: str, words: List[str], prompt_tokens: int) -> Iterator[bytes]:
+    created = int(time.time())
+    for word in words:
+        yield encode_event({"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model, "choices": [{"index": 0, "delta": {"content": f"{word} "}, "finish_reason": None}]})
+    yield b"data: [DONE]\n\n"
+
+
+def iter_anthropic_events(completion_id: str, model: str, words: List[str], prompt_tokens: int) -> Iterator[bytes]:
+    message: Dict[str, Any] = {"id": completion_id, "type": "message", "role": "assistant", "model": model, "content": [], "stop_reason": None, "usage": {"input_tokens": prompt_tokens, "output_tokens": 0}}
+    yield encode_event({"type": "message_start", "message": message}, "message_start")
+    for word in words:
+        yield encode_event({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": f"{word} "}}, "content_block_delta")
+    yield encode_event({"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": len(words)}}, "message_delta")
+    yield encode_event({"type": "message_stop"}, "message_stop")
+
+
+def iter_gemini_events(completion_id: str, model: str, words: List[str], prompt_tokens: int) -> Iterator[bytes]:
+    for index, word in enumerate(words):
+        candidate: Dict[str, Any] = {"index": 0, "content": {"role": "model", "parts": [{"text": f"{word} "}]}}
+        if index == len(words) - 1:
+            candidate["finishReason"] = "STOP"
+        yield encode_event({"candidates": [candidate], "modelVersion": model, "responseId": completion_id})
+
+
+# wire format: (response builder, stream event iterator)
+WIRE_FORMATS: Dict[str, Tuple[Callable[..., Dict[str, Any]], Callable[..., Iterator[bytes]]]] = {
+    "openai": (build_openai_response, iter_openai_events),
+    "anthropic": (build_anthropic_response, iter_anthropic_events),
+    "gemini": (build_gemini_response, iter_gemini_events),
+}
+
+
+def create_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI(title="Mock Upstream", default_response_class=ORJSONResponse)
+    words: List[str] = [f"token{index}" for index in range(settings.completion_words)]
+
+    async def stream_events(events: Iterator[bytes], first_event_delay: float) -> AsyncIterator[bytes]:
+        await asyncio.sleep(first_event_delay)
+        for index, event in enumerate(events):
+            if index:
+                await asyncio.sleep(settings.chunk_interval_ms / 1000)
+            yield event
+
+    async def respond(wire_format: str, provider: Optional[str], model: str, payload: Mapping[str, Any], stream: bool) -> Response:
+        build_response, iter_events = WIRE_FORMATS[wire_format]
+        completion_id = f"mock-{random.getrandbits(48):012x}"
+        prompt_tokens = get_prompt_chars(payload) // 4
+        delay = settings.sample_latency()
+        if settings.should_fail(provider):
+            await asyncio.sleep(delay)
+            headers = {"Retry-After": f"{settings.retry_after:g}"} if settings.retry_after is not None else None
+            return ORJSONResponse({"error": {"message": f"mock {provider or 'upstream'} failure", "type": "server_error"}}, status_code=settings.error_status, headers=headers)
+        if stream:
+            return StreamingResponse(stream_events(iter_events(completion_id, model, words, prompt_tokens), delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return ORJSONResponse(build_response(completion_id, model, words, prompt_tokens))
+
+    async def chat_completions(request: Request, provider: Optional[str] = None) -> Response:
+        payload = orjson.loads(await request.body())
+        return await respond("openai", provider, payload.get("model", "mock-model"), payload, bool(payload.get("stream")))
+
+    async def messages(request: Request, provider: Optional[str] = None) -> Response:
+        payload = orjson.loads(await request.body())
+        return await respond("anthropic", provider, payload.get("model", "mock-model"), payload, bool(payload.get("stream")))
+
+    async def generate_content(request: Request, model_action: str, provider: Optional[str] = None) -> Response:
+        model, _, action = model_action.partition(":")
+        payload = orjson.loads(await request.body())
+        # count prompt characters the same way for every wire format
+        messages = [{"content": part.get("text", "")} for content in payload.get("contents") or () for part in content.get("parts") or ()]
+        return await respond("gemini", provider, model, {"messages": messages}, action == "streamGenerateContent")
+
+    async def models(provider: Optional[str] = None) -> Dict[str, Any]:
+        return {"object": "list", "data": [{"id": "mock-model", "object": "model", "owned_by": provider or "mock"}]}
+
+    for prefix in ("", "/{provider}"):
+        app.add_api_route(f"{prefix}/chat/completions", chat_completions, methods=["POST"])
+        app.add_api_route(f"{prefix}/messages", messages, methods=["POST"])
+        app.add_api_route(f"{prefix}/models/{{model_action}}", generate_content, methods=["POST"])
+        app.add_api_route(f"{prefix}/models", models, methods=["GET"])
+    return app
+
+
+def parse_provider_rates(values: List[str]) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for value in values:
+        provider, _, rate = value.partition("=")
+        if not provider or not rate:
+            raise argparse.ArgumentTypeError(f"expected PROVIDER=RATE, got '{value}'")
+        rates[provider] = float(rate)
+    return rates
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default=MockSettings.latency_distribution)
+    parser.add_argument("--latency-ms", type=float, default=MockSettings.latency_ms)
+    parser.add_argument("--latency-spread", type=float, default=MockSettings.latency_spread, help="uniform: +/- fraction of latency-ms; lognormal: sigma")
+    parser.add_argument("--error-rate", type=float, default=MockSettings.error_rate)
+    parser.add_argument("--error-status", type=int, default=MockSettings.error_status)
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with error responses")
+    parser.add_argument("--provider-error-rate", action="append", default=[], metavar="PROVIDER=RATE", help="error rate of one provider prefix, repeatable")
+    parser.add_argument("--completion-words", type=int, default=MockSettings.completion_words, help="words in the completion, one per stream chunk")
+    parser.add_argument("--chunk-interval-ms", type=float, default=MockSettings.chunk_interval_ms)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    settings = MockSettings(
+        latency_distribution=args.latency_distribution,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        provider_error_rates=parse_provider_rates(args.provider_error_rate),
+        completion_words=args.completion_words,
+        chunk_interval_ms=args.chunk_interval_ms,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
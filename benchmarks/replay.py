@@ -0,0 +1,317 @@
+"""
+Replay a recorded request journal (the gateway's REQUEST_JOURNAL_* JSONL, plain or zstd-compressed
+segments) against the gateway, to size capacity and compare routing policies offline.
+
+Every journal record becomes a `/v1/chat/completions` request of the same tenant, model, stream flag,
+max_tokens and temperature, with a unique prompt of about the recorded prompt tokens (prompts are not
+journaled). Requests start at their recorded offsets divided by --speed (0: no pacing). `open` mode sends
+each at its time however many are in flight; `closed` mode runs --concurrency clients that also wait for
+their previous response, so a slow gateway slows the replay down instead of piling requests up.
+
+With `--start-stack` the mock upstream and a gateway run as in benchmarks.load_test, optionally with
+another routing policy file (--routing-policies), and the gateway's own journal of the replay gives the
+failover and retry rates. Otherwise --url must be serving, and those rates need --gateway-journal.
+
+Prints (and with --output writes) one JSON document with overall, per-tenant and per-model throughput,
+latency percentiles and failover rates. `--compare` prints the change against an earlier result and exits 1
+when overall throughput or p99 regressed by more than --max-regression percent.
+
+    python -m benchmarks.replay logs/requests.jsonl [logs/requests-*.jsonl.zst] --start-stack [--speed 2]
+        [--mode closed --concurrency 32] [--routing-policies candidate.yaml] [--output replay.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+import httpx
+import orjson
+import yaml
+
+from benchmarks.load_test import compare, get_commit, start_stack, summarize_latencies
+
+REPLAY_MODES = ("open", "closed")
+DEFAULT_PROMPT_TOKENS = 64
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(slots=True)
+class ReplayRequest:
+    offset: float
+    tenant: str
+    model: str
+    payload: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class ReplayResult:
+    tenant: str
+    model: str
+    status: int
+    latency: float
+    ttft: Optional[float]
+    lag: float
+
+
+# --------------------------
+# Journal
+# --------------------------
+def open_segment(path: str) -> IO[bytes]:
+    if not path.endswith(".zst"):
+        return open(path, "rb")
+    try:
+        import zstandard
+    except ImportError:
+        raise SystemExit(f"{path} is zstd-compressed: install the zstandard package to replay it") from None
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+
+
+def read_journal(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with open_segment(path) as file:
+            for line in file:
+                if line.strip():
+                    yield orjson.loads(line)
+
+
+def load_requests(paths: List[str], limit: int) -> List[ReplayRequest]:
+    """
+    Chat requests of the journal in start-time order (records are written as requests finish).
+    """
+    records = sorted((record for record in read_journal(paths) if record.get("tenant") and record.get("model")), key=lambda record: record["timestamp"])
+    if limit:
+        records = records[:limit]
+    first = records[0]["timestamp"] if records else 0.0
+    return [ReplayRequest(record["timestamp"] - first, record["tenant"], record["model"], build_payload(record, index)) for index, record in enumerate(records)]
+
+
+def build_payload(record: Mapping[str, Any], index: int) -> Dict[str, Any]:
+    """
+    Every prompt is unique so request coalescing and response caching do not flatter the numbers.
+    """
+    prompt_chars = (record.get("prompt_tokens") or DEFAULT_PROMPT_TOKENS) * CHARS_PER_TOKEN
+    prefix = f"replay request {index}: "
+    payload: Dict[str, Any] = {"model": record["model"], "messages": [{"role": "user", "content": prefix + "x" * max(0, prompt_chars - len(prefix))}], "stream": bool(record.get("stream"))}
+    for field in ("max_tokens", "temperature"):
+        if record.get(field) is not None:
+            payload[field] = record[field]
+    return payload
+
+
+def load_api_keys(overrides: List[str]) -> Dict[str, str]:
+    """
+    Tenant id -> API key from config/tenants.yaml, overridden by TENANT=KEY arguments.
+    """
+    with open(os.path.join("config", "tenants.yaml"), encoding="utf-8") as file:
+        tenants = yaml.safe_load(file) or {}
+    api_keys = {tenant.get("id", key): tenant["api_key"] for key, tenant in tenants.items() if tenant.get("api_key")}
+    for value in overrides:
+        tenant, _, api_key = value.partition("=")
+        if not tenant or not api_key:
+            raise SystemExit(f"expected TENANT=KEY, got '{value}'")
+        api_keys[tenant] = api_key
+    return api_keys
+
+
+# --------------------------
+# Replay
+# --------------------------
+async def send_request(client: httpx.AsyncClient, request: ReplayRequest, api_key: str, scheduled_at: float) -> ReplayResult:
+    start = time.perf_counter()
+    lag = max(0.0, start - scheduled_at)
+    headers = {"Authorization": f"Bearer {api_key}"}
+    ttft: Optional[float] = None
+    try:
+        if not request.payload["stream"]:
+            response = await client.post("/v1/chat/completions", json=request.payload, headers=headers)
+            return ReplayResult(request.tenant, request.model, response.status_code, time.perf_counter() - start, None, lag)
+        async with client.stream("POST", "/v1/chat/completions", json=request.payload, headers=headers) as response:
+            async for _ in response.aiter_raw():
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            return ReplayResult(request.tenant, request.model, response.status_code, time.perf_counter() - start, ttft, lag)
+    except httpx.HTTPError:
+        # status 0: transport failure or client timeout
+        return ReplayResult(request.tenant, request.model, 0, time.perf_counter() - start, ttft, lag)
+
+
+async def replay(client: httpx.AsyncClient, args: argparse.Namespace, requests: List[ReplayRequest], api_keys: Dict[str, str]) -> List[ReplayResult]:
+    start = time.perf_counter()
+    results: List[ReplayResult] = []
+
+    def get_scheduled_at(request: ReplayRequest) -> float:
+        return start + request.offset / args.speed if args.speed > 0 else start
+
+    async def send_at(request: ReplayRequest) -> None:
+        scheduled_at = get_scheduled_at(request)
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        results.append(await send_request(client, request, api_keys.get(request.tenant, ""), scheduled_at))
+
+    if args.mode == "open":
+        tasks: List[asyncio.Task] = []
+        for request in requests:
+            delay = get_scheduled_at(request) - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send_at(request)))
+        await asyncio.gather(*tasks)
+        return results
+
+    pending = iter(requests)
+
+    async def client_loop() -> None:
+        for request in pending:
+            await send_at(request)
+
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+    return results
+
+
+# --------------------------
+# Report
+# --------------------------
+def summarize_failovers(records: List[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    From the gateway journal: requests whose attempts spanned several providers, and requests retried on a provider.
+    """
+    attempted = [record for record in records if record.get("attempts")]
+    if not attempted:
+        return {"failover_rate": None, "retry_rate": None, "mean_attempts": None}
+    failovers = sum(1 for record in attempted if record.get("failovers"))
+    retries = sum(1 for record in attempted if len(record["attempts"]) > len({attempt["provider"] for attempt in record["attempts"]}))
+    return {
+        "failover_rate": round(failovers / len(attempted), 5),
+        "retry_rate": round(retries / len(attempted), 5),
+        "mean_attempts": round(sum(len(record["attempts"]) for record in attempted) / len(attempted), 3),
+    }
+
+
+def summarize_group(results: List[ReplayResult], records: Optional[List[Mapping[str, Any]]], elapsed: float) -> Dict[str, Any]:
+    status_counts: Dict[str, int] = {}
+    for result in results:
+        status_counts[str(result.status)] = status_counts.get(str(result.status), 0) + 1
+    succeeded = [result for result in results if 200 <= result.status < 300]
+    streamed = [result.ttft for result in succeeded if result.ttft is not None]
+    return {
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "error_rate": round(1 - len(succeeded) / len(results), 5) if results else 0.0,
+        "throughput_rps": round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+        "status_counts": dict(sorted(status_counts.items())),
+        "latency_ms": summarize_latencies([result.latency for result in succeeded]),
+        "ttft_ms": summarize_latencies(streamed) if streamed else None,
+        "schedule_lag_ms": summarize_latencies([result.lag for result in results]),
+        **(summarize_failovers(records) if records is not None else {}),
+    }
+
+
+def summarize_by(results: List[ReplayResult], records: Optional[List[Mapping[str, Any]]], elapsed: float, key: Callable[[Any], str], record_field: str) -> Dict[str, Any]:
+    groups: Dict[str, List[ReplayResult]] = defaultdict(list)
+    for result in results:
+        groups[key(result)].append(result)
+    record_groups: Dict[str, List[Mapping[str, Any]]] = defaultdict(list)
+    for record in records or ():
+        record_groups[record.get(record_field) or ""].append(record)
+    return {name: summarize_group(group, record_groups[name] if records is not None else None, elapsed) for name, group in sorted(groups.items())}
+
+
+def summarize(args: argparse.Namespace, results: List[ReplayResult], records: Optional[List[Mapping[str, Any]]], elapsed: float) -> Dict[str, Any]:
+    return {
+        **get_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "settings": {"journal": args.journal, "mode": args.mode, "speed": args.speed, "concurrency": args.concurrency if args.mode == "closed" else None, "limit": args.limit, "routing_policies": args.routing_policies, "workers": args.workers if args.start_stack else None, "mock_args": args.mock_args if args.start_stack else None},
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarize_group(results, records, elapsed),
+        "tenants": summarize_by(results, records, elapsed, lambda result: result.tenant, "tenant"),
+        "models": summarize_by(results, records, elapsed, lambda result: result.model, "model"),
+    }
+
+
+def compare_failovers(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    print(f"{'model':>18} {'failover before':>16} {'failover after':>15}", file=sys.stderr)
+    for model in sorted(set(baseline.get("models", {})) | set(current.get("models", {}))):
+        before = baseline.get("models", {}).get(model, {}).get("failover_rate")
+        after = current.get("models", {}).get(model, {}).get("failover_rate")
+        print(f"{model:>18} {'-' if before is None else f'{before:.2%}':>16} {'-' if after is None else f'{after:.2%}':>15}", file=sys.stderr)
+
+
+async def run_replay(url: str, args: argparse.Namespace, requests: List[ReplayRequest], api_keys: Dict[str, str]) -> tuple[List[ReplayResult], float]:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        results = await replay(client, args, requests, api_keys)
+        return results, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("journal", nargs="+", help="journal segments (.jsonl or .jsonl.zst), globs allowed")
+    parser.add_argument("--url", default="http://127.0.0.1:6061", help="gateway to replay against when not using --start-stack")
+    parser.add_argument("--mode", choices=REPLAY_MODES, default="open")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (0: no pacing)")
+    parser.add_argument("--concurrency", type=int, default=32, help="clients of closed mode")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N requests")
+    parser.add_argument("--api-key", action="append", default=[], metavar="TENANT=KEY", help="API key of a tenant, instead of config/tenants.yaml")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--gateway-journal", nargs="*", default=[], help="journal the gateway wrote during the replay, for failover rates without --start-stack")
+    parser.add_argument("--start-stack", action="store_true")
+    parser.add_argument("--routing-policies", help="routing_policies.yaml to run the stack with instead of config/")
+    parser.add_argument("--workers", type=int, default=1, help="gateway APP_WORKERS with --start-stack")
+    parser.add_argument("--gateway-port", type=int, default=6161)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--mock-args", default="", help="extra benchmarks.mock_upstream arguments with --start-stack")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="replay with the tenants' configured rate limits and quotas")
+    parser.add_argument("--verbose", action="store_true", help="show the stack's own output")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="percent regression tolerated by --compare")
+    args = parser.parse_args()
+
+    args.journal = sorted({path for pattern in args.journal for path in glob.glob(pattern)})
+    if not args.journal:
+        raise SystemExit("no journal segments found")
+    requests = load_requests(args.journal, args.limit)
+    api_keys = load_api_keys(args.api_key)
+    print(f"replaying {len(requests)} requests spanning {requests[-1].offset if requests else 0:.1f}s", file=sys.stderr)
+
+    records: Optional[List[Mapping[str, Any]]] = None
+    if args.start_stack:
+        with tempfile.TemporaryDirectory(prefix="replay_journal_") as journal_dir:
+            env = {"REQUEST_JOURNAL_ENABLED": "True", "REQUEST_JOURNAL_PATH": os.path.join(journal_dir, "replay.jsonl"), "REQUEST_JOURNAL_ROTATE_SECONDS": "0", "REQUEST_JOURNAL_MAX_BYTES": str(2**62), "REQUEST_JOURNAL_COMPRESSION": "none"}
+            with start_stack(args, env) as url:
+                results, elapsed = asyncio.run(run_replay(url, args, requests, api_keys))
+            # the gateway writes the rest of its journal on shutdown
+            records = list(read_journal(sorted(glob.glob(os.path.join(journal_dir, "replay*.jsonl")))))
+    else:
+        results, elapsed = asyncio.run(run_replay(args.url, args, requests, api_keys))
+        if args.gateway_journal:
+            records = list(read_journal(args.gateway_journal))
+
+    result = summarize(args, results, records, elapsed)
+    document = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+    print(document.decode())
+    if args.output:
+        with open(args.output, "wb") as file:
+            file.write(document + b"\n")
+    if args.compare:
+        with open(args.compare, "rb") as file:
+            baseline = orjson.loads(file.read())
+        compare_failovers(baseline, result)
+        if not compare(baseline["overall"], result["overall"], args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from src.services.route import initializing_model_router
 
 configure_event_loop()
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import Any
@@ -15,10 +16,19 @@ from starlette_exporter import PrometheusMiddleware, handle_metrics
 import src.logging_setup  # noqa
 from src.config.multiprocessing import configure_multiprocessing
 from src.config.orjson import ORJSONResponse
+from src.helpers.adapters import adapter_classes
+from src.helpers.adapters.http_client import close_http_clients, initializing_http_clients
 from src.helpers.utilities.custom.env_var import envConfig
 from src.helpers.utilities.custom.yaml_config import load_yaml_configs
+from src.helpers.utilities.generic.mp import close_process_pool, initializing_process_pool
 from src.middleware.http_logging import HTTPLoggingMiddleware
-from src.routers import chat, health
+from src.routers import batches, chat, health
+from src.services.auth import initializing_tenant_index
+from src.services.circuit_breaker import circuit_breakers
+from src.services.config_reload import start_config_reloader, stop_config_reloader
+from src.services.journal import request_journal
+from src.services.rate_limit import rate_limiter
+from src.services.route import probe_provider
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +45,12 @@ async def lifespan(application: FastAPI) -> Any:
     configure_multiprocessing()
     logger.info("Multiprocessing workers Configured!")
 
+    # no request path offloads to the pool yet: it is created on first use unless warm-up is asked for
+    if envConfig.process_pool_warmup:
+        logger.info("Starting Process Pool...")
+        await initializing_process_pool()
+        logger.info("Process Pool Started !")
+
     logger.info("Loading YAML Configs...")
     load_yaml_configs()
     logger.info("YAML Configs Loaded !")
@@ -43,11 +59,43 @@ async def lifespan(application: FastAPI) -> Any:
     initializing_model_router()
     logger.info("Model Router Initialized !")
 
+    logger.info("Initializing Tenant Index...")
+    initializing_tenant_index()
+    logger.info("Tenant Index Initialized !")
+
+    logger.info("Initializing Upstream HTTP Clients...")
+    initializing_http_clients(adapter_classes.keys())
+    logger.info("Upstream HTTP Clients Initialized !")
+
+    logger.info("Starting Circuit Breaker Probes...")
+    circuit_breakers.start_probing(probe_provider)
+    logger.info("Circuit Breaker Probes Started !")
+
+    logger.info("Starting Config Reloader...")
+    start_config_reloader()
+    logger.info("Config Reloader Started !")
+
+    logger.info("Starting Quota Sync...")
+    rate_limiter.start_sync()
+    logger.info("Quota Sync Started !")
+
+    logger.info("Starting Request Journal...")
+    request_journal.start()
+    logger.info("Request Journal Started !")
+
     logger.info(f"Server started successfully at port {APP_PORT}")
 
     yield
     logger.info("Shutting down...")
-    # await asyncio.gather()
+    await stop_config_reloader()
+    await rate_limiter.stop_sync()
+    await circuit_breakers.stop_probing()
+    await asyncio.to_thread(request_journal.stop)
+    logger.info("Request Journal Closed !")
+    await close_http_clients()
+    logger.info("Upstream HTTP Clients Closed !")
+    await close_process_pool()
+    logger.info("Process Pool Closed !")
 
 
 description = """
@@ -82,6 +130,7 @@ logger.info("Middlewares Initialized")
 logger.info("Initializing Routers...")
 app_server.include_router(health.router)
 app_server.include_router(chat.router)
+app_server.include_router(batches.router)
 logger.info("Routers Initialized")
 
 logger.info("Initializing Metrics Route...")
@@ -15,10 +15,12 @@ def get_handler_on_env(true_list: list[str], false_list: list[str]) -> list[str]
     return true_list if ENV_APP_RELOAD else false_list
 
 
-def get_level_on_env(true_list: list[str] | str, false_list: list[str]) -> list[str] | str:
-    return true_list if ENV_DEBUG_LOGS_ENABLED else false_list
+def get_level_on_env(true_level: str, false_level: str) -> str:
+    return true_level if ENV_DEBUG_LOGS_ENABLED else false_level
 
 
+QUEUE_HANDLERS = ["queue", "access_queue"]
+
 # Logging configuration
 LOGGING_CONFIG = {
     "version": 1,
@@ -27,7 +29,7 @@ LOGGING_CONFIG = {
         "default": {
             "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         },
-        "json": {"format": '{ "time":"%(asctime)s", "name":"%(name)s", "level":"%(levelname)s", "message":"%(message)s", "module":"%(module)s" }'},
+        "json": {"()": "src.helpers.utilities.generic.json_log_formatter.JSONFormatter"},
         "access": {
             "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         },
@@ -67,36 +69,47 @@ LOGGING_CONFIG = {
             "maxBytes": 1024 * 1024,  # 1 MB
             "backupCount": 5,
         },
+        # records are handed to a background thread, so file and console I/O never blocks the event loop
+        "queue": {
+            "class": "src.helpers.utilities.generic.queue_log_handler.StructuredQueueHandler",
+            "handlers": get_handler_on_env(["console"], ["console", "file", "error_file", "json_file"]),
+            "respect_handler_level": True,
+        },
+        "access_queue": {
+            "class": "src.helpers.utilities.generic.queue_log_handler.StructuredQueueHandler",
+            "handlers": get_handler_on_env(["console"], ["console", "access_file"]),
+            "respect_handler_level": True,
+        },
     },
     "loggers": {
         "uvicorn": {
-            "handlers": get_handler_on_env(["console"], ["console", "file"]),
-            "level": get_level_on_env("DEBUG", ["INFO"]),
+            "handlers": ["queue"],
+            "level": get_level_on_env("DEBUG", "INFO"),
             "propagate": False,
         },
         "uvicorn.error": {
-            "handlers": get_handler_on_env(["console"], ["console", "file", "error_file"]),
+            "handlers": ["queue"],
             "level": "ERROR",
             "propagate": False,
         },
         "uvicorn.access": {
-            "handlers": get_handler_on_env(["console"], ["console", "access_file", "error_file"]),
-            "level": get_level_on_env("DEBUG", ["INFO"]),
+            "handlers": ["access_queue"],
+            "level": get_level_on_env("DEBUG", "INFO"),
             "propagate": False,
         },
         "fastapi": {
-            "handlers": get_handler_on_env(["console"], ["console", "file", "json_file"]),
-            "level": get_level_on_env("DEBUG", ["INFO"]),
+            "handlers": ["queue"],
+            "level": get_level_on_env("DEBUG", "INFO"),
             "propagate": False,
         },
         "app": {
-            "handlers": get_handler_on_env(["console"], ["console", "file", "json_file"]),
-            "level": get_level_on_env("DEBUG", ["INFO"]),
+            "handlers": ["queue"],
+            "level": get_level_on_env("DEBUG", "INFO"),
             "propagate": False,
         },
     },
     "root": {
-        "handlers": get_handler_on_env(["console"], ["console", "file", "json_file"]),
-        "level": get_level_on_env("DEBUG", ["INFO"]),
+        "handlers": ["queue"],
+        "level": get_level_on_env("DEBUG", "INFO"),
     },
 }
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Mapping
 
 from src.helpers.adapters.anthropic import AnthropicAdapter
 from src.helpers.adapters.base import BaseProviderAdapter
@@ -18,10 +18,15 @@ adapter_classes = {
 }
 
 
-def get_provider_adapter(provider_name: str, provider_config: Dict[str, Any]) -> BaseProviderAdapter:
-    provider_config = provider_config.copy()
-    provider_config["api_key_internal"] = internal_keys.get(provider_name)
+def get_provider_adapter(provider_name: str, provider_config: Mapping[str, Any]) -> BaseProviderAdapter:
+    """
+    UPSTREAM_BASE_URL_OVERRIDE (a `{provider}` template) redirects every provider, e.g. to benchmarks.mock_upstream.
+    """
+    config = dict(provider_config)
+    config["api_key_internal"] = internal_keys.get(provider_name)
+    if envConfig.upstream_base_url_override:
+        config["base_url"] = envConfig.upstream_base_url_override.format(provider=provider_name)
     adapter_class = adapter_classes.get(provider_name)
     if not adapter_class:
         raise ValueError(f"No adapter found for provider:{provider_name}")
-    return adapter_class(provider_config)
+    return adapter_class(config)
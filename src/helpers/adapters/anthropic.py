@@ -1,18 +1,127 @@
-from typing import Any, Dict
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
 
-import httpx
+import orjson
 
 from src.helpers.adapters.base import BaseProviderAdapter
+from src.helpers.adapters.openai_format import SSE_DONE, build_choice, build_completion, encode_chunk, get_image_url, get_text_content, iter_sse_data, split_data_url
+from src.helpers.utilities.custom.tokens import get_max_completion_tokens
+
+ANTHROPIC_VERSION = "2023-06-01"
+# the Messages API requires max_tokens
+DEFAULT_MAX_TOKENS = 1024
+STOP_REASONS = {"end_turn": "stop", "stop_sequence": "stop", "max_tokens": "length", "tool_use": "tool_calls", "refusal": "content_filter"}
+# OpenAI sampling parameters accepted by the Messages API under the same name
+PASSTHROUGH_PARAMETERS = ("temperature", "top_p", "top_k")
+
+
+def translate_content(content: Any) -> Any:
+    """
+    OpenAI message content as Messages API content: strings unchanged, text and image parts as content blocks.
+    """
+    if not isinstance(content, list):
+        return content if isinstance(content, str) else ""
+    blocks: List[Dict[str, Any]] = []
+    for part in content:
+        if not isinstance(part, dict):
+            continue
+        if part.get("type") == "text":
+            blocks.append({"type": "text", "text": part.get("text", "")})
+        elif part.get("type") == "image_url":
+            url = get_image_url(part)
+            data_url = split_data_url(url)
+            source = {"type": "base64", "media_type": data_url[0], "data": data_url[1]} if data_url else {"type": "url", "url": url}
+            blocks.append({"type": "image", "source": source})
+    return blocks
+
+
+def get_user_id(payload: Mapping[str, Any]) -> Optional[str]:
+    """
+    The end-user id for the Messages API `metadata.user_id`, its only metadata field: OpenAI's `user`, or a
+    `user_id` among OpenAI's free-form `metadata`, whose other keys the Messages API would reject.
+    """
+    if isinstance(payload.get("user"), str):
+        return payload["user"]
+    metadata = payload.get("metadata")
+    return metadata.get("user_id") if isinstance(metadata, dict) and isinstance(metadata.get("user_id"), str) else None
+
+
+def translate_request(model_name: str, payload: Mapping[str, Any], stream: bool) -> Dict[str, Any]:
+    """
+    OpenAI chat payload as a Messages API body. System (and developer) messages move to `system`; message
+    strings are referenced, not copied, so the body is built in one pass and encoded once.
+    """
+    system: List[str] = []
+    messages: List[Dict[str, Any]] = []
+    for message in payload.get("messages") or ():
+        role = message.get("role")
+        if role in ("system", "developer"):
+            system.append(get_text_content(message.get("content")))
+        else:
+            messages.append({"role": "assistant" if role == "assistant" else "user", "content": translate_content(message.get("content"))})
+    if not messages and isinstance(payload.get("prompt"), str):
+        messages.append({"role": "user", "content": payload["prompt"]})
+
+    data: Dict[str, Any] = {"model": model_name, "messages": messages, "max_tokens": get_max_completion_tokens(payload) or DEFAULT_MAX_TOKENS}
+    if system:
+        data["system"] = "\n\n".join(system)
+    for parameter in PASSTHROUGH_PARAMETERS:
+        if payload.get(parameter) is not None:
+            data[parameter] = payload[parameter]
+    user_id = get_user_id(payload)
+    if user_id:
+        data["metadata"] = {"user_id": user_id}
+    stop = payload.get("stop")
+    if stop:
+        data["stop_sequences"] = [stop] if isinstance(stop, str) else stop
+    if stream:
+        data["stream"] = True
+    return data
+
+
+def translate_response(body: Mapping[str, Any], model_name: str) -> Dict[str, Any]:
+    text = "".join(block.get("text", "") for block in body.get("content") or () if block.get("type") == "text")
+    usage = body.get("usage") or {}
+    choice = build_choice(0, text, STOP_REASONS.get(body.get("stop_reason") or "", "stop"))
+    return build_completion(body.get("id", ""), int(time.time()), body.get("model") or model_name, [choice], usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+async def translate_events(chunks: AsyncIterator[bytes], model_name: str) -> AsyncIterator[bytes]:
+    """
+    Messages API stream events as OpenAI chunks: one per text delta, then one carrying the finish reason.
+    """
+    completion_id = ""
+    created = int(time.time())
+    role_sent = False
+    async for data in iter_sse_data(chunks):
+        event = orjson.loads(data)
+        event_type = event.get("type")
+        if event_type == "message_start":
+            completion_id = event.get("message", {}).get("id", "")
+        elif event_type == "content_block_delta" and event.get("delta", {}).get("type") == "text_delta":
+            delta = {"role": "assistant", "content": event["delta"]["text"]} if not role_sent else {"content": event["delta"]["text"]}
+            role_sent = True
+            yield encode_chunk(completion_id, created, model_name, delta)
+        elif event_type == "message_delta" and event.get("delta", {}).get("stop_reason"):
+            yield encode_chunk(completion_id, created, model_name, {}, STOP_REASONS.get(event["delta"]["stop_reason"], "stop"))
+        elif event_type == "message_stop":
+            yield SSE_DONE
+        elif event_type == "error":
+            raise RuntimeError(f"Anthropic stream error: {event.get('error', {}).get('message', data.decode())}")
 
 
 class AnthropicAdapter(BaseProviderAdapter):
-    async def send_request(self, model_name: str, payload: Dict[str, Any]):
-        url = f"{self.base_url}/chat/completions"
-        headers = self.get_headers()
+    def get_url(self, model_name: str, stream: bool) -> str:
+        return f"{self.base_url}/messages"
+
+    def encode_request(self, model_name: str, payload: Dict[str, Any], stream: bool) -> bytes:
+        return orjson.dumps(translate_request(model_name, payload, stream))
+
+    def decode_response(self, content: bytes, model_name: str) -> Dict[str, Any]:
+        return translate_response(orjson.loads(content), model_name)
 
-        data = {"model": model_name, "prompt": payload.get("prompt", ""), "max_tokens_to_sample": payload.get("max_tokens", 100), **payload}
+    def translate_stream(self, chunks: AsyncIterator[bytes], model_name: str) -> AsyncIterator[bytes]:
+        return translate_events(chunks, model_name)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()
+    def get_headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": ANTHROPIC_VERSION, "Content-Type": "application/json"}
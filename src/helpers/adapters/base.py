@@ -1,4 +1,52 @@
-from typing import Any, Dict
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
+
+import httpx
+
+from src.helpers.adapters.http_client import get_http_client, http_client_pool
+
+PROBE_TIMEOUT_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class PhaseTimeouts:
+    """
+    Time limits of one upstream attempt: `connect` (connection and pool acquisition), `ttfb` (until the
+    response headers), `read` (a completion's whole body; the gap between chunks of a stream) and `total`.
+    """
+
+    connect: float
+    ttfb: float
+    read: float
+    total: float
+
+
+class PhaseTimeout(httpx.TimeoutException):
+    """
+    An attempt phase ran out of time; an httpx timeout, so breakers and concurrency limits treat it as one.
+    """
+
+    def __init__(self, phase: str, seconds: float):
+        super().__init__(f"Upstream {phase} timeout after {seconds:.3g}s")
+        self.phase = phase
+
+
+@asynccontextmanager
+async def phase_timeout(phase: str, seconds: Optional[float]) -> AsyncIterator[None]:
+    if seconds is None:
+        yield
+        return
+    try:
+        async with asyncio.timeout(seconds):
+            yield
+    except TimeoutError:
+        raise PhaseTimeout(phase, seconds) from None
+
+
+def cap_timeout(limit: Optional[float], cap: float) -> float:
+    return cap if limit is None else min(limit, cap)
 
 
 class BaseProviderAdapter:
@@ -7,17 +55,110 @@ class BaseProviderAdapter:
         Base adapter initialized with provider config from models_catalog.
         provider_config includes all details.
         """
+        self.provider_name = provider_config.get("name", "")
         self.base_url = provider_config.get("base_url")
-        self.api_key = provider_config.get("api_key_internal")
+        self.api_key: str = provider_config.get("api_key_internal") or ""
 
         if not self.api_key:
             raise ValueError("Provider API Key (internal) must be provided in config under 'api_key_internal'")
 
-    async def send_request(self, model_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Pooled client shared by every adapter of this provider, owned by the app lifespan.
+        """
+        return get_http_client(self.provider_name)
+
+    def get_timeout(self, timeouts: Optional[PhaseTimeouts]) -> httpx.Timeout:
+        """
+        The client's configured timeouts, capped by the attempt's connect and read limits.
+        """
+        client_timeout = self.client.timeout
+        if timeouts is None:
+            return client_timeout
+        return httpx.Timeout(
+            connect=cap_timeout(client_timeout.connect, timeouts.connect),
+            read=cap_timeout(client_timeout.read, timeouts.read),
+            write=client_timeout.write,
+            pool=cap_timeout(client_timeout.pool, timeouts.connect),
+        )
+
+    @asynccontextmanager
+    async def stream(self, url: str, timeouts: Optional[PhaseTimeouts] = None, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """
+        POST and expose the response before its body is read, for incremental relaying.
+        Waiting for the response headers is bounded by the attempt's `ttfb` limit.
+        """
+        async with http_client_pool.track(self.provider_name):
+            request = self.client.build_request("POST", url, timeout=self.get_timeout(timeouts), **kwargs)
+            async with phase_timeout("ttfb", timeouts.ttfb if timeouts else None):
+                response = await self.client.send(request, stream=True)
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
+    # --------------------------
+    # Translation
+    # --------------------------
+    def get_url(self, model_name: str, stream: bool) -> str:
+        """
+        Upstream endpoint of a chat request. Must be overridden by subclasses.
+        """
+        raise NotImplementedError("get_url must be implemented in subclass")
+
+    def encode_request(self, model_name: str, payload: Dict[str, Any], stream: bool) -> bytes:
+        """
+        OpenAI-format payload translated to the provider's request body, encoded once. Must be overridden by subclasses.
+        """
+        raise NotImplementedError("encode_request must be implemented in subclass")
+
+    def decode_response(self, content: bytes, model_name: str) -> Dict[str, Any]:
+        """
+        Provider response body decoded and translated to an OpenAI chat completion. Must be overridden by subclasses.
+        """
+        raise NotImplementedError("decode_response must be implemented in subclass")
+
+    def translate_stream(self, chunks: AsyncIterator[bytes], model_name: str) -> AsyncIterator[bytes]:
+        """
+        Provider SSE bytes translated to OpenAI `chat.completion.chunk` events; passed through by default.
+        """
+        return chunks
+
+    async def send_request(self, model_name: str, payload: Dict[str, Any], timeouts: Optional[PhaseTimeouts] = None) -> Dict[str, Any]:
+        """
+        Send the formatted request to the underlying model provider and return the parsed response.
+        """
+        async with self.stream(self.get_url(model_name, False), timeouts, headers=self.get_headers(), content=self.encode_request(model_name, payload, False)) as response:
+            async with phase_timeout("read", timeouts.read if timeouts else None):
+                await response.aread()
+        response.raise_for_status()
+        return self.decode_response(response.content, model_name)
+
+    async def stream_request(self, model_name: str, payload: Dict[str, Any], timeouts: Optional[PhaseTimeouts] = None) -> AsyncGenerator[bytes, None]:
+        """
+        Send the formatted request with streaming enabled and yield OpenAI-format SSE bytes as they arrive.
+        """
+        async with self.stream(self.get_url(model_name, True), timeouts, headers=self.get_headers(), content=self.encode_request(model_name, payload, True)) as response:
+            if response.is_error:
+                # keep the upstream's error message for the client
+                async with phase_timeout("read", timeouts.read if timeouts else None):
+                    await response.aread()
+            response.raise_for_status()
+            # aiter_bytes, not aiter_raw: an upstream may gzip or brotli-encode its event stream
+            async for chunk in self.translate_stream(response.aiter_bytes(), model_name):
+                yield chunk
+
+    async def probe(self) -> bool:
         """
-        Send the formatted request to the underlying model provider and return the parsed response. Must be overridden by subclasses.
+        Cheap reachability check used while the provider's circuit breaker is open.
+        Any non-5xx answer (even 401/404) shows the upstream is serving again.
         """
-        raise NotImplementedError("send_request must be implemented in subclass")
+        try:
+            response = await self.client.get(f"{self.base_url}/models", headers=self.get_headers(), timeout=PROBE_TIMEOUT_SECONDS)
+        except httpx.HTTPError:
+            return False
+        return response.status_code < 500
 
     def get_headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
@@ -1,18 +1,116 @@
-from typing import Any, Dict
+import mimetypes
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping
 
-import httpx
+import orjson
 
 from src.helpers.adapters.base import BaseProviderAdapter
+from src.helpers.adapters.openai_format import SSE_DONE, build_choice, build_completion, encode_chunk, get_image_url, get_text_content, iter_sse_data, split_data_url
+from src.helpers.utilities.custom.tokens import get_max_completion_tokens
+
+FINISH_REASONS = {"STOP": "stop", "MAX_TOKENS": "length", "SAFETY": "content_filter", "RECITATION": "content_filter", "PROHIBITED_CONTENT": "content_filter", "BLOCKLIST": "content_filter", "SPII": "content_filter"}
+# OpenAI sampling parameters and their generationConfig names
+GENERATION_PARAMETERS = {"temperature": "temperature", "top_p": "topP", "top_k": "topK", "n": "candidateCount", "seed": "seed", "presence_penalty": "presencePenalty", "frequency_penalty": "frequencyPenalty"}
+
+
+def translate_parts(content: Any) -> List[Dict[str, Any]]:
+    """
+    OpenAI message content as Gemini parts: text, inline base64 images and image URLs as file data.
+    """
+    if isinstance(content, str):
+        return [{"text": content}]
+    parts: List[Dict[str, Any]] = []
+    for part in content if isinstance(content, list) else ():
+        if not isinstance(part, dict):
+            continue
+        if part.get("type") == "text":
+            parts.append({"text": part.get("text", "")})
+        elif part.get("type") == "image_url":
+            url = get_image_url(part)
+            data_url = split_data_url(url)
+            if data_url:
+                parts.append({"inlineData": {"mimeType": data_url[0], "data": data_url[1]}})
+            else:
+                parts.append({"fileData": {"mimeType": mimetypes.guess_type(url)[0] or "image/jpeg", "fileUri": url}})
+    return parts
+
+
+def translate_request(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    OpenAI chat payload as a generateContent body; the model and stream mode are part of the URL.
+    """
+    system: List[str] = []
+    contents: List[Dict[str, Any]] = []
+    for message in payload.get("messages") or ():
+        role = message.get("role")
+        if role in ("system", "developer"):
+            system.append(get_text_content(message.get("content")))
+        else:
+            contents.append({"role": "model" if role == "assistant" else "user", "parts": translate_parts(message.get("content"))})
+    if not contents and isinstance(payload.get("prompt"), str):
+        contents.append({"role": "user", "parts": [{"text": payload["prompt"]}]})
+
+    generation_config: Dict[str, Any] = {name: payload[parameter] for parameter, name in GENERATION_PARAMETERS.items() if payload.get(parameter) is not None}
+    max_tokens = get_max_completion_tokens(payload)
+    if max_tokens:
+        generation_config["maxOutputTokens"] = max_tokens
+    stop = payload.get("stop")
+    if stop:
+        generation_config["stopSequences"] = [stop] if isinstance(stop, str) else stop
+
+    data: Dict[str, Any] = {"contents": contents}
+    if system:
+        data["systemInstruction"] = {"parts": [{"text": "\n\n".join(system)}]}
+    if generation_config:
+        data["generationConfig"] = generation_config
+    return data
+
+
+def get_candidate_text(candidate: Mapping[str, Any]) -> str:
+    return "".join(part.get("text", "") for part in (candidate.get("content") or {}).get("parts") or ())
+
+
+def translate_response(body: Mapping[str, Any], model_name: str) -> Dict[str, Any]:
+    choices = [build_choice(candidate.get("index", index), get_candidate_text(candidate), FINISH_REASONS.get(candidate.get("finishReason") or "", "stop")) for index, candidate in enumerate(body.get("candidates") or ())]
+    usage = body.get("usageMetadata") or {}
+    return build_completion(body.get("responseId", ""), int(time.time()), body.get("modelVersion") or model_name, choices, usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0))
+
+
+async def translate_events(chunks: AsyncIterator[bytes], model_name: str) -> AsyncIterator[bytes]:
+    """
+    streamGenerateContent responses (alt=sse) as OpenAI chunks: one per candidate text, one per finish reason, then [DONE].
+    """
+    created = int(time.time())
+    role_sent = False
+    async for data in iter_sse_data(chunks):
+        event = orjson.loads(data)
+        if "error" in event:
+            raise RuntimeError(f"Gemini stream error: {event['error'].get('message', data.decode())}")
+        completion_id = event.get("responseId", "")
+        for index, candidate in enumerate(event.get("candidates") or ()):
+            index = candidate.get("index", index)
+            text = get_candidate_text(candidate)
+            if text:
+                delta = {"role": "assistant", "content": text} if not role_sent else {"content": text}
+                role_sent = True
+                yield encode_chunk(completion_id, created, model_name, delta, index=index)
+            if candidate.get("finishReason"):
+                yield encode_chunk(completion_id, created, model_name, {}, FINISH_REASONS.get(candidate["finishReason"], "stop"), index=index)
+    yield SSE_DONE
 
 
 class GoogleGeminiAdapter(BaseProviderAdapter):
-    async def send_request(self, model_name: str, payload: Dict[str, Any]):
-        url = f"{self.base_url}/chat/completions"
-        headers = self.get_headers()
+    def get_url(self, model_name: str, stream: bool) -> str:
+        return f"{self.base_url}/models/{model_name}:streamGenerateContent?alt=sse" if stream else f"{self.base_url}/models/{model_name}:generateContent"
+
+    def encode_request(self, model_name: str, payload: Dict[str, Any], stream: bool) -> bytes:
+        return orjson.dumps(translate_request(payload))
+
+    def decode_response(self, content: bytes, model_name: str) -> Dict[str, Any]:
+        return translate_response(orjson.loads(content), model_name)
 
-        data = {"model": model_name, "prompt": payload.get("prompt", ""), "max_tokens_to_sample": payload.get("max_tokens", 100), **payload}
+    def translate_stream(self, chunks: AsyncIterator[bytes], model_name: str) -> AsyncIterator[bytes]:
+        return translate_events(chunks, model_name)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()
+    def get_headers(self) -> Dict[str, str]:
+        return {"x-goog-api-key": self.api_key, "Content-Type": "application/json"}
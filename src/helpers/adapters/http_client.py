@@ -0,0 +1,162 @@
+import importlib.util
+import logging
+import ssl
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+import httpx
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from src.helpers.utilities.custom.yaml_config import yamlConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTTP_CLIENT_CONFIG: Dict[str, Any] = {
+    "http2": True,
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "timeouts": {"connect": 5.0, "read": 60.0, "write": 10.0, "pool": 5.0},
+}
+
+# checked without importing h2: httpx only imports it once an HTTP/2 connection is opened
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def get_http_client_config(provider_name: str, http_clients: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve the pool settings of a provider from the `http_clients` section of models_catalog:
+    built-in defaults, overridden by `default`, overridden by the provider section.
+    """
+    http_clients = http_clients if http_clients is not None else yamlConfig.models_catalog.get("http_clients", {})
+    config = {**DEFAULT_HTTP_CLIENT_CONFIG, **(http_clients.get("default") or {}), **(http_clients.get(provider_name) or {})}
+    config["timeouts"] = {**DEFAULT_HTTP_CLIENT_CONFIG["timeouts"], **(config.get("timeouts") or {})}
+    return config
+
+
+@lru_cache(maxsize=1)
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    One verified SSL context shared by every provider client: loading the CA bundle costs
+    tens of milliseconds per client, which adds up across providers on every worker start.
+    """
+    return httpx.create_ssl_context()
+
+
+def build_http_client(provider_name: str, config: Dict[str, Any]) -> httpx.AsyncClient:
+    http2 = bool(config.get("http2"))
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning(f"HTTP/2 requested for provider '{provider_name}' but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+    timeouts = config["timeouts"]
+    return httpx.AsyncClient(
+        verify=get_ssl_context(),
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.get("max_connections"),
+            max_keepalive_connections=config.get("max_keepalive_connections"),
+            keepalive_expiry=config.get("keepalive_expiry"),
+        ),
+        timeout=httpx.Timeout(connect=timeouts.get("connect"), read=timeouts.get("read"), write=timeouts.get("write"), pool=timeouts.get("pool")),
+    )
+
+
+# --------------------------
+# HTTP Client Pool
+# --------------------------
+class HTTPClientPool:
+    """
+    Long-lived httpx clients keyed by provider name, so every upstream call reuses
+    pooled (and with HTTP/2, multiplexed) connections instead of a fresh handshake.
+    """
+
+    def __init__(self) -> None:
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.configs: Dict[str, Dict[str, Any]] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def open(self, provider_names: Iterable[str]) -> None:
+        for provider_name in provider_names:
+            self.get_client(provider_name)
+
+    def get_client(self, provider_name: str) -> httpx.AsyncClient:
+        client = self.clients.get(provider_name)
+        if client is None or client.is_closed:
+            config = get_http_client_config(provider_name)
+            client = build_http_client(provider_name, config)
+            self.clients[provider_name] = client
+            self.configs[provider_name] = config
+            self.in_flight.setdefault(provider_name, 0)
+        return client
+
+    @asynccontextmanager
+    async def track(self, provider_name: str) -> AsyncIterator[None]:
+        self.in_flight[provider_name] = self.in_flight.get(provider_name, 0) + 1
+        try:
+            yield
+        finally:
+            self.in_flight[provider_name] -= 1
+
+    async def close(self) -> None:
+        clients, self.clients = self.clients, {}
+        for provider_name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client for provider '{provider_name}': {e}")
+
+    def stats(self, provider_name: str) -> Dict[str, int]:
+        client = self.clients.get(provider_name)
+        connections = getattr(getattr(getattr(client, "_transport", None), "_pool", None), "connections", []) or []
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "active": len(connections) - idle,
+            "idle": idle,
+            "max": self.configs.get(provider_name, {}).get("max_connections") or 0,
+            "in_flight": self.in_flight.get(provider_name, 0),
+        }
+
+
+class HTTPClientPoolCollector(Collector):
+    """
+    Reports pool utilization on every /metrics scrape.
+    """
+
+    def __init__(self, pool: HTTPClientPool) -> None:
+        self.pool = pool
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        connections = GaugeMetricFamily("upstream_pool_connections", "Open upstream connections per provider", labels=["provider", "state"])
+        max_connections = GaugeMetricFamily("upstream_pool_max_connections", "Configured connection limit per provider", labels=["provider"])
+        in_flight = GaugeMetricFamily("upstream_requests_in_flight", "Upstream requests currently in flight per provider", labels=["provider"])
+        for provider_name in list(self.pool.clients):
+            stats = self.pool.stats(provider_name)
+            connections.add_metric([provider_name, "active"], stats["active"])
+            connections.add_metric([provider_name, "idle"], stats["idle"])
+            max_connections.add_metric([provider_name], stats["max"])
+            in_flight.add_metric([provider_name], stats["in_flight"])
+        yield connections
+        yield max_connections
+        yield in_flight
+
+
+# --------------------------
+# HTTP Client Pool Singleton
+# --------------------------
+http_client_pool = HTTPClientPool()
+REGISTRY.register(HTTPClientPoolCollector(http_client_pool))
+
+
+def initializing_http_clients(provider_names: Iterable[str]) -> HTTPClientPool:
+    http_client_pool.open(provider_names)
+    return http_client_pool
+
+
+def get_http_client(provider_name: str) -> httpx.AsyncClient:
+    return http_client_pool.get_client(provider_name)
+
+
+async def close_http_clients() -> None:
+    await http_client_pool.close()
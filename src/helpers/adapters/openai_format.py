@@ -0,0 +1,70 @@
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+import orjson
+
+SSE_DONE = b"data: [DONE]\n\n"
+
+
+def get_text_content(content: Any) -> str:
+    """
+    Text of an OpenAI message content: the string itself, or its text parts joined.
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part["text"] for part in content if isinstance(part, dict) and isinstance(part.get("text"), str))
+    return ""
+
+
+def split_data_url(url: str) -> Optional[Tuple[str, str]]:
+    """
+    (media type, base64 data) of a `data:<media type>;base64,<data>` URL, None for any other URL.
+    """
+    if not url.startswith("data:"):
+        return None
+    header, _, data = url.partition(",")
+    media_type, _, encoding = header[5:].partition(";")
+    return (media_type, data) if encoding == "base64" else None
+
+
+def get_image_url(part: Mapping[str, Any]) -> str:
+    image_url = part.get("image_url")
+    return image_url.get("url", "") if isinstance(image_url, dict) else image_url or ""
+
+
+def build_choice(index: int, content: str, finish_reason: Optional[str]) -> Dict[str, Any]:
+    return {"index": index, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}
+
+
+def build_completion(completion_id: str, created: int, model: str, choices: List[Dict[str, Any]], prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": choices,
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+def encode_chunk(completion_id: str, created: int, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None, index: int = 0) -> bytes:
+    """
+    One `chat.completion.chunk` SSE event.
+    """
+    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model, "choices": [{"index": index, "delta": delta, "finish_reason": finish_reason}]}
+    return b"data: " + orjson.dumps(chunk) + b"\n\n"
+
+
+async def iter_sse_data(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Payload of every `data:` line of an SSE byte stream, however the stream was split into chunks.
+    """
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk if pending else chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.startswith(b"data:"):
+                yield line[5:].strip()
+    if pending.startswith(b"data:"):
+        yield pending[5:].strip()
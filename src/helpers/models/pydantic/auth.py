@@ -1,11 +1,24 @@
-from typing import List
+from typing import FrozenSet
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RateLimits(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    requests_per_second: float = Field(default=0, description="Sustained request rate across all workers, 0 for unlimited")
+    burst: float = Field(default=0, description="Requests allowed in a burst above the sustained rate, defaults to one second of traffic")
+    tokens_per_minute: float = Field(default=0, description="Estimated prompt plus completion tokens per minute across all workers, 0 for unlimited")
+    quota_window_seconds: int = Field(default=86400, description="Window the request quota applies to")
 
 
 class Tenant(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Tenant unique identifier")
     api_key: str = Field(..., description="API key for authentication")
-    allowed_models: List[str] = Field(default_factory=list, description="List of models accessible to the tenant")
-    allowed_providers: List[str] = Field(default_factory=list, description="List of providers allowed for the tenant")
-    quota: int = Field(0, description="Quota limit for tenant requests")
+    allowed_models: FrozenSet[str] = Field(default_factory=frozenset, description="Set of models accessible to the tenant")
+    allowed_providers: FrozenSet[str] = Field(default_factory=frozenset, description="Set of providers allowed for the tenant")
+    quota: int = Field(0, description="Quota limit for tenant requests per quota window, 0 for unlimited")
+    rate_limits: RateLimits = Field(default=RateLimits(), description="Request and token rate limits for the tenant")
+    batch_concurrency: int = Field(default=16, description="Batch items of the tenant in flight at once, across all of its batches")
@@ -30,10 +30,30 @@ class EnvConfig:
     def app_workers(self) -> int:
         return int(os.getenv("APP_WORKERS", "1"))
 
+    @property
+    def process_pool_workers(self) -> int:
+        return int(os.getenv("PROCESS_POOL_WORKERS", "0"))
+
+    @property
+    def process_pool_warmup(self) -> bool:
+        return eval(os.getenv("PROCESS_POOL_WARMUP", "False"))
+
     @property
     def debug_logs_enabled(self) -> bool:
         return eval(os.getenv("DEBUG_LOGS_ENABLED", "False"))
 
+    @property
+    def http_log_sample_rate(self) -> float:
+        return float(os.getenv("HTTP_LOG_SAMPLE_RATE", "1.0"))
+
+    @property
+    def config_dir(self) -> str:
+        return os.getenv("CONFIG_DIR", "config")
+
+    @property
+    def upstream_base_url_override(self) -> str | None:
+        return os.getenv("UPSTREAM_BASE_URL_OVERRIDE") or None
+
     @property
     def openai_secret_key(self) -> str | None:
         return os.getenv("OPENAI_SECRET_KEY", None)
@@ -58,5 +78,53 @@ class EnvConfig:
     def partnerai_secret_key(self) -> str | None:
         return os.getenv("PARTNERAI_SECRET_KEY", None)
 
+    @property
+    def response_cache_backend(self) -> str:
+        return os.getenv("RESPONSE_CACHE_BACKEND", "none")
+
+    @property
+    def response_cache_max_entries(self) -> int:
+        return int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+
+    @property
+    def response_cache_max_bytes(self) -> int:
+        return int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    @property
+    def config_reload_interval_seconds(self) -> float:
+        return float(os.getenv("CONFIG_RELOAD_INTERVAL_SECONDS", "5"))
+
+    @property
+    def rate_limit_backend(self) -> str:
+        return os.getenv("RATE_LIMIT_BACKEND", "none")
+
+    @property
+    def request_journal_enabled(self) -> bool:
+        return eval(os.getenv("REQUEST_JOURNAL_ENABLED", "False"))
+
+    @property
+    def request_journal_path(self) -> str:
+        return os.getenv("REQUEST_JOURNAL_PATH", "logs/requests.jsonl")
+
+    @property
+    def request_journal_max_bytes(self) -> int:
+        return int(os.getenv("REQUEST_JOURNAL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    @property
+    def request_journal_rotate_seconds(self) -> float:
+        return float(os.getenv("REQUEST_JOURNAL_ROTATE_SECONDS", "3600"))
+
+    @property
+    def request_journal_backup_count(self) -> int:
+        return int(os.getenv("REQUEST_JOURNAL_BACKUP_COUNT", "24"))
+
+    @property
+    def request_journal_compression(self) -> str:
+        return os.getenv("REQUEST_JOURNAL_COMPRESSION", "none")
+
+    @property
+    def request_journal_queue_size(self) -> int:
+        return int(os.getenv("REQUEST_JOURNAL_QUEUE_SIZE", "10000"))
+
 
 envConfig = EnvConfig()
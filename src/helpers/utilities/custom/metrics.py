@@ -0,0 +1,31 @@
+from prometheus_client import Counter, Histogram
+
+# --------------------------
+# Streaming
+# --------------------------
+stream_ttft_seconds = Histogram(
+    "chat_stream_ttft_seconds",
+    "Time from routing a streamed completion to its first upstream byte, failover included",
+    ["provider", "model"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+stream_tokens_per_second = Histogram(
+    "chat_stream_tokens_per_second",
+    "Streamed completion throughput after the first byte",
+    ["provider", "model"],
+    buckets=(1, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+stream_tokens_total = Counter("chat_stream_tokens_total", "Streamed completion tokens relayed to clients", ["provider", "model"])
+
+# --------------------------
+# Tokens
+# --------------------------
+prompt_tokens_total = Counter("chat_prompt_tokens_total", "Prompt tokens of completions served upstream, from the provider's usage or estimated", ["tenant", "provider", "model", "source"])
+completion_tokens_total = Counter("chat_completion_tokens_total", "Completion tokens of completions served upstream, from the provider's usage or estimated", ["tenant", "provider", "model", "source"])
+prompt_tokens_estimated = Histogram(
+    "chat_prompt_tokens_estimated",
+    "Estimated prompt tokens of routed requests",
+    ["model"],
+    buckets=(256, 1024, 4096, 8192, 16384, 32768, 65536, 131072, 200000, 1000000),
+)
+routing_rejections_total = Counter("routing_rejections_total", "Requests rejected before any upstream call because no provider can serve them", ["tenant", "model", "reason"])
@@ -0,0 +1,107 @@
+import asyncio
+import importlib.util
+import logging
+from functools import lru_cache
+from typing import Any, Iterator, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# characters per token of each model family (series in models_catalog) for the heuristic estimate
+FAMILY_CHARS_PER_TOKEN = {"gpt": 4.0, "claude": 3.5, "gemini": 4.0}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+# role, separators and reply priming added per chat message
+MESSAGE_OVERHEAD_TOKENS = 4
+# exact BPE encodings, used when the optional `tiktoken` package is installed
+FAMILY_ENCODINGS = {"gpt": "cl100k_base"}
+# completion limit fields of OpenAI-style payloads
+MAX_TOKENS_FIELDS = ("max_tokens", "max_completion_tokens")
+# prompts longer than this are tokenized in a worker thread instead of on the event loop
+OFFLOAD_THRESHOLD_CHARS = 64 * 1024
+
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+
+def iter_prompt_texts(payload: Mapping[str, Any]) -> Iterator[str]:
+    """
+    Every piece of prompt text of a chat (`messages`, with string or text-part content) or completion (`prompt`) payload.
+    """
+    for message in payload.get("messages") or ():
+        if not isinstance(message, dict):
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            yield content
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and isinstance(part.get("text"), str):
+                    yield part["text"]
+    prompt = payload.get("prompt")
+    if isinstance(prompt, str):
+        yield prompt
+
+
+def get_prompt_chars(payload: Mapping[str, Any]) -> int:
+    return sum(len(text) for text in iter_prompt_texts(payload))
+
+
+def validate_max_completion_tokens(payload: Mapping[str, Any]) -> None:
+    """
+    Raise ValueError unless `max_tokens` and `max_completion_tokens` are absent, null or non-negative integers.
+    Called on client input before anything reads them with get_max_completion_tokens.
+    """
+    for field in MAX_TOKENS_FIELDS:
+        value = payload.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+            raise ValueError(f"'{field}' must be a non-negative integer")
+
+
+def get_max_completion_tokens(payload: Mapping[str, Any]) -> int:
+    return int(payload.get("max_tokens") or payload.get("max_completion_tokens") or 0)
+
+
+class TokenCounter:
+    """
+    Token estimator of one model family: exact with tiktoken where the family has a known encoding,
+    otherwise a characters-per-token heuristic, which costs one len() per message.
+    """
+
+    def __init__(self, family: Optional[str]):
+        self.family = family
+        self.chars_per_token = FAMILY_CHARS_PER_TOKEN.get(family or "", DEFAULT_CHARS_PER_TOKEN)
+        self.encoding: Any = None
+        encoding_name = FAMILY_ENCODINGS.get(family or "")
+        if encoding_name and TIKTOKEN_AVAILABLE:
+            try:
+                import tiktoken
+
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding '{encoding_name}' unavailable, estimating tokens for '{family}': {e}")
+
+    @property
+    def is_exact(self) -> bool:
+        return self.encoding is not None
+
+    def count_text(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return int(len(text) / self.chars_per_token + 0.5)
+
+    def count_prompt(self, payload: Mapping[str, Any]) -> int:
+        messages = payload.get("messages") or ()
+        return sum(self.count_text(text) for text in iter_prompt_texts(payload)) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(family: Optional[str]) -> TokenCounter:
+    return TokenCounter(family)
+
+
+async def count_prompt_tokens(family: Optional[str], payload: Mapping[str, Any]) -> int:
+    """
+    Prompt tokens of a payload; exact tokenization of large prompts runs off the event loop.
+    """
+    counter = get_token_counter(family)
+    if counter.is_exact and get_prompt_chars(payload) > OFFLOAD_THRESHOLD_CHARS:
+        return await asyncio.to_thread(counter.count_prompt, payload)
+    return counter.count_prompt(payload)
@@ -1,8 +1,11 @@
 import os
+from typing import Any, Dict, List
 
+from src.helpers.utilities.custom.env_var import envConfig
 from src.helpers.utilities.generic.yaml_loader import load_yaml_config
 
-CONFIG_DIR = "config"
+CONFIG_DIR = envConfig.config_dir
+CONFIG_FILES = ("models_catalog.yaml", "tenants.yaml", "routing_policies.yaml")
 
 
 class YAMLConfig:
@@ -25,19 +28,69 @@ def get_path(file_name: str) -> str:
     return os.path.join(CONFIG_DIR, file_name)
 
 
-def load_yaml_configs():
+def validate_yaml_configs(models_catalog: Dict[str, Any], tenants: Dict[str, Any], routing_policies: Dict[str, Any]) -> None:
     """
-    Load all required YAML config files into the YAMLConfig singleton.
+    Structural checks run before configs are applied, so a broken edit is rejected instead of half-applied.
+    Raises ValueError describing the first problem found.
+    """
+    for name, config in (("models_catalog", models_catalog), ("tenants", tenants), ("routing_policies", routing_policies)):
+        if not isinstance(config, dict):
+            raise ValueError(f"{name} must be a mapping")
+    for series_name, series_info in models_catalog.items():
+        if not isinstance(series_info, dict) or "models" not in series_info:
+            continue
+        for model in series_info.get("models") or []:
+            if not model.get("name"):
+                raise ValueError(f"Model without name in series '{series_name}'")
+            for provider in model.get("providers") or []:
+                if not provider.get("name") or not provider.get("base_url"):
+                    raise ValueError(f"Provider of model '{model['name']}' needs a name and base_url")
+    for tenant_key, tenant_data in tenants.items():
+        if not isinstance(tenant_data, dict) or not tenant_data.get("api_key"):
+            raise ValueError(f"Tenant '{tenant_key}' needs an api_key")
+    for policy_key, policy in routing_policies.items():
+        if not isinstance(policy, dict):
+            raise ValueError(f"Routing policy '{policy_key}' must be a mapping")
+
+
+def read_yaml_configs() -> Dict[str, Dict[str, Any]]:
+    """
+    Read and validate all required YAML config files without applying them.
     Raises RuntimeError on failure with appropriate message.
     """
     try:
         models_catalog_path = get_path("models_catalog.yaml")
         tenants_path = get_path("tenants.yaml")
         routing_path = get_path("routing_policies.yaml")
-        yamlConfig.models_catalog = load_yaml_config(models_catalog_path)
-        yamlConfig.tenants = load_yaml_config(tenants_path)
-        yamlConfig.routing_policies = load_yaml_config(routing_path)
+        configs = {
+            "models_catalog": load_yaml_config(models_catalog_path) or {},
+            "tenants": load_yaml_config(tenants_path) or {},
+            "routing_policies": load_yaml_config(routing_path) or {},
+        }
+        validate_yaml_configs(**configs)
+        return configs
     except FileNotFoundError as e:
         raise RuntimeError(f"Config file not found: {e.filename}")
     except Exception as e:
         raise RuntimeError(f"Error loading YAML config: {str(e)}")
+
+
+def apply_yaml_configs(configs: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Point the YAMLConfig singleton at freshly read configs; each attribute is replaced, never mutated.
+    """
+    yamlConfig.models_catalog = configs["models_catalog"]
+    yamlConfig.tenants = configs["tenants"]
+    yamlConfig.routing_policies = configs["routing_policies"]
+
+
+def get_config_paths() -> List[str]:
+    return [get_path(file_name) for file_name in CONFIG_FILES]
+
+
+def load_yaml_configs():
+    """
+    Load all required YAML config files into the YAMLConfig singleton.
+    Raises RuntimeError on failure with appropriate message.
+    """
+    apply_yaml_configs(read_yaml_configs())
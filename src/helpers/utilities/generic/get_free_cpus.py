@@ -1,15 +1,54 @@
-from typing import List
+import math
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
 
-import psutil
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def get_cgroup_cpu_quota(cgroup_root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPUs granted by the container's CFS quota (cgroup v2 `cpu.max`, or v1 `cpu.cfs_quota_us`), None when unlimited.
+    """
+    try:
+        quota, period = (cgroup_root / "cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota_us = int((cgroup_root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period_us = int((cgroup_root / "cpu" / "cpu.cfs_period_us").read_text())
+        return None if quota_us <= 0 else quota_us / period_us
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_cpus_count() -> int:
+    """
+    CPUs this process may actually use: its CPU affinity, capped by the cgroup quota.
+    Reads a few files once, without sampling load, so it is safe at import time and in every spawned child.
+    """
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        available = os.cpu_count() or 1
+    quota = get_cgroup_cpu_quota()
+    if quota is not None:
+        available = min(available, math.ceil(quota))
+    return max(1, available)
 
 
 def get_free_cpus(threshold: int = 10) -> List[int]:
+    """
+    CPUs below `threshold`% load. Blocks for a one second psutil sample, so never call it at import time.
+    """
+    import psutil
+
     cpu_usages = psutil.cpu_percent(interval=1, percpu=True)
     free_cpus = [i for i, usage in enumerate(cpu_usages) if usage < threshold]
     if len(free_cpus) < 4:
         return [0, 1, 2, 3]
     else:
         return free_cpus
-
-
-cpus_count = len(get_free_cpus())
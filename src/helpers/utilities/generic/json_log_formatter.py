@@ -0,0 +1,31 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import orjson
+
+# attributes every LogRecord has; anything else on a record came from `extra=`
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the record's `extra=` fields as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module,
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
@@ -1,61 +1,191 @@
 import asyncio
 import logging
-from multiprocessing.pool import Pool
-from typing import Any
+import os
+from collections import deque
+from functools import partial
+from itertools import islice
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Any, AsyncIterator, Callable, Deque, Iterable, Iterator, List, Optional
 
-from src.helpers.utilities.generic.get_free_cpus import cpus_count
+from src.helpers.utilities.custom.env_var import envConfig
+from src.helpers.utilities.generic.get_free_cpus import get_cpus_count
 
 logger = logging.getLogger(__name__)
 
+SHUTDOWN_TIMEOUT_SECONDS = 10.0
 
-def create_pool() -> Pool:
-    p = Pool(processes=cpus_count)
-    return p
 
+def get_worker_pid(_: Any) -> int:
+    return os.getpid()
 
+
+def run_coroutine(process_func: Callable[[Any], Any], arg: Any) -> Any:
+    """
+    Run an async function to completion inside a pool worker (module level, so it pickles under spawn).
+    """
+    return asyncio.run(process_func(arg))
+
+
+def run_chunk(process_func: Callable[[Any], Any], chunk: List[Any]) -> List[Any]:
+    return [process_func(arg) for arg in chunk]
+
+
+def _set_future_result(future: "asyncio.Future[Any]", result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_future_exception(future: "asyncio.Future[Any]", error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+
+def get_pool_size() -> int:
+    """
+    PROCESS_POOL_WORKERS, or the usable CPUs split across the uvicorn workers (each runs its own pool).
+    """
+    return envConfig.process_pool_workers or max(1, get_cpus_count() // max(1, envConfig.app_workers))
+
+
+# --------------------------
+# Process Pool
+# --------------------------
+class ProcessPool:
+    """
+    Long-lived multiprocessing pool. Under `spawn` every worker re-imports the application, so workers
+    are started once, on first use (or warmed up at startup with PROCESS_POOL_WARMUP), and then reused
+    for every offloaded call.
+    Async callers get asyncio futures resolved from the pool's result thread, so no thread is parked per call.
+    """
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.pool = Pool(processes=processes)
+
+    def warm_up(self) -> None:
+        """
+        Block until every worker has finished importing and answered a task.
+        """
+        pids = set(self.pool.map(get_worker_pid, range(self.processes * 4), chunksize=1))
+        logger.info(f"Process pool warmed up with {len(pids)}/{self.processes} workers answering")
+
+    def submit(self, process_func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self.pool.apply_async(
+            process_func,
+            args,
+            callback=lambda result: loop.call_soon_threadsafe(_set_future_result, future, result),
+            error_callback=lambda error: loop.call_soon_threadsafe(_set_future_exception, future, error),
+        )
+        return future
+
+    async def map(self, process_func: Callable[[Any], Any], args: Iterable[Any], chunksize: int = 16) -> List[Any]:
+        return [result async for result in self.imap_async(process_func, args, chunksize)]
+
+    def imap(self, process_func: Callable[[Any], Any], args: Iterable[Any], chunksize: int = 16) -> Iterator[Any]:
+        """
+        Blocking, ordered results streamed as chunks complete, for use outside the event loop.
+        """
+        return self.pool.imap(process_func, args, chunksize)
+
+    async def imap_async(self, process_func: Callable[[Any], Any], args: Iterable[Any], chunksize: int = 16, max_pending_chunks: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Ordered results streamed as chunks complete. At most `max_pending_chunks` chunks are queued in
+        the pool at once, so a long or lazy input is never materialised up front.
+        """
+        max_pending_chunks = max_pending_chunks or self.processes * 2
+        arg_iterator = iter(args)
+        pending: Deque[asyncio.Future[Any]] = deque()
+
+        def submit_next_chunk() -> bool:
+            chunk = list(islice(arg_iterator, chunksize))
+            if chunk:
+                pending.append(self.submit(run_chunk, process_func, chunk))
+            return bool(chunk)
+
+        try:
+            while len(pending) < max_pending_chunks and submit_next_chunk():
+                pass
+            while pending:
+                results = await pending.popleft()
+                submit_next_chunk()
+                for result in results:
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def close(self, timeout: float = SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Let queued tasks finish for up to `timeout` seconds, then terminate the workers.
+        """
+        self.pool.close()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.pool.join), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Process pool did not drain within {timeout}s, terminating workers")
+            self.pool.terminate()
+
+
+# --------------------------
+# Process Pool Singleton
+# --------------------------
+process_pool: Optional[ProcessPool] = None
+
+
+async def initializing_process_pool() -> ProcessPool:
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPool(get_pool_size())
+        await asyncio.to_thread(process_pool.warm_up)
+    return process_pool
+
+
+def get_process_pool() -> ProcessPool:
+    """
+    The shared pool, created without warm-up on first use unless PROCESS_POOL_WARMUP started it at startup.
+    """
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPool(get_pool_size())
+    return process_pool
+
+
+async def close_process_pool() -> None:
+    global process_pool
+    pool, process_pool = process_pool, None
+    if pool is not None:
+        await pool.close()
+
+
+# --------------------------
+# Pool helpers
+# --------------------------
 def create_process_in_pool(process_func: Any, args: Any) -> Any:
     try:
-        p = create_pool()
-        results = p.map(process_func, args)
-        p.close()
-        p.join()
-        return results
+        return get_process_pool().pool.map(process_func, args)
     except Exception as e:
-        logger.error(f"Error in creating process in pool: {e}")
+        logger.error(f"Error in running process in pool: {e}")
 
 
 def create_process_in_async_pool(process_func: Any, args: Any) -> Any:
     try:
-
-        def wrapper(doc: Any) -> Any:
-            return asyncio.run(process_func(doc))
-
-        p = create_pool()
-        results = p.map_async(wrapper, args)
-        p.close()
-        p.join()
-        return results.get()
+        return get_process_pool().pool.map(partial(run_coroutine, process_func), args)
     except Exception as e:
-        logger.error(f"Error in creating process in pool: {e}")
+        logger.error(f"Error in running process in pool: {e}")
 
 
-def create_process_in_starmap_async_pool(process_func: Any, args: Any) -> Any:
+def create_process_in_starmap_async_pool(process_func: Any, args: Any) -> Optional[AsyncResult]:
     try:
-        p = create_pool()
-        results = p.starmap_async(process_func, args)
-        p.close()
-        p.join()
-        return results
+        return get_process_pool().pool.starmap_async(process_func, args)
     except Exception as e:
-        logger.error(f"Error in creating process in pool: {e}")
+        logger.error(f"Error in running process in pool: {e}")
+        return None
 
 
 def create_process_in_starmap_pool(process_func: Any, args: Any) -> Any:
     try:
-        p = create_pool()
-        results = p.starmap(process_func, args)
-        p.close()
-        p.join()
-        return results
+        return get_process_pool().pool.starmap(process_func, args)
     except Exception as e:
-        logger.error(f"Error in creating process in pool: {e}")
+        logger.error(f"Error in running process in pool: {e}")
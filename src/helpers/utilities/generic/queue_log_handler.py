@@ -0,0 +1,19 @@
+import copy
+import logging
+from logging.handlers import QueueHandler
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process queue. The stdlib handler formats the exception into `msg` and drops
+    `exc_info`, which suits pickling to another process but leaves downstream formatters (JSONFormatter's
+    `exception` field) nothing to render. Here only the message arguments are merged; exception and stack
+    info travel with the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
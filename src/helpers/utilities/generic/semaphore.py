@@ -1,17 +1,20 @@
 import asyncio
+from collections import deque
+from typing import Deque, Optional
 
-import psutil
-
-from src.helpers.utilities.generic.get_free_cpus import cpus_count
+from src.helpers.utilities.generic.get_free_cpus import get_cpus_count
 
 
 def is_cpu_overloaded(threshold: int = 80) -> bool:
-    """Returns True if overall CPU usage is above the threshold %."""
-    return psutil.cpu_percent(interval=1) > threshold
+    """Returns True if overall CPU usage since the previous call is above the threshold %. Never blocks."""
+    import psutil
+
+    return psutil.cpu_percent(interval=None) > threshold
 
 
 def get_safe_io_limit(base_multiplier: int = 15, max_limit: int = 1000) -> int:
     """Dynamically calculates semaphore limit based on CPU usage."""
+    cpus_count = get_cpus_count()
     if is_cpu_overloaded():
         adjusted = int(cpus_count * (base_multiplier / 2))
     else:
@@ -19,6 +22,89 @@ def get_safe_io_limit(base_multiplier: int = 15, max_limit: int = 1000) -> int:
     return min(adjusted, max_limit)
 
 
-cpu_semaphore = asyncio.Semaphore(cpus_count)
-disk_semaphore = asyncio.Semaphore(get_safe_io_limit(base_multiplier=15, max_limit=200))
-network_semaphore = asyncio.Semaphore(get_safe_io_limit(base_multiplier=30, max_limit=400))
+# sized from CPU topology only: a load sample taken while the worker is still importing says nothing about later load
+cpu_semaphore = asyncio.Semaphore(get_cpus_count())
+disk_semaphore = asyncio.Semaphore(min(get_cpus_count() * 15, 200))
+network_semaphore = asyncio.Semaphore(min(get_cpus_count() * 30, 400))
+
+
+class SemaphoreQueueFull(Exception):
+    pass
+
+
+class SemaphoreQueueTimeout(Exception):
+    pass
+
+
+class AdaptiveSemaphore:
+    """
+    Semaphore whose limit adapts to the latency of the calls it guards (AIMD): every fast success
+    adds 1/limit (about +1 per round of calls) while the limit is actually in use, and every call
+    that is slower than `latency_tolerance` times the baseline, or that reports overload, multiplies
+    the limit by `backoff_ratio`. The baseline is the lowest latency seen, drifting slowly upwards so
+    a provider that becomes permanently slower is not penalised forever.
+    Waiters queue in FIFO order, at most `max_queue` of them. Only used from the event loop thread.
+    """
+
+    BASELINE_DRIFT = 1.01
+
+    def __init__(self, initial_limit: float, min_limit: float, max_limit: float, max_queue: int, backoff_ratio: float = 0.9, latency_tolerance: float = 2.0):
+        self.limit = float(initial_limit)
+        self.min_limit = max(1.0, float(min_limit))
+        self.max_limit = float(max_limit)
+        self.max_queue = max_queue
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.baseline_latency_ms: Optional[float] = None
+        self.waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Take a slot, queueing for at most `timeout` seconds. Raises SemaphoreQueueFull or SemaphoreQueueTimeout.
+        """
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+            return
+        if len(self.waiters) >= self.max_queue:
+            raise SemaphoreQueueFull()
+        if timeout is not None and timeout <= 0:
+            raise SemaphoreQueueTimeout()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise SemaphoreQueueTimeout() from None
+            raise
+
+    def release(self, latency_ms: Optional[float] = None, overloaded: bool = False) -> None:
+        """
+        Free a slot and adapt the limit from the call's outcome (no outcome: just free the slot).
+        """
+        limit_in_use = self.in_flight >= self.limit / 2
+        self.in_flight -= 1
+        if overloaded:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif latency_ms is not None:
+            baseline = self.baseline_latency_ms
+            self.baseline_latency_ms = latency_ms if baseline is None else min(latency_ms, baseline * self.BASELINE_DRIFT)
+            if baseline is not None and latency_ms > baseline * self.latency_tolerance:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            elif limit_in_use:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        while self.waiters and self.in_flight < int(self.limit):
+            waiter = self.waiters.popleft()
+            self.in_flight += 1
+            waiter.set_result(None)
@@ -1,5 +1,5 @@
 from concurrent.futures import ThreadPoolExecutor
 
-from src.helpers.utilities.generic.get_free_cpus import cpus_count
+from src.helpers.utilities.generic.get_free_cpus import get_cpus_count
 
-thread_executor = ThreadPoolExecutor(max_workers=cpus_count)
+thread_executor = ThreadPoolExecutor(max_workers=get_cpus_count())
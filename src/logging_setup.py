@@ -1,5 +1,13 @@
+import atexit
 import logging.config
 
-from src.config.logging import LOGGING_CONFIG
+from src.config.logging import LOGGING_CONFIG, QUEUE_HANDLERS
 
 logging.config.dictConfig(LOGGING_CONFIG)
+
+for handler_name in QUEUE_HANDLERS:
+    queue_handler = logging.getHandlerByName(handler_name)
+    listener = getattr(queue_handler, "listener", None)
+    if listener is not None:
+        listener.start()
+        atexit.register(listener.stop)  # drains queued records on shutdown
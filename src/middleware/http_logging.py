@@ -1,52 +1,73 @@
 import logging
+import random
 import time
+from typing import Any, Dict, FrozenSet, Iterable, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.helpers.utilities.custom.env_var import envConfig
 
 logger = logging.getLogger(__name__)
 
+REDACTED_HEADERS = frozenset({"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key", "api-key"})
+REDACTED = "[REDACTED]"
+
+
+def redact_headers(raw_headers: Iterable[tuple[bytes, bytes]], redacted: FrozenSet[str] = REDACTED_HEADERS) -> Dict[str, str]:
+    headers = {}
+    for raw_name, raw_value in raw_headers:
+        name = raw_name.decode("latin-1").lower()
+        headers[name] = REDACTED if name in redacted else raw_value.decode("latin-1")
+    return headers
+
 
-class HTTPLoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
+class HTTPLoggingMiddleware:
+    """
+    Pure ASGI request logging: one record per request once the response has been sent, without
+    wrapping the response body, so streamed responses pass through untouched.
+    Successful requests are logged with probability `sample_rate`; 4xx/5xx responses and
+    exceptions are always logged.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None, redacted_headers: FrozenSet[str] = REDACTED_HEADERS):
+        self.app = app
+        self.sample_rate = envConfig.http_log_sample_rate if sample_rate is None else sample_rate
+        self.redacted_headers = redacted_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         start_time = time.monotonic()
+        status_code = 500
 
-        # Log the incoming request details
-        logger.info(
-            "Request start",
-            extra={
-                "method": request.method,
-                "url": str(request.url),
-                "client": request.client.host if request.client else None,
-                "headers": dict(request.headers),
-            },
-        )
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception:
             # Log exception before propagating
-            logger.error(
-                "Request processing error",
-                exc_info=True,
-                extra={"method": request.method, "url": str(request.url)},
-            )
+            logger.error("Request processing error", exc_info=True, extra=self.request_fields(scope, start_time, status_code))
             raise
 
-        process_time = time.monotonic() - start_time
-
-        # Log the outgoing response details
-        logger.info(
-            "Request complete",
-            extra={
-                "method": request.method,
-                "url": str(request.url),
-                "status_code": response.status_code,
-                "process_time_ms": round(process_time * 1000, 2),
-            },
-        )
-        return response
+        if status_code < 400 and (self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate)):
+            return
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Request complete", extra=self.request_fields(scope, start_time, status_code))
+
+    def request_fields(self, scope: Scope, start_time: float, status_code: int) -> Dict[str, Any]:
+        client = scope.get("client")
+        return {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "client": client[0] if client else None,
+            "headers": redact_headers(scope["headers"], self.redacted_headers),
+            "status_code": status_code,
+            "process_time_ms": round((time.monotonic() - start_time) * 1000, 2),
+        }
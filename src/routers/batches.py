@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from src.services.auth import Tenant, authenticate_tenant
+from src.services.batches import batch_runner, spool_body
+from src.services.deadlines import get_requested_timeout
+
+router = APIRouter(prefix="/v1/batches", tags=["batches"])
+
+
+@router.post("")
+async def create_batch(request: Request, tenant: Tenant = Depends(authenticate_tenant)) -> StreamingResponse:
+    """
+    Batch chat completions.
+    Accepts a JSONL body, one chat request per line (bare, or as `{"custom_id": ..., "body": {...}}`),
+    and streams one NDJSON result per item as it completes: `{"id", "line", "status_code", "response" | "error"}`.
+    X-Request-Timeout applies to each item.
+    """
+    timeout = get_requested_timeout(request)
+    file = await spool_body(request)
+    return StreamingResponse(batch_runner.run(tenant, file, timeout), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,25 +1,49 @@
+from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import ORJSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
 from src.services.auth import Tenant, validate_model_for_tenant
+from src.services.deadlines import ClientDisconnected, cancel_on_disconnect, get_requested_timeout, requests_cancelled_total
+from src.services.journal import request_journal
+from src.services.payload import get_json_payload
 from src.services.route import get_model_router
 
 router = APIRouter(prefix="/v1/chat", tags=["chat"])
 
 
 @router.post("/completions")
-async def chat_completions(request: Request, tenant: Tenant = Depends(validate_model_for_tenant)) -> ORJSONResponse:
+async def chat_completions(request: Request, tenant: Tenant = Depends(validate_model_for_tenant), payload: Dict[str, Any] = Depends(get_json_payload)) -> Response:
     """
     Unified chat completions endpoint.
     Authenticates tenant, validates requested model,
     then routes to appropriate provider with failover.
+    With `stream: true` the upstream SSE stream is relayed as it arrives.
+    Upstream work stops at the request's deadline (X-Request-Timeout or the tenant policy) or when the client disconnects.
+    Every request is recorded in the request journal.
     """
+    model = payload.get("model")
+    entry = request_journal.begin(request.url.path, tenant.id, model, payload)
     try:
-        payload = await request.json()
-        model = payload.get("model")
+        timeout = get_requested_timeout(request)
         model_router = get_model_router()
-        response = await model_router.route_request(tenant_id=tenant.id, model_name=model, payload=payload)
+        if payload.get("stream"):
+            chunks = await cancel_on_disconnect(request, model_router.route_stream_request(tenant_id=tenant.id, model_name=model, payload=payload, timeout=timeout))
+            if entry is not None:
+                chunks = request_journal.track_stream(entry, chunks)
+            return StreamingResponse(chunks, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        response = await cancel_on_disconnect(request, model_router.route_request(tenant_id=tenant.id, model_name=model, payload=payload, timeout=timeout))
+        request_journal.finish(entry, 200)
         return ORJSONResponse(content=response)
+    except ClientDisconnected:
+        requests_cancelled_total.labels(tenant.id, model, "client_disconnect").inc()
+        request_journal.finish(entry, 499, "client_disconnect")
+        # nginx's "client closed request": nobody reads it, but access logs and metrics show the abandoned request
+        return Response(status_code=499)
+    except HTTPException as e:
+        request_journal.finish(entry, e.status_code, str(e.detail))
+        # routing and upstream errors carry their own status (400, 429, 502, 504...)
+        raise
     except Exception as e:
+        request_journal.finish(entry, 500, str(e))
         return ORJSONResponse(status_code=500, content={"error": str(e)})
@@ -1,37 +1,89 @@
-from typing import Optional
+import hashlib
+from typing import Any, Dict, Optional
 
-from fastapi import Depends, Header, HTTPException, Request
+from fastapi import Depends, Header, HTTPException
 
-from src.helpers.models.pydantic.auth import Tenant
+from src.helpers.models.pydantic.auth import RateLimits, Tenant
+from src.helpers.utilities.custom.tokens import validate_max_completion_tokens
 from src.helpers.utilities.custom.yaml_config import yamlConfig
+from src.services.payload import get_json_payload
+from src.services.rate_limit import rate_limiter
+from src.services.route import get_model_router
+from src.services.routing_index import RoutingIndex
 
 
-def find_tenant_by_api_key(api_key: str) -> Optional[Tenant]:
-    tenants = yamlConfig.tenants or {}
-    for tenant_key, tenant_data in tenants.items():
-        if tenant_data.get("api_key") == api_key:
-            allowed_models = tenant_data.get("allowed_models", [])
-            allowed_providers_set = set()
-            for model_name in allowed_models:
-                model_info = None
-                for series in yamlConfig.models_catalog.values():
-                    for model in series.get("models", []):
-                        if model.get("name") == model_name:
-                            model_info = model
-                            break
-                    if model_info:
-                        break
-                if model_info:
-                    for provider in model_info.get("providers", []):
-                        allowed_providers_set.add(provider["name"])
-            return Tenant(
+def hash_api_key(api_key: str) -> bytes:
+    return hashlib.sha256(api_key.encode("utf-8")).digest()
+
+
+# --------------------------
+# Tenant Index
+# --------------------------
+class TenantIndex:
+    """
+    API-key digest -> pre-built frozen Tenant, compiled once from tenants.yaml.
+    Keys are looked up by their sha256 digest, so lookup timing depends on the digest, never on the
+    key's bytes; comparing the digest again after a hit would add nothing.
+    """
+
+    def __init__(self, tenants_by_digest: Dict[bytes, Tenant]):
+        self.tenants_by_digest = tenants_by_digest
+
+    @classmethod
+    def build(cls, tenants: Dict[str, Any], routing_index: RoutingIndex) -> "TenantIndex":
+        tenants_by_digest: Dict[bytes, Tenant] = {}
+        for tenant_key, tenant_data in (tenants or {}).items():
+            api_key = tenant_data.get("api_key")
+            if not api_key:
+                continue
+            allowed_models = frozenset(tenant_data.get("allowed_models") or [])
+            allowed_providers = frozenset(provider_name for model_name in allowed_models for provider_name in routing_index.get_providers(model_name))
+            tenant = Tenant(
                 id=tenant_data.get("id", tenant_key),
                 api_key=api_key,
                 allowed_models=allowed_models,
-                allowed_providers=list(allowed_providers_set),
+                allowed_providers=allowed_providers,
                 quota=tenant_data.get("quota", 0),
+                rate_limits=RateLimits(**(tenant_data.get("rate_limits") or {})),
+                batch_concurrency=tenant_data.get("batch_concurrency", 16),
             )
-    return None
+            # first tenant declaring a key wins, matching the former linear scan
+            tenants_by_digest.setdefault(hash_api_key(api_key), tenant)
+        return cls(tenants_by_digest)
+
+    def find(self, api_key: str) -> Optional[Tenant]:
+        return self.tenants_by_digest.get(hash_api_key(api_key))
+
+
+# --------------------------
+# Tenant Index Singleton
+# --------------------------
+tenant_index: Optional[TenantIndex] = None
+
+
+def initializing_tenant_index() -> TenantIndex:
+    """
+    (Re)build the tenant index from the loaded configs and swap it in with a single assignment,
+    so concurrent lookups see either the old or the new index, never a partial one.
+    """
+    global tenant_index
+    tenant_index = TenantIndex.build(yamlConfig.tenants, get_model_router().routing_index)
+    return tenant_index
+
+
+def replace_tenant_index(index: TenantIndex) -> None:
+    global tenant_index
+    tenant_index = index
+
+
+def get_tenant_index() -> TenantIndex:
+    if not tenant_index:
+        return initializing_tenant_index()
+    return tenant_index
+
+
+def find_tenant_by_api_key(api_key: str) -> Optional[Tenant]:
+    return get_tenant_index().find(api_key)
 
 
 async def authenticate_tenant(authorization: str = Header(..., alias="Authorization")) -> Tenant:
@@ -44,15 +96,16 @@ async def authenticate_tenant(authorization: str = Header(..., alias="Authorizat
     return tenant
 
 
-async def validate_model_for_tenant(request: Request, tenant: Tenant = Depends(authenticate_tenant)) -> Tenant:
-    try:
-        body = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    requested_model = body.get("model")
+async def validate_model_for_tenant(tenant: Tenant = Depends(authenticate_tenant), payload: Dict[str, Any] = Depends(get_json_payload)) -> Tenant:
+    requested_model = payload.get("model")
     if not requested_model:
         raise HTTPException(status_code=400, detail="Model field is required in the request body")
     if requested_model not in tenant.allowed_models:
         raise HTTPException(status_code=403, detail=f"Model '{requested_model}' not allowed for tenant")
+    try:
+        validate_max_completion_tokens(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    # charged last, so a request rejected with 400 or 403 does not use up the tenant's limits
+    rate_limiter.check_request(tenant, payload)
     return tenant
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import tempfile
+import time
+from typing import IO, Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+import orjson
+from fastapi import HTTPException, Request
+from prometheus_client import Counter
+
+from src.helpers.models.pydantic.auth import Tenant
+from src.helpers.utilities.custom.tokens import validate_max_completion_tokens
+from src.services.journal import request_journal
+from src.services.rate_limit import rate_limiter
+from src.services.route import get_model_router
+
+logger = logging.getLogger(__name__)
+
+# the body is kept in memory up to this size and spilled to a temporary file beyond it
+SPOOL_MEMORY_BYTES = 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+ITEM_ID_FIELDS = ("custom_id", "request_id", "id")
+
+batch_items_total = Counter("batch_items_total", "Batch items completed, by HTTP status of the item", ["tenant", "status_code"])
+
+
+class BatchItemError(Exception):
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(str(detail))
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def spool_body(request: Request) -> IO[bytes]:
+    """
+    Copy the request body to a spooled temporary file, so a batch of any size is never held in memory
+    and is fully received before the response starts streaming.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    try:
+        async for chunk in request.stream():
+            file.write(chunk)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file  # type: ignore[return-value]
+
+
+async def iter_lines(file: IO[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    (1-based line number, line) for every non-blank line, reading the file in chunks.
+    """
+    line_number = 0
+    remainder = b""
+    while True:
+        chunk = file.read(READ_CHUNK_BYTES)
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop() if chunk else b""
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if not chunk:
+            return
+        # let other requests run between chunks of a large batch
+        await asyncio.sleep(0)
+
+
+def parse_item(line: bytes) -> Tuple[Any, Dict[str, Any]]:
+    """
+    (item id, chat payload) of one JSONL line: either `{"custom_id": ..., "body": {...}}` (also `request_id` or `id`)
+    or the chat payload itself.
+    """
+    try:
+        item = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        raise BatchItemError(400, "Invalid JSON line") from None
+    if not isinstance(item, dict):
+        raise BatchItemError(400, "Batch item must be a JSON object")
+    item_id = next((item[field] for field in ITEM_ID_FIELDS if field in item), None)
+    payload = item.get("body", item)
+    if not isinstance(payload, dict):
+        raise BatchItemError(400, "Batch item body must be a JSON object")
+    return item_id, payload
+
+
+async def run_item(tenant: Tenant, line_number: int, line: bytes, timeout: Optional[float]) -> bytes:
+    """
+    One batch item through the same checks and routing as /v1/chat/completions, as an NDJSON result line.
+    Items are never streamed; rate limits are waited for, within the item's deadline, rather than rejected.
+    """
+    item_id: Any = None
+    entry = None
+    try:
+        item_id, payload = parse_item(line)
+        model = payload.get("model")
+        entry = request_journal.begin("/v1/batches", tenant.id, model, payload)
+        if not model:
+            raise BatchItemError(400, "Model field is required in the request body")
+        if model not in tenant.allowed_models:
+            raise BatchItemError(403, f"Model '{model}' not allowed for tenant")
+        try:
+            validate_max_completion_tokens(payload)
+        except ValueError as e:
+            raise BatchItemError(400, str(e)) from None
+        if payload.get("stream"):
+            payload = {**payload, "stream": False}
+        started_at = time.monotonic()
+        await rate_limiter.acquire(tenant, payload, timeout)
+        if timeout is not None:
+            # time spent waiting for the rate limits counts against the item's deadline
+            timeout = max(0.0, timeout - (time.monotonic() - started_at))
+        response = await get_model_router().route_request(tenant_id=tenant.id, model_name=model, payload=payload, timeout=timeout)
+        result: Dict[str, Any] = {"id": item_id, "line": line_number, "status_code": 200, "response": response}
+    except (BatchItemError, HTTPException) as e:
+        result = {"id": item_id, "line": line_number, "status_code": e.status_code, "error": e.detail}
+    except Exception as e:
+        logger.error("Batch item failed", exc_info=True, extra={"tenant_id": tenant.id, "line": line_number})
+        result = {"id": item_id, "line": line_number, "status_code": 500, "error": str(e)}
+    batch_items_total.labels(tenant.id, str(result["status_code"])).inc()
+    request_journal.finish(entry, result["status_code"], None if result["status_code"] == 200 else str(result["error"]))
+    return orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE)
+
+
+# --------------------------
+# Batch Runner
+# --------------------------
+class BatchRunner:
+    """
+    Fans batch items out with at most `tenant.batch_concurrency` of a tenant's items in flight across all
+    of its batches. A slot is held until the item's result has been sent, so a slow reader pauses the batch
+    instead of buffering results: memory is bounded by the concurrency, not the batch size.
+    """
+
+    def __init__(self) -> None:
+        self.semaphores: Dict[Tuple[str, int], asyncio.Semaphore] = {}
+
+    def get_semaphore(self, tenant: Tenant) -> asyncio.Semaphore:
+        # a reload changing the limit starts a new semaphore; batches already running keep the old one
+        key = (tenant.id, max(1, tenant.batch_concurrency))
+        semaphore = self.semaphores.get(key)
+        if semaphore is None:
+            semaphore = self.semaphores[key] = asyncio.Semaphore(key[1])
+        return semaphore
+
+    async def run(self, tenant: Tenant, file: IO[bytes], timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """
+        NDJSON result lines in completion order. Closing the generator (client disconnect) cancels the items in flight.
+        """
+        semaphore = self.get_semaphore(tenant)
+        results: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        items: Set[asyncio.Task] = set()
+        held = 0
+
+        async def run_and_publish(line_number: int, line: bytes) -> None:
+            await results.put(await run_item(tenant, line_number, line, timeout))
+
+        async def produce() -> None:
+            nonlocal held
+            try:
+                async for line_number, line in iter_lines(file):
+                    await semaphore.acquire()
+                    held += 1
+                    task = asyncio.create_task(run_and_publish(line_number, line))
+                    items.add(task)
+                    task.add_done_callback(items.discard)
+                if items:
+                    await asyncio.gather(*items)
+            finally:
+                await results.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (result := await results.get()) is not None:
+                yield result
+                held -= 1
+                semaphore.release()
+            await producer
+        finally:
+            # release before awaiting anything: a cancelled response task may be cancelled again at every await
+            producer.cancel()
+            tasks = list(items)
+            for task in tasks:
+                task.cancel()
+            for _ in range(held):
+                semaphore.release()
+            file.close()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
+
+
+# --------------------------
+# Batch Runner Singleton
+# --------------------------
+batch_runner = BatchRunner()
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from prometheus_client import Counter
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from src.services.policy_settings import PolicySettingsCache
+from src.services.retries import is_request_error
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+WINDOW_BUCKETS = 10
+PROBE_INTERVAL_SECONDS = 1.0
+
+circuit_breaker_rejections_total = Counter("circuit_breaker_rejections_total", "Upstream attempts skipped because the provider circuit was open", ["provider"])
+circuit_breaker_transitions_total = Counter("circuit_breaker_transitions_total", "Circuit breaker state transitions", ["provider", "state"])
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, provider_name: str):
+        super().__init__(f"Circuit open for provider '{provider_name}'")
+        self.provider_name = provider_name
+
+
+@dataclass(frozen=True)
+class BreakerSettings:
+    """
+    Trip and recovery thresholds, read from `routing_criteria.circuit_breaker` of a routing policy.
+    """
+
+    failure_threshold: int = 5
+    error_rate_threshold: float = 0.5
+    window_seconds: float = 30.0
+    min_requests: int = 10
+    open_seconds: float = 30.0
+    half_open_max_calls: int = 1
+
+    @property
+    def label(self) -> str:
+        if self == DEFAULT_BREAKER_SETTINGS:
+            return "default"
+        return f"f{self.failure_threshold}-e{self.error_rate_threshold}-w{self.window_seconds:g}-o{self.open_seconds:g}"
+
+
+DEFAULT_BREAKER_SETTINGS = BreakerSettings()
+
+
+# --------------------------
+# Circuit Breaker
+# --------------------------
+class CircuitBreaker:
+    """
+    Closed -> open on `failure_threshold` consecutive failures, or when the error rate over the
+    rolling window reaches `error_rate_threshold` with at least `min_requests` calls.
+    Open providers are skipped without a network call. Once `open_seconds` pass, a background
+    probe (or, without one, the next request) moves the breaker to half-open, where up to
+    `half_open_max_calls` live requests decide between closing and re-opening it.
+    Only used from the event loop thread.
+    """
+
+    def __init__(self, provider_name: str, settings: BreakerSettings):
+        self.provider_name = provider_name
+        self.settings = settings
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.half_open_calls = 0
+        # bumped on every move to half-open, so a slot is only ever given back to the period that granted it
+        self.half_open_period = 0
+        self.bucket_seconds = settings.window_seconds / WINDOW_BUCKETS
+        # (bucket start, successes, failures) per bucket slot
+        self.buckets: List[List[float]] = [[0.0, 0, 0] for _ in range(WINDOW_BUCKETS)]
+
+    def _bucket(self, now: float) -> List[float]:
+        start = now - now % self.bucket_seconds
+        bucket = self.buckets[int(now / self.bucket_seconds) % WINDOW_BUCKETS]
+        if bucket[0] != start:
+            bucket[0], bucket[1], bucket[2] = start, 0, 0
+        return bucket
+
+    def _window_counts(self, now: float) -> Tuple[int, int]:
+        horizon = now - self.settings.window_seconds
+        successes = failures = 0
+        for start, bucket_successes, bucket_failures in self.buckets:
+            if start > horizon:
+                successes += int(bucket_successes)
+                failures += int(bucket_failures)
+        return successes, failures
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker for provider '{self.provider_name}' ({self.settings.label}) {self.state} -> {state}")
+        self.state = state
+        self.half_open_calls = 0
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        elif state == CLOSED:
+            self.consecutive_failures = 0
+            self.buckets = [[0.0, 0, 0] for _ in range(WINDOW_BUCKETS)]
+        elif state == HALF_OPEN:
+            self.half_open_period += 1
+        circuit_breaker_transitions_total.labels(self.provider_name, state).inc()
+
+    def cooldown_elapsed(self) -> bool:
+        return time.monotonic() - self.opened_at >= self.settings.open_seconds
+
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow_request(self, background_probing: bool = False) -> bool:
+        if self.state == OPEN:
+            if background_probing or not self.cooldown_elapsed():
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self.half_open_calls >= self.settings.half_open_max_calls:
+                return False
+            self.half_open_calls += 1
+        return True
+
+    def record_success(self) -> None:
+        self._bucket(time.monotonic())[1] += 1
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        self._bucket(now)[2] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+        if self.state == OPEN:
+            return
+        if self.consecutive_failures >= self.settings.failure_threshold:
+            self._transition(OPEN)
+            return
+        successes, failures = self._window_counts(now)
+        total = successes + failures
+        if total >= self.settings.min_requests and failures / total >= self.settings.error_rate_threshold:
+            self._transition(OPEN)
+
+    def enter_half_open(self) -> None:
+        if self.state == OPEN:
+            self._transition(HALF_OPEN)
+
+    def reopen(self) -> None:
+        """
+        Restart the open period after a failed probe.
+        """
+        if self.state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def half_open_slot(self) -> Optional[int]:
+        """
+        The half-open period whose slot the request just allowed holds, or None if it was allowed while
+        closed and holds none. Read right after allow_request.
+        """
+        return self.half_open_period if self.state == HALF_OPEN else None
+
+    def release(self, slot: Optional[int]) -> None:
+        """
+        Give back a half-open slot without an outcome (the call was cancelled). `slot` comes from
+        half_open_slot(): a call that took no slot, or took one in an earlier half-open period, gives nothing back.
+        """
+        if slot is not None and slot == self.half_open_period and self.state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    @contextmanager
+    def track(self, slot: Optional[int]) -> Iterator[None]:
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.release(slot)
+            raise
+        except Exception as e:
+            # the provider answered; the request itself was invalid
+            if is_request_error(e):
+                self.record_success()
+            else:
+                self.record_failure()
+            raise
+        else:
+            self.record_success()
+
+
+# --------------------------
+# Circuit Breaker Registry
+# --------------------------
+class CircuitBreakerRegistry:
+    """
+    Breakers keyed by (provider, settings): every policy using the same thresholds shares the
+    provider's breaker and its failure signal, while a tenant policy with custom thresholds gets its own.
+    """
+
+    def __init__(self) -> None:
+        self.breakers: Dict[Tuple[str, BreakerSettings], CircuitBreaker] = {}
+        self.settings_cache = PolicySettingsCache(DEFAULT_BREAKER_SETTINGS)
+        self.probe: Optional[Callable[[str], Awaitable[bool]]] = None
+        self.probe_task: Optional[asyncio.Task] = None
+
+    def get_settings(self, policy: Mapping[str, Any]) -> BreakerSettings:
+        return self.settings_cache.get((policy.get("routing_criteria") or {}).get("circuit_breaker"))
+
+    def get(self, provider_name: str, policy: Mapping[str, Any]) -> CircuitBreaker:
+        settings = self.get_settings(policy)
+        breaker = self.breakers.get((provider_name, settings))
+        if breaker is None:
+            breaker = self.breakers[(provider_name, settings)] = CircuitBreaker(provider_name, settings)
+        return breaker
+
+    def allow_request(self, breaker: CircuitBreaker) -> bool:
+        allowed = breaker.allow_request(background_probing=self.probe_task is not None)
+        if not allowed:
+            circuit_breaker_rejections_total.labels(breaker.provider_name).inc()
+        return allowed
+
+    def start_probing(self, probe: Callable[[str], Awaitable[bool]]) -> None:
+        self.probe = probe
+        if self.probe_task is None:
+            self.probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop_probing(self) -> None:
+        task, self.probe_task = self.probe_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+            due = [breaker for breaker in list(self.breakers.values()) if breaker.is_open() and breaker.cooldown_elapsed()]
+            for provider_name in {breaker.provider_name for breaker in due}:
+                try:
+                    reachable = bool(self.probe and await self.probe(provider_name))
+                except Exception as e:
+                    logger.error(f"Circuit breaker probe for provider '{provider_name}' failed: {e}")
+                    reachable = False
+                for breaker in due:
+                    if breaker.provider_name != provider_name:
+                        continue
+                    if reachable:
+                        breaker.enter_half_open()
+                    else:
+                        breaker.reopen()
+
+
+class CircuitBreakerCollector(Collector):
+    """
+    Reports breaker states on every /metrics scrape (0 closed, 1 half-open, 2 open).
+    """
+
+    def __init__(self, registry: CircuitBreakerRegistry) -> None:
+        self.registry = registry
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        state = GaugeMetricFamily("circuit_breaker_state", "Circuit breaker state per provider (0 closed, 1 half-open, 2 open)", labels=["provider", "settings"])
+        for (provider_name, settings), breaker in list(self.registry.breakers.items()):
+            state.add_metric([provider_name, settings.label], STATE_VALUES[breaker.state])
+        yield state
+
+
+# --------------------------
+# Circuit Breaker Registry Singleton
+# --------------------------
+circuit_breakers = CircuitBreakerRegistry()
+REGISTRY.register(CircuitBreakerCollector(circuit_breakers))
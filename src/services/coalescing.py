@@ -0,0 +1,93 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+
+from prometheus_client import Counter, Gauge
+
+from src.services.journal import current_entry, record_coalesced
+from src.services.policy_settings import PolicySettingsCache
+
+coalesced_requests_total = Counter("coalesced_requests_total", "Requests that joined an identical in-flight upstream call instead of starting their own", ["tenant"])
+coalescing_saved_upstream_calls_total = Counter("coalescing_saved_upstream_calls_total", "Upstream calls saved by coalesced requests that received the shared response", ["tenant"])
+coalescing_in_flight = Gauge("coalescing_in_flight", "Distinct upstream calls currently shared through request coalescing")
+
+
+@dataclass(frozen=True)
+class CoalescingSettings:
+    """
+    Read from the `coalescing` section of a routing policy. By default only deterministic
+    requests (see `is_cacheable`) are coalesced, since sampled completions are expected to differ.
+    """
+
+    enabled: bool = False
+    deterministic_only: bool = True
+
+
+DISABLED_COALESCING = CoalescingSettings()
+
+
+class Flight:
+    __slots__ = ("task", "waiters", "entry")
+
+    def __init__(self, task: "asyncio.Task[Dict[str, Any]]"):
+        self.task = task
+        self.waiters = 0
+        # journal entry of the leading request, whose context the call runs in and records its attempts on
+        self.entry = current_entry.get()
+
+
+# --------------------------
+# Request Coalescer
+# --------------------------
+class RequestCoalescer:
+    """
+    Single-flight: concurrent calls with the same key share one upstream call and all receive its
+    response (or its exception). The call runs in its own task, so one caller disconnecting does not
+    cancel it for the others; it is only cancelled once every caller is gone. The call runs under the
+    leader's deadline, and each caller stops waiting at its own (`timeout`, raising TimeoutError).
+    The shared response object is returned to every caller and must be treated as read-only.
+    """
+
+    def __init__(self) -> None:
+        self.flights: Dict[str, Flight] = {}
+        self.settings_cache = PolicySettingsCache(DISABLED_COALESCING)
+
+    def get_settings(self, policy: Mapping[str, Any]) -> CoalescingSettings:
+        return self.settings_cache.get(policy.get("coalescing"))
+
+    async def run(self, tenant_id: str, key: str, call: Callable[[], Awaitable[Dict[str, Any]]], timeout: Optional[float] = None) -> Dict[str, Any]:
+        flight = self.flights.get(key)
+        joined = flight is not None
+        if flight is None:
+            flight = self.flights[key] = Flight(asyncio.ensure_future(call()))
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            coalescing_in_flight.inc()
+        else:
+            coalesced_requests_total.labels(tenant_id).inc()
+
+        flight.waiters += 1
+        try:
+            response = await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        except (asyncio.CancelledError, TimeoutError):
+            flight.waiters -= 1
+            if not flight.waiters:
+                flight.task.cancel()
+            raise
+        finally:
+            if joined:
+                record_coalesced(flight.entry)
+        flight.waiters -= 1
+        if joined:
+            coalescing_saved_upstream_calls_total.labels(tenant_id).inc()
+        return response
+
+    def _finish(self, key: str, flight: Flight) -> None:
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+        coalescing_in_flight.dec()
+
+
+# --------------------------
+# Request Coalescer Singleton
+# --------------------------
+request_coalescer = RequestCoalescer()
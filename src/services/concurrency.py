@@ -0,0 +1,147 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Mapping, Optional, Tuple
+
+import httpx
+from prometheus_client import Counter
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from src.helpers.utilities.custom.yaml_config import yamlConfig
+from src.helpers.utilities.generic.semaphore import AdaptiveSemaphore, SemaphoreQueueFull, SemaphoreQueueTimeout
+from src.services.policy_settings import PolicySettingsCache, settings_from_config
+
+OVERLOAD_STATUS_CODES = frozenset({429, 503})
+
+upstream_concurrency_shed_total = Counter("upstream_concurrency_shed_total", "Upstream attempts shed by the adaptive concurrency limiter", ["provider", "reason"])
+
+
+class ProviderOverloadedError(Exception):
+    def __init__(self, provider_name: str, reason: str):
+        super().__init__(f"Provider '{provider_name}' is at its concurrency limit ({reason})")
+        self.provider_name = provider_name
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class ConcurrencySettings:
+    """
+    Read from the `concurrency` section of models_catalog: `default`, overridden per provider.
+    """
+
+    initial_limit: float = 20
+    min_limit: float = 1
+    max_limit: float = 200
+    backoff_ratio: float = 0.9
+    latency_tolerance: float = 2.0
+    max_queue: int = 100
+    max_queue_wait_ms: float = 1000.0
+
+
+DEFAULT_CONCURRENCY_SETTINGS = ConcurrencySettings()
+
+
+def parse_concurrency_config(config: Mapping[str, Any]) -> Dict[str, ConcurrencySettings]:
+    """
+    Settings of `default` and of every provider named in the section, each provider's overriding `default`.
+    """
+    default = config.get("default") or {}
+    return {name: settings_from_config(ConcurrencySettings, {**default, **(section or {})}) for name, section in config.items()}
+
+
+def is_overload(error: BaseException) -> bool:
+    """
+    Errors that mean the provider is saturated, as opposed to a bad request.
+    """
+    if isinstance(error, httpx.TimeoutException):
+        return True
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in OVERLOAD_STATUS_CODES
+
+
+# --------------------------
+# Concurrency Limiter Registry
+# --------------------------
+class ConcurrencyLimiterRegistry:
+    """
+    One adaptive semaphore per provider, shared by every tenant and model routed to it.
+    A config reload with new settings starts a fresh limiter; calls holding the old one release into it.
+    """
+
+    def __init__(self) -> None:
+        self.limiters: Dict[str, Tuple[ConcurrencySettings, AdaptiveSemaphore]] = {}
+        self.settings_cache: PolicySettingsCache[Dict[str, ConcurrencySettings]] = PolicySettingsCache({}, parse_concurrency_config)
+
+    def get_settings(self, provider_name: str) -> ConcurrencySettings:
+        settings = self.settings_cache.get(yamlConfig.models_catalog.get("concurrency"))
+        return settings.get(provider_name) or settings.get("default") or DEFAULT_CONCURRENCY_SETTINGS
+
+    def get(self, provider_name: str) -> AdaptiveSemaphore:
+        settings = self.get_settings(provider_name)
+        entry = self.limiters.get(provider_name)
+        if entry is None or entry[0] != settings:
+            semaphore = AdaptiveSemaphore(settings.initial_limit, settings.min_limit, settings.max_limit, settings.max_queue, settings.backoff_ratio, settings.latency_tolerance)
+            entry = self.limiters[provider_name] = (settings, semaphore)
+        return entry[1]
+
+    @asynccontextmanager
+    async def limit(self, provider_name: str, budget_seconds: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot of the provider for the duration of an upstream call.
+        Queue wait is bounded by `max_queue_wait_ms` and by the request's remaining budget;
+        when either runs out (or the queue is full) the attempt is shed with ProviderOverloadedError.
+        """
+        settings = self.get_settings(provider_name)
+        semaphore = self.get(provider_name)
+        timeout = settings.max_queue_wait_ms / 1000
+        if budget_seconds is not None:
+            timeout = min(timeout, budget_seconds)
+        try:
+            await semaphore.acquire(timeout)
+        except SemaphoreQueueFull:
+            upstream_concurrency_shed_total.labels(provider_name, "queue_full").inc()
+            raise ProviderOverloadedError(provider_name, "queue full") from None
+        except SemaphoreQueueTimeout:
+            upstream_concurrency_shed_total.labels(provider_name, "queue_timeout").inc()
+            raise ProviderOverloadedError(provider_name, "queue wait exceeded") from None
+
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            semaphore.release()
+            raise
+        except Exception as e:
+            semaphore.release(overloaded=is_overload(e))
+            raise
+        else:
+            semaphore.release((time.monotonic() - start) * 1000)
+
+
+class ConcurrencyLimiterCollector(Collector):
+    """
+    Reports the adaptive limits and queue depths on every /metrics scrape.
+    """
+
+    def __init__(self, registry: ConcurrencyLimiterRegistry) -> None:
+        self.registry = registry
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        limit = GaugeMetricFamily("upstream_concurrency_limit", "Current adaptive concurrency limit per provider", labels=["provider"])
+        in_flight = GaugeMetricFamily("upstream_concurrency_in_flight", "Upstream calls holding a concurrency slot", labels=["provider"])
+        queue_depth = GaugeMetricFamily("upstream_concurrency_queue_depth", "Upstream calls waiting for a concurrency slot", labels=["provider"])
+        for provider_name, (_, semaphore) in list(self.registry.limiters.items()):
+            limit.add_metric([provider_name], semaphore.limit)
+            in_flight.add_metric([provider_name], semaphore.in_flight)
+            queue_depth.add_metric([provider_name], semaphore.queue_depth)
+        yield limit
+        yield in_flight
+        yield queue_depth
+
+
+# --------------------------
+# Concurrency Limiter Registry Singleton
+# --------------------------
+concurrency_limiters = ConcurrencyLimiterRegistry()
+REGISTRY.register(ConcurrencyLimiterCollector(concurrency_limiters))
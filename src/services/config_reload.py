@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import signal
+from typing import Any, Dict, Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from src.helpers.utilities.custom.env_var import envConfig
+from src.helpers.utilities.custom.yaml_config import apply_yaml_configs, get_config_paths, read_yaml_configs
+from src.services.auth import TenantIndex, replace_tenant_index
+from src.services.route import ModelRouter, replace_model_router
+
+logger = logging.getLogger(__name__)
+
+RELOAD_SETTLE_SECONDS = 0.2
+
+config_reloads_total = Counter("config_reloads_total", "Config reload attempts", ["result"])
+config_last_reload_timestamp = Gauge("config_last_reload_timestamp_seconds", "Unix time of the last successful config reload")
+
+
+def build_config_snapshot() -> Tuple[Dict[str, Dict[str, Any]], ModelRouter, TenantIndex]:
+    """
+    Read, validate and compile everything derived from the YAML configs. Runs in a worker
+    thread and touches no live state, so a failure leaves the running snapshot untouched.
+    """
+    configs = read_yaml_configs()
+    router = ModelRouter(models_catalog=configs["models_catalog"], routing_policies=configs["routing_policies"])
+    tenant_index = TenantIndex.build(configs["tenants"], router.routing_index)
+    return configs, router, tenant_index
+
+
+# --------------------------
+# Config Reloader
+# --------------------------
+class ConfigReloader:
+    """
+    Reloads the YAML configs when their files change (mtime polling) or on SIGHUP to a worker,
+    without restarting it. Indexes are rebuilt off the event loop and then swapped in with plain
+    reference assignments and no await in between; requests already holding the previous router
+    or tenant index finish on that consistent snapshot. Upstream HTTP client pools are not rebuilt.
+    """
+
+    def __init__(self, poll_interval_seconds: float):
+        self.poll_interval_seconds = poll_interval_seconds
+        self.mtimes = self.read_mtimes()
+        self.lock = asyncio.Lock()
+        self.watch_task: Optional[asyncio.Task] = None
+        self.signal_tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def read_mtimes() -> Dict[str, float]:
+        mtimes = {}
+        for path in get_config_paths():
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = 0.0
+        return mtimes
+
+    async def reload(self) -> bool:
+        async with self.lock:
+            self.mtimes = self.read_mtimes()
+            try:
+                configs, router, tenant_index = await asyncio.to_thread(build_config_snapshot)
+            except Exception as e:
+                config_reloads_total.labels("failed").inc()
+                logger.error(f"Config reload rejected, keeping the running config: {e}")
+                return False
+            apply_yaml_configs(configs)
+            replace_model_router(router)
+            replace_tenant_index(tenant_index)
+            config_reloads_total.labels("success").inc()
+            config_last_reload_timestamp.set_to_current_time()
+            logger.info("Config reloaded")
+            return True
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.on_signal)
+        except (AttributeError, NotImplementedError, RuntimeError) as e:
+            logger.info(f"SIGHUP config reload not available: {e}")
+        if self.poll_interval_seconds > 0 and self.watch_task is None:
+            self.watch_task = asyncio.create_task(self.watch())
+
+    async def stop(self) -> None:
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
+        task, self.watch_task = self.watch_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def on_signal(self) -> None:
+        logger.info("SIGHUP received, reloading config")
+        task = asyncio.create_task(self.reload())
+        self.signal_tasks.add(task)
+        task.add_done_callback(self.signal_tasks.discard)
+
+    async def watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            if self.read_mtimes() != self.mtimes:
+                # let editors finish writing every file before reading them
+                await asyncio.sleep(RELOAD_SETTLE_SECONDS)
+                await self.reload()
+
+
+# --------------------------
+# Config Reloader Singleton
+# --------------------------
+config_reloader: Optional[ConfigReloader] = None
+
+
+def start_config_reloader() -> ConfigReloader:
+    global config_reloader
+    if not config_reloader:
+        config_reloader = ConfigReloader(envConfig.config_reload_interval_seconds)
+    config_reloader.start()
+    return config_reloader
+
+
+async def stop_config_reloader() -> None:
+    if config_reloader:
+        await config_reloader.stop()
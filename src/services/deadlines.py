@@ -0,0 +1,146 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Mapping, Optional, TypeVar
+
+import httpx
+from fastapi import HTTPException, Request
+from prometheus_client import Counter
+
+from src.helpers.adapters.base import PhaseTimeout, PhaseTimeouts
+from src.services.policy_settings import PolicySettingsCache
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+upstream_timeouts_total = Counter("upstream_timeouts_total", "Upstream attempts that ran out of time, by phase (connect, ttfb, read or the attempt's total budget)", ["provider", "phase"])
+upstream_attempts_cancelled_total = Counter("upstream_attempts_cancelled_total", "Upstream attempts cancelled in flight (client disconnect, deadline or a losing hedge)", ["provider"])
+requests_cancelled_total = Counter("requests_cancelled_total", "Requests whose upstream work was abandoned, by reason (deadline or client_disconnect)", ["tenant", "model", "reason"])
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class DeadlineSettings:
+    """
+    Read from the `deadline` section of a routing policy. A request gets `timeout_seconds`, or the client's
+    X-Request-Timeout capped at `max_timeout_seconds`, and that budget is split across its failover attempts
+    (never below `min_attempt_seconds`). Each attempt's connect, time-to-first-byte and read phases are capped too.
+    Streams are bounded up to their first chunk; after that only the read timeout between chunks applies.
+    """
+
+    timeout_seconds: float = 60.0
+    max_timeout_seconds: float = 300.0
+    min_attempt_seconds: float = 1.0
+    connect_timeout_seconds: float = 5.0
+    ttfb_timeout_seconds: float = 30.0
+    read_timeout_seconds: float = 60.0
+
+
+DEFAULT_DEADLINE = DeadlineSettings()
+
+
+class Deadline:
+    __slots__ = ("settings", "timeout", "expires_at")
+
+    def __init__(self, settings: DeadlineSettings, timeout: float):
+        self.settings = settings
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def attempt_timeouts(self, attempts_left: int) -> PhaseTimeouts:
+        """
+        An even share of the remaining budget for the next attempt; attempts that fail fast leave their share to the rest.
+        """
+        remaining = self.remaining()
+        budget = min(remaining, max(self.settings.min_attempt_seconds, remaining / max(1, attempts_left)))
+        return PhaseTimeouts(
+            connect=min(self.settings.connect_timeout_seconds, budget),
+            ttfb=min(self.settings.ttfb_timeout_seconds, budget),
+            read=min(self.settings.read_timeout_seconds, budget),
+            total=budget,
+        )
+
+
+def get_requested_timeout(request: Request) -> Optional[float]:
+    """
+    The client's deadline from the X-Request-Timeout header, in seconds.
+    """
+    value = request.headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{DEADLINE_HEADER} must be a number of seconds") from None
+
+
+def get_timeout_phase(error: BaseException) -> Optional[str]:
+    if isinstance(error, PhaseTimeout):
+        return error.phase
+    if isinstance(error, (httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return "connect"
+    if isinstance(error, httpx.TimeoutException):
+        return "read"
+    return None
+
+
+# --------------------------
+# Deadline Registry
+# --------------------------
+class DeadlineRegistry:
+    def __init__(self) -> None:
+        self.settings_cache = PolicySettingsCache(DEFAULT_DEADLINE)
+
+    def get_settings(self, policy: Mapping[str, Any]) -> DeadlineSettings:
+        return self.settings_cache.get(policy.get("deadline"))
+
+    def start(self, policy: Mapping[str, Any], requested_timeout: Optional[float] = None) -> Deadline:
+        settings = self.get_settings(policy)
+        timeout = min(requested_timeout, settings.max_timeout_seconds) if requested_timeout and requested_timeout > 0 else settings.timeout_seconds
+        return Deadline(settings, timeout)
+
+
+deadline_registry = DeadlineRegistry()
+
+
+# --------------------------
+# Client disconnects
+# --------------------------
+async def wait_for_disconnect(request: Request) -> None:
+    """
+    Return once the client has gone away; only valid after the request body has been read.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await `awaitable`, cancelling it (and the upstream calls it made) if the client disconnects first.
+    Raises ClientDisconnected in that case.
+    """
+    task = asyncio.ensure_future(awaitable)
+    disconnect = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait((task, disconnect), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if task not in done:
+        raise ClientDisconnected()
+    return task.result()
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from prometheus_client import Counter
+
+from src.services.policy_settings import PolicySettingsCache
+
+hedge_requests_total = Counter("hedge_requests_total", "Hedged upstream attempts fired after the hedge delay", ["tenant", "provider"])
+hedge_wins_total = Counter("hedge_wins_total", "Hedged requests answered first by the hedge rather than the primary", ["tenant", "provider"])
+hedge_budget_exhausted_total = Counter("hedge_budget_exhausted_total", "Hedges not fired because the tenant hedge budget was empty", ["tenant"])
+
+
+@dataclass(frozen=True)
+class HedgingSettings:
+    """
+    Read from `routing_criteria.hedging` of a routing policy.
+    The hedge fires once the primary has been pending for its observed `delay_percentile` latency
+    (or `delay_ms` until enough samples exist). `max_hedge_ratio` caps hedges to that fraction of the
+    tenant's requests, with up to `burst` hedges banked.
+    """
+
+    enabled: bool = False
+    delay_percentile: float = 90.0
+    delay_ms: float = 500.0
+    min_delay_ms: float = 10.0
+    max_hedges: int = 1
+    max_hedge_ratio: float = 0.1
+    burst: float = 10.0
+
+
+DISABLED_HEDGING = HedgingSettings()
+
+
+class HedgeBudget:
+    """
+    Token bucket filled by the tenant's own requests: every request deposits `max_hedge_ratio`
+    tokens (up to `burst`) and every hedge spends one, so hedging can never add more than that
+    fraction of upstream calls, and cost, on top of the tenant's traffic.
+    """
+
+    __slots__ = ("tokens",)
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+
+    def deposit(self, settings: HedgingSettings) -> None:
+        self.tokens = min(settings.burst, self.tokens + settings.max_hedge_ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+# --------------------------
+# Hedging Registry
+# --------------------------
+class HedgingRegistry:
+    def __init__(self) -> None:
+        self.budgets: Dict[Tuple[str, HedgingSettings], HedgeBudget] = {}
+        self.settings_cache = PolicySettingsCache(DISABLED_HEDGING)
+
+    def get_settings(self, policy: Mapping[str, Any]) -> HedgingSettings:
+        return self.settings_cache.get((policy.get("routing_criteria") or {}).get("hedging"))
+
+    def get_budget(self, tenant_id: str, settings: HedgingSettings) -> HedgeBudget:
+        budget = self.budgets.get((tenant_id, settings))
+        if budget is None:
+            budget = self.budgets[(tenant_id, settings)] = HedgeBudget(settings.burst)
+        return budget
+
+
+def get_hedge_delay(settings: HedgingSettings, observed_ms: Optional[float]) -> float:
+    """
+    Hedge delay in seconds from the primary's observed latency percentile.
+    """
+    delay_ms = observed_ms if observed_ms is not None else settings.delay_ms
+    return max(delay_ms, settings.min_delay_ms) / 1000
+
+
+# --------------------------
+# Hedging Registry Singleton
+# --------------------------
+hedging_registry = HedgingRegistry()
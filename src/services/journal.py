@@ -0,0 +1,358 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional
+
+import orjson
+from prometheus_client import Counter, Gauge
+
+from src.helpers.utilities.custom.env_var import envConfig
+
+logger = logging.getLogger(__name__)
+
+# checked without importing: zstandard is only needed once a segment is rotated with compression on
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+COMPRESSIONS = ("none", "zstd")
+ZSTD_LEVEL = 3
+STOP = object()
+
+journal_records_total = Counter("journal_records_total", "Request journal records, by outcome (written, dropped when the queue was full, failed to write)", ["outcome"])
+journal_queue_depth = Gauge("journal_queue_depth", "Request journal records waiting for the background writer")
+
+
+@dataclass(frozen=True)
+class JournalSettings:
+    """
+    Read from the REQUEST_JOURNAL_* environment variables. The live segment is rotated once it would
+    exceed `max_bytes` or is `rotate_seconds` old (0: size only), optionally compressed with zstd, and
+    the newest `backup_count` rotated segments are kept. Up to `queue_size` records wait for the writer;
+    beyond that they are dropped and counted rather than slowing requests down.
+    """
+
+    enabled: bool = False
+    path: str = "logs/requests.jsonl"
+    max_bytes: int = 64 * 1024 * 1024
+    rotate_seconds: float = 3600.0
+    backup_count: int = 24
+    compression: str = "none"
+    queue_size: int = 10000
+    batch_size: int = 512
+    flush_interval_seconds: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "JournalSettings":
+        return cls(
+            enabled=envConfig.request_journal_enabled,
+            path=envConfig.request_journal_path,
+            max_bytes=envConfig.request_journal_max_bytes,
+            rotate_seconds=envConfig.request_journal_rotate_seconds,
+            backup_count=envConfig.request_journal_backup_count,
+            compression=envConfig.request_journal_compression,
+            queue_size=envConfig.request_journal_queue_size,
+        )
+
+
+# --------------------------
+# Journal entries
+# --------------------------
+class JournalEntry:
+    """
+    One request as it is routed; upstream attempts and token usage are added by the router through `current_entry`.
+    """
+
+    __slots__ = ("timestamp", "started_at", "endpoint", "tenant_id", "model", "stream", "max_tokens", "temperature", "provider", "attempts", "coalesced", "prompt_tokens", "completion_tokens", "token_source", "ttft_ms")
+
+    def __init__(self, endpoint: str, tenant_id: str, model: Optional[str], payload: Mapping[str, Any]):
+        self.timestamp = time.time()
+        self.started_at = time.monotonic()
+        self.endpoint = endpoint
+        self.tenant_id = tenant_id
+        self.model = model
+        self.stream = bool(payload.get("stream"))
+        self.max_tokens = payload.get("max_tokens") or payload.get("max_completion_tokens")
+        self.temperature = payload.get("temperature")
+        self.provider: Optional[str] = None
+        self.attempts: List[Dict[str, Any]] = []
+        self.coalesced = False
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.token_source: Optional[str] = None
+        self.ttft_ms: Optional[float] = None
+
+    def to_record(self, status_code: int, error: Optional[str]) -> Dict[str, Any]:
+        """
+        Requests without attempts were served from the response cache. A coalesced request shares the attempts
+        and usage of the request whose upstream call it joined, so count upstream calls on records with `coalesced` false.
+        """
+        return {
+            "time": datetime.fromtimestamp(self.timestamp, timezone.utc).isoformat(timespec="milliseconds"),
+            "timestamp": self.timestamp,
+            "endpoint": self.endpoint,
+            "tenant": self.tenant_id,
+            "model": self.model,
+            "stream": self.stream,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "status_code": status_code,
+            "error": error,
+            "provider": self.provider,
+            "failovers": len({attempt["provider"] for attempt in self.attempts}) - 1 if self.attempts else 0,
+            "attempts": self.attempts,
+            "coalesced": self.coalesced,
+            "latency_ms": round((time.monotonic() - self.started_at) * 1000, 2),
+            "ttft_ms": self.ttft_ms,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "token_source": self.token_source,
+        }
+
+
+current_entry: ContextVar[Optional[JournalEntry]] = ContextVar("journal_entry", default=None)
+
+
+@contextmanager
+def track_attempt(provider_name: str) -> Iterator[None]:
+    """
+    Record one upstream attempt (provider, outcome, latency) on the current request's journal entry.
+    """
+    entry = current_entry.get()
+    if entry is None:
+        yield
+        return
+    started_at = time.monotonic()
+    outcome = "ok"
+    try:
+        yield
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        status_code = getattr(getattr(e, "response", None), "status_code", None)
+        outcome = f"{type(e).__name__} {status_code}" if status_code else type(e).__name__
+        raise
+    finally:
+        entry.attempts.append({"provider": provider_name, "outcome": outcome, "latency_ms": round((time.monotonic() - started_at) * 1000, 2)})
+
+
+def record_usage(provider_name: str, prompt_tokens: int, completion_tokens: int, source: str) -> None:
+    entry = current_entry.get()
+    if entry is not None:
+        entry.provider = provider_name
+        entry.prompt_tokens, entry.completion_tokens, entry.token_source = prompt_tokens, completion_tokens, source
+
+
+def record_coalesced(source: Optional[JournalEntry]) -> None:
+    """
+    Copy the upstream attempts and usage of the request that led a coalesced call onto the current entry.
+    """
+    entry = current_entry.get()
+    if entry is None or source is None or entry is source:
+        return
+    entry.coalesced = True
+    entry.attempts = list(source.attempts)
+    entry.provider = source.provider
+    entry.prompt_tokens, entry.completion_tokens, entry.token_source = source.prompt_tokens, source.completion_tokens, source.token_source
+
+
+def record_ttft(seconds: float) -> None:
+    entry = current_entry.get()
+    if entry is not None:
+        entry.ttft_ms = round(seconds * 1000, 2)
+
+
+# --------------------------
+# Journal Writer
+# --------------------------
+class JournalWriter(threading.Thread):
+    """
+    Drains the queue in batches of up to `batch_size` records, each written with a single `write` call,
+    and rotates the segment between batches. Runs in its own thread, so disk I/O never reaches the event loop.
+    """
+
+    def __init__(self, settings: JournalSettings, records: "queue.Queue[Any]"):
+        super().__init__(name="request-journal", daemon=True)
+        self.settings = settings
+        self.records = records
+        self.path = Path(settings.path)
+        self.file: Optional[IO[bytes]] = None
+        self.size = 0
+        self.opened_at = 0.0
+
+    def run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self.records.get(timeout=self.settings.flush_interval_seconds)]
+            except queue.Empty:
+                self.rotate_if_due(0)
+                continue
+            while len(batch) < self.settings.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is STOP:
+                stopping = True
+                batch.pop()
+            if batch:
+                self.write(batch)
+        self.close()
+
+    def write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            data = b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE, default=str) for record in batch)
+            self.rotate_if_due(len(data))
+            if self.file is None:
+                self.open()
+            assert self.file is not None
+            self.file.write(data)
+            self.file.flush()
+            self.size += len(data)
+        except Exception:
+            journal_records_total.labels("failed").inc(len(batch))
+            logger.error("Request journal write failed", exc_info=True)
+            return
+        journal_records_total.labels("written").inc(len(batch))
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "ab")
+        self.size = self.file.tell()
+        self.opened_at = time.monotonic()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def rotate_if_due(self, incoming_bytes: int) -> None:
+        if self.file is None or not self.size:
+            return
+        too_big = self.size + incoming_bytes > self.settings.max_bytes
+        too_old = self.settings.rotate_seconds > 0 and time.monotonic() - self.opened_at >= self.settings.rotate_seconds
+        if too_big or too_old:
+            try:
+                self.rotate()
+            except Exception:
+                logger.error("Request journal rotation failed", exc_info=True)
+
+    def rotate(self) -> None:
+        self.close()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = self.path.with_name(f"{self.path.stem}-{stamp}{self.path.suffix}")
+        os.replace(self.path, rotated)
+        if self.settings.compression == "zstd" and ZSTD_AVAILABLE:
+            compress_file(rotated)
+        self.prune()
+
+    def prune(self) -> None:
+        rotated = sorted(self.path.parent.glob(f"{self.path.stem}-*{self.path.suffix}*"))
+        for path in rotated[: max(0, len(rotated) - self.settings.backup_count)]:
+            path.unlink(missing_ok=True)
+
+
+def compress_file(path: Path) -> Path:
+    import zstandard
+
+    target = path.with_name(path.name + ".zst")
+    with open(path, "rb") as source, open(target, "wb") as destination:
+        zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(source, destination)
+    path.unlink()
+    return target
+
+
+# --------------------------
+# Request Journal
+# --------------------------
+class RequestJournal:
+    """
+    Append-only JSONL journal of routed requests: tenant, model, chosen provider, upstream attempts,
+    latency and token usage. Submitting never blocks: a full queue drops the record.
+    With several uvicorn workers each writes its own `<name>.<pid>.jsonl`.
+    """
+
+    def __init__(self) -> None:
+        self.settings = JournalSettings()
+        self.records: "queue.Queue[Any]" = queue.Queue()
+        self.writer: Optional[JournalWriter] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.writer is not None
+
+    def start(self, settings: Optional[JournalSettings] = None) -> None:
+        settings = settings or JournalSettings.from_env()
+        if not settings.enabled or self.writer is not None:
+            return
+        if settings.compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown request journal compression '{settings.compression}', expected one of {COMPRESSIONS}")
+        if settings.compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("Request journal compression 'zstd' needs the zstandard package; rotated segments stay uncompressed")
+        if envConfig.app_workers > 1:
+            path = Path(settings.path)
+            settings = JournalSettings(**{**vars(settings), "path": str(path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}"))})
+        self.settings = settings
+        self.records = queue.Queue(maxsize=settings.queue_size)
+        journal_queue_depth.set_function(self.records.qsize)
+        self.writer = JournalWriter(settings, self.records)
+        self.writer.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Write what is queued and close the segment. Blocking: call from a thread.
+        """
+        writer, self.writer = self.writer, None
+        if writer is None:
+            return
+        self.records.put(STOP, timeout=timeout)
+        writer.join(timeout)
+
+    def begin(self, endpoint: str, tenant_id: str, model: Optional[str], payload: Mapping[str, Any]) -> Optional[JournalEntry]:
+        """
+        Start the journal entry of a request and make it the current one for the router. None when the journal is off.
+        """
+        if self.writer is None:
+            return None
+        entry = JournalEntry(endpoint, tenant_id, model, payload)
+        current_entry.set(entry)
+        return entry
+
+    def finish(self, entry: Optional[JournalEntry], status_code: int, error: Optional[str] = None) -> None:
+        if entry is None or self.writer is None:
+            return
+        try:
+            self.records.put_nowait(entry.to_record(status_code, error))
+        except queue.Full:
+            journal_records_total.labels("dropped").inc()
+
+    async def track_stream(self, entry: Optional[JournalEntry], chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Relay a streamed response and finish its entry once the stream ends (499 when the client went away).
+        """
+        status_code, error = 200, None
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            status_code, error = 499, "client_disconnect"
+            raise
+        except Exception as e:
+            status_code, error = 500, str(e)
+            raise
+        finally:
+            self.finish(entry, status_code, error)
+
+
+# --------------------------
+# Request Journal Singleton
+# --------------------------
+request_journal = RequestJournal()
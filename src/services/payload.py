@@ -0,0 +1,22 @@
+from typing import Any, Dict
+
+import orjson
+from fastapi import HTTPException, Request
+
+
+async def get_json_payload(request: Request) -> Dict[str, Any]:
+    """
+    Decode the request body once with orjson and share it for the rest of the request.
+    FastAPI caches the dependency per request; request.state covers callers outside the dependency graph.
+    """
+    payload = getattr(request.state, "payload", None)
+    if payload is not None:
+        return payload
+    try:
+        payload = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body") from None
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="JSON body must be an object")
+    request.state.payload = payload
+    return payload
@@ -0,0 +1,39 @@
+from dataclasses import fields
+from functools import partial
+from typing import Any, Callable, Dict, Generic, Mapping, Optional, Tuple, Type, TypeVar
+
+S = TypeVar("S")
+
+# entries of configs replaced by reloads are only dropped once this many have piled up
+MAX_CACHED_CONFIGS = 1024
+
+
+def settings_from_config(cls: Type[S], config: Mapping[str, Any]) -> S:
+    """
+    A frozen settings dataclass from a config section; keys that are not fields of it are ignored.
+    """
+    names = {field.name for field in fields(cls)}  # type: ignore[arg-type]
+    return cls(**{key: value for key, value in config.items() if key in names})
+
+
+class PolicySettingsCache(Generic[S]):
+    """
+    Settings parsed once per config section. Loaded configs are never mutated, only replaced on reload,
+    so sections are cached by identity; the section itself is kept with its settings so that a recycled
+    id() is never mistaken for it. A missing or empty section gets `default`.
+    """
+
+    def __init__(self, default: S, parse: Optional[Callable[[Mapping[str, Any]], S]] = None):
+        self.default = default
+        self.parse: Callable[[Mapping[str, Any]], S] = parse or partial(settings_from_config, type(default))
+        self.entries: Dict[int, Tuple[Mapping[str, Any], S]] = {}
+
+    def get(self, config: Optional[Mapping[str, Any]]) -> S:
+        if not config:
+            return self.default
+        cached = self.entries.get(id(config))
+        if cached is None or cached[0] is not config:
+            if len(self.entries) >= MAX_CACHED_CONFIGS:
+                self.entries.clear()
+            cached = self.entries[id(config)] = (config, self.parse(config))
+        return cached[1]
@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from prometheus_client import Counter
+
+from src.helpers.models.pydantic.auth import Tenant
+from src.helpers.utilities.custom.env_var import envConfig
+from src.helpers.utilities.custom.tokens import get_max_completion_tokens, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+QUOTA_SYNC_INTERVAL_SECONDS = 1.0
+DEFAULT_COMPLETION_TOKENS = 256
+# how long a batch item without a deadline waits for the tenant's rate limits (the default request deadline)
+MAX_ACQUIRE_WAIT_SECONDS = 60.0
+
+rate_limit_rejections_total = Counter("rate_limit_rejections_total", "Requests rejected with 429", ["tenant", "limit"])
+
+
+def estimate_request_tokens(payload: Mapping[str, Any]) -> int:
+    """
+    Rough prompt plus completion token estimate for the tokens-per-minute limit.
+    """
+    return get_token_counter(None).count_prompt(payload) + (get_max_completion_tokens(payload) or DEFAULT_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, amount: float, now: float) -> float:
+        """
+        Take `amount` tokens; returns 0 when allowed, otherwise the seconds until it would be.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+# --------------------------
+# Counter Backends
+# --------------------------
+class CounterBackend:
+    """
+    Shared quota counters across workers and hosts (e.g. Redis INCRBY with EXPIRE). Must be overridden by subclasses.
+    """
+
+    async def incr(self, key: str, amount: int, ttl_seconds: float) -> int:
+        """
+        Add `amount` to the counter and return its new global total.
+        """
+        raise NotImplementedError("incr must be implemented in subclass")
+
+
+class InMemoryCounterBackend(CounterBackend):
+    """
+    In-process counters for benchmarks and single-process use. Not shared between workers, so it is not
+    selectable through RATE_LIMIT_BACKEND: every worker would check the whole quota against its own count.
+    """
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, Tuple[float, int]] = {}
+
+    async def incr(self, key: str, amount: int, ttl_seconds: float) -> int:
+        now = time.monotonic()
+        expires_at, value = self.counters.get(key, (now + ttl_seconds, 0))
+        if expires_at <= now:
+            expires_at, value = now + ttl_seconds, 0
+        self.counters[key] = (expires_at, value + amount)
+        return value + amount
+
+
+# backends selectable through RATE_LIMIT_BACKEND; only register services every worker shares
+counter_backends: Dict[str, Optional[Type[CounterBackend]]] = {"none": None}
+
+
+class TenantLimiter:
+    """
+    Per-worker share of a tenant's limits. Rates are divided by the worker count, since uvicorn
+    spreads connections across workers; bucket capacities never go below one request. The quota is checked
+    locally against the last synced global total plus the requests not yet synced, or against a per-worker
+    share when no shared backend is configured.
+    """
+
+    __slots__ = ("limits", "quota", "requests", "tokens", "window_start", "window_requests", "unsynced_requests", "global_requests")
+
+    def __init__(self, tenant: Tenant, workers: int):
+        limits = tenant.rate_limits
+        self.limits = limits
+        self.quota = tenant.quota
+        # a bucket must hold at least one request, or a tenant with fewer requests per second than workers could never send one
+        self.requests = TokenBucket(limits.requests_per_second / workers, max(1.0, (limits.burst or limits.requests_per_second) / workers)) if limits.requests_per_second > 0 else None
+        self.tokens = TokenBucket(limits.tokens_per_minute / 60 / workers, max(1.0, limits.tokens_per_minute / workers)) if limits.tokens_per_minute > 0 else None
+        self.window_start = 0.0
+        self.window_requests = 0
+        self.unsynced_requests = 0
+        self.global_requests = 0
+
+
+# --------------------------
+# Rate Limiter
+# --------------------------
+class RateLimiter:
+    def __init__(self, workers: int, backend: Optional[CounterBackend] = None):
+        self.workers = max(workers, 1)
+        self.backend = backend
+        self.limiters: Dict[str, Tuple[Tenant, TenantLimiter]] = {}
+        self.sync_task: Optional[asyncio.Task] = None
+
+    def get_limiter(self, tenant: Tenant) -> TenantLimiter:
+        entry = self.limiters.get(tenant.id)
+        # a reloaded tenant is a new object: limits may have changed, so rebuild its limiter but keep its quota usage
+        if entry is None or entry[0] is not tenant:
+            limiter = TenantLimiter(tenant, self.workers)
+            if entry is not None:
+                previous = entry[1]
+                limiter.window_start, limiter.window_requests, limiter.unsynced_requests, limiter.global_requests = previous.window_start, previous.window_requests, previous.unsynced_requests, previous.global_requests
+            entry = self.limiters[tenant.id] = (tenant, limiter)
+        return entry[1]
+
+    @staticmethod
+    def reject(tenant: Tenant, limit: str, retry_after: float, detail: str) -> HTTPException:
+        rate_limit_rejections_total.labels(tenant.id, limit).inc()
+        return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+    def check_request(self, tenant: Tenant, payload: Mapping[str, Any]) -> None:
+        """
+        Requests-per-second bucket, tokens-per-minute bucket (charged with the request's estimated token
+        count) and request quota. A rejection refunds what the earlier checks took, so a request is
+        charged only when all of them pass. Raises a 429 HTTPException with Retry-After.
+        """
+        limiter = self.get_limiter(tenant)
+        now = time.monotonic()
+        taken: List[Tuple[TokenBucket, float]] = []
+        try:
+            if limiter.requests is not None:
+                wait = limiter.requests.take(1.0, now)
+                if wait:
+                    raise self.reject(tenant, "requests", wait, "Request rate limit exceeded")
+                taken.append((limiter.requests, 1.0))
+            if limiter.tokens is not None:
+                amount = min(estimate_request_tokens(payload), limiter.tokens.capacity)
+                wait = limiter.tokens.take(amount, now)
+                if wait:
+                    raise self.reject(tenant, "tokens", wait, "Token rate limit exceeded")
+                taken.append((limiter.tokens, amount))
+            self.take_quota(tenant, limiter)
+        except BaseException:
+            self.refund(taken)
+            raise
+
+    @staticmethod
+    def refund(taken: List[Tuple[TokenBucket, float]]) -> None:
+        for bucket, amount in taken:
+            bucket.refund(amount)
+
+    def take_quota(self, tenant: Tenant, limiter: TenantLimiter) -> None:
+        if limiter.quota <= 0:
+            return
+        window_seconds = limiter.limits.quota_window_seconds
+        window_start = time.time() // window_seconds * window_seconds
+        if window_start != limiter.window_start:
+            limiter.window_start, limiter.window_requests, limiter.unsynced_requests, limiter.global_requests = window_start, 0, 0, 0
+        if self.backend is not None:
+            exhausted = limiter.global_requests + limiter.unsynced_requests >= limiter.quota
+        else:
+            exhausted = limiter.window_requests >= limiter.quota / self.workers
+        if exhausted:
+            raise self.reject(tenant, "quota", window_start + window_seconds - time.time(), "Request quota exhausted")
+        limiter.window_requests += 1
+        limiter.unsynced_requests += 1
+
+    async def acquire(self, tenant: Tenant, payload: Mapping[str, Any], timeout: Optional[float] = None) -> None:
+        """
+        Batch items: wait for the request and token buckets instead of being rejected, so a large batch
+        drains at the tenant's rate. Waiting is bounded by `timeout` (the item's deadline, else
+        MAX_ACQUIRE_WAIT_SECONDS); an item that would wait longer, or an exhausted quota, still raises 429.
+        """
+        limiter = self.get_limiter(tenant)
+        expires_at = time.monotonic() + (timeout if timeout is not None else MAX_ACQUIRE_WAIT_SECONDS)
+        taken: List[Tuple[TokenBucket, float]] = []
+        try:
+            if limiter.requests is not None:
+                await self.wait_for(tenant, "requests", limiter.requests, 1.0, expires_at, "Request rate limit exceeded")
+                taken.append((limiter.requests, 1.0))
+            if limiter.tokens is not None:
+                amount = min(estimate_request_tokens(payload), limiter.tokens.capacity)
+                await self.wait_for(tenant, "tokens", limiter.tokens, amount, expires_at, "Token rate limit exceeded")
+                taken.append((limiter.tokens, amount))
+            self.take_quota(tenant, limiter)
+        except BaseException:
+            # also on cancellation, so an abandoned item does not keep the budget it waited for
+            self.refund(taken)
+            raise
+
+    async def wait_for(self, tenant: Tenant, limit: str, bucket: TokenBucket, amount: float, expires_at: float, detail: str) -> None:
+        if amount > bucket.capacity:
+            # can never fit, however long it waits
+            raise self.reject(tenant, limit, 0.0, detail)
+        while wait := bucket.take(amount, time.monotonic()):
+            if time.monotonic() + wait > expires_at:
+                raise self.reject(tenant, limit, wait, detail)
+            await asyncio.sleep(wait)
+
+    async def sync(self) -> None:
+        """
+        Push the requests counted since the last sync to the shared backend and pull the global totals.
+        """
+        if self.backend is None:
+            return
+        for tenant_id, (_, limiter) in list(self.limiters.items()):
+            if not limiter.quota or not limiter.window_start:
+                continue
+            delta, limiter.unsynced_requests = limiter.unsynced_requests, 0
+            window_start = limiter.window_start
+            try:
+                total = await self.backend.incr(f"quota:{tenant_id}:{int(window_start)}", delta, limiter.limits.quota_window_seconds)
+            except Exception as e:
+                limiter.unsynced_requests += delta
+                logger.error(f"Quota sync failed for tenant '{tenant_id}': {e}")
+                continue
+            if limiter.window_start == window_start:
+                limiter.global_requests = total
+
+    def start_sync(self) -> None:
+        if self.backend is not None and self.sync_task is None:
+            self.sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop_sync(self) -> None:
+        task, self.sync_task = self.sync_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await self.sync()
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(QUOTA_SYNC_INTERVAL_SECONDS)
+            await self.sync()
+
+
+# --------------------------
+# Rate Limiter Singleton
+# --------------------------
+def create_rate_limiter() -> RateLimiter:
+    backend_class = counter_backends.get(envConfig.rate_limit_backend)
+    if envConfig.rate_limit_backend not in counter_backends:
+        logger.warning(f"Unknown rate limit backend '{envConfig.rate_limit_backend}', sharding quotas per worker")
+    return RateLimiter(envConfig.app_workers, backend_class() if backend_class else None)
+
+
+rate_limiter = create_rate_limiter()
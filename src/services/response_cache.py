@@ -0,0 +1,188 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple, Type
+
+import orjson
+from prometheus_client import Counter, Gauge
+
+from src.helpers.utilities.custom.env_var import envConfig
+from src.services.policy_settings import PolicySettingsCache
+
+logger = logging.getLogger(__name__)
+
+# request fields that do not change the completion; `user` and `metadata` reach upstreams only as an end-user id
+NON_SEMANTIC_FIELDS = frozenset({"stream", "stream_options", "user", "metadata"})
+
+response_cache_hits_total = Counter("response_cache_hits_total", "Completions served from the response cache", ["tier"])
+response_cache_misses_total = Counter("response_cache_misses_total", "Cacheable completions not found in the response cache")
+response_cache_evictions_total = Counter("response_cache_evictions_total", "Entries evicted from the in-memory response cache", ["reason"])
+response_cache_bytes = Gauge("response_cache_bytes", "Bytes held by the in-memory response cache")
+
+
+@dataclass(frozen=True)
+class ResponseCacheSettings:
+    """
+    Read from the `response_cache` section of a routing policy.
+    """
+
+    enabled: bool = False
+    ttl_seconds: float = 300.0
+
+
+DISABLED_RESPONSE_CACHE = ResponseCacheSettings()
+
+
+def is_cacheable(payload: Mapping[str, Any]) -> bool:
+    """
+    Only explicitly deterministic, single-choice, non-streamed completions are cached.
+    """
+    return payload.get("temperature") == 0 and not payload.get("stream") and payload.get("n", 1) == 1
+
+
+def build_cache_key(tenant_id: str, model_name: str, payload: Mapping[str, Any]) -> str:
+    """
+    Canonical hash of (tenant, model, payload): keys are sorted and non-semantic fields dropped,
+    so byte-different but equivalent requests share an entry.
+    """
+    normalized = {key: value for key, value in payload.items() if key not in NON_SEMANTIC_FIELDS}
+    normalized["model"] = model_name
+    canonical = orjson.dumps([tenant_id, normalized], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+# --------------------------
+# Cache Backends
+# --------------------------
+class CacheBackend:
+    """
+    Shared tier behind the per-worker LRU (e.g. Redis or memcached). Must be overridden by subclasses.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError("get must be implemented in subclass")
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError("set must be implemented in subclass")
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Local stand-in for a shared cache service, with the same async interface and TTL semantics.
+    """
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.entries[key]
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl_seconds, value)
+
+
+shared_cache_backends: Dict[str, Optional[Type[CacheBackend]]] = {"none": None, "memory": InMemoryCacheBackend}
+
+
+class LRUCache:
+    """
+    Per-worker LRU of encoded responses, bounded by entry count and total bytes, with per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key, "expired")
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key, None)
+        self.entries[key] = (time.monotonic() + ttl_seconds, value)
+        self.size_bytes += len(value)
+        while self.size_bytes > self.max_bytes or len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)), "capacity")
+        response_cache_bytes.set(self.size_bytes)
+
+    def _remove(self, key: str, reason: Optional[str]) -> None:
+        _, value = self.entries.pop(key)
+        self.size_bytes -= len(value)
+        if reason:
+            response_cache_evictions_total.labels(reason).inc()
+        response_cache_bytes.set(self.size_bytes)
+
+
+# --------------------------
+# Response Cache
+# --------------------------
+class ResponseCache:
+    def __init__(self, local: LRUCache, shared: Optional[CacheBackend] = None):
+        self.local = local
+        self.shared = shared
+        self.settings_cache = PolicySettingsCache(DISABLED_RESPONSE_CACHE)
+
+    def get_settings(self, policy: Mapping[str, Any]) -> ResponseCacheSettings:
+        return self.settings_cache.get(policy.get("response_cache"))
+
+    async def get(self, key: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Decoded copy of a cached response, so callers can never mutate the cached entry.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            response_cache_hits_total.labels("local").inc()
+            return orjson.loads(value)
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception as e:
+                logger.error(f"Shared response cache get failed: {e}")
+                value = None
+            if value is not None:
+                response_cache_hits_total.labels("shared").inc()
+                self.local.set(key, value, ttl_seconds)
+                return orjson.loads(value)
+        response_cache_misses_total.inc()
+        return None
+
+    async def set(self, key: str, response: Dict[str, Any], ttl_seconds: float) -> None:
+        value = orjson.dumps(response)
+        self.local.set(key, value, ttl_seconds)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, ttl_seconds)
+            except Exception as e:
+                logger.error(f"Shared response cache set failed: {e}")
+
+
+# --------------------------
+# Response Cache Singleton
+# --------------------------
+def create_response_cache() -> ResponseCache:
+    backend_class = shared_cache_backends.get(envConfig.response_cache_backend)
+    if envConfig.response_cache_backend not in shared_cache_backends:
+        logger.warning(f"Unknown response cache backend '{envConfig.response_cache_backend}', using the in-memory tier only")
+    return ResponseCache(LRUCache(envConfig.response_cache_max_entries, envConfig.response_cache_max_bytes), backend_class() if backend_class else None)
+
+
+response_cache = create_response_cache()
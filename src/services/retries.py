@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+import httpx
+import orjson
+from fastapi import HTTPException
+from prometheus_client import Counter
+
+from src.helpers.adapters.base import PhaseTimeouts
+from src.services.deadlines import Deadline
+from src.services.policy_settings import PolicySettingsCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE = "retryable"
+RATE_LIMITED = "rate_limited"
+FATAL = "fatal"
+RETRYABLE_STATUS_CODES = frozenset({408, 500, 502, 503, 504, 529})
+RATE_LIMITED_STATUS_CODES = frozenset({429})
+# the request itself was rejected: every provider would refuse it, so it is returned to the client instead of failed over
+REQUEST_ERROR_STATUS_CODES = frozenset({400, 413, 422})
+
+upstream_retries_total = Counter("upstream_retries_total", "Upstream attempts retried on the same provider, by error class (retryable or rate_limited)", ["provider", "reason"])
+retry_budget_exhausted_total = Counter("retry_budget_exhausted_total", "Retries not attempted because the provider retry budget was empty", ["provider"])
+
+
+@dataclass(frozen=True)
+class RetrySettings:
+    """
+    Read from `routing_criteria.retry` of a routing policy.
+    A retryable error (timeout, connection error, 5xx) or a 429 is retried on the same provider up to
+    `max_retries` times before failing over, sleeping with decorrelated jitter between `base_delay_ms` and
+    `max_delay_ms`, or for the upstream's Retry-After when it is longer (up to `max_retry_after_seconds`).
+    Every first attempt deposits `retry_ratio` tokens (up to `burst`) into the provider's retry budget and
+    every retry spends one, so retries add at most that fraction of calls to a provider that is failing.
+    """
+
+    enabled: bool = True
+    max_retries: int = 2
+    base_delay_ms: float = 50.0
+    max_delay_ms: float = 2000.0
+    max_retry_after_seconds: float = 10.0
+    retry_ratio: float = 0.1
+    burst: float = 10.0
+
+
+DEFAULT_RETRY = RetrySettings()
+
+
+class RetryBudget:
+    """
+    Token bucket shared by every request to a provider, as HedgeBudget is by a tenant's requests.
+    """
+
+    __slots__ = ("tokens",)
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+
+    def deposit(self, settings: RetrySettings) -> None:
+        self.tokens = min(settings.burst, self.tokens + settings.retry_ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    RETRYABLE for timeouts, connection errors and transient statuses, RATE_LIMITED for 429, FATAL for anything
+    retrying the same provider cannot fix (other 4xx, open circuits, local load shedding, bad responses).
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        if status_code in RATE_LIMITED_STATUS_CODES:
+            return RATE_LIMITED
+        return RETRYABLE if status_code in RETRYABLE_STATUS_CODES else FATAL
+    if isinstance(error, httpx.TransportError):
+        return RETRYABLE
+    return FATAL
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Seconds from an upstream Retry-After header, given as delay-seconds or an HTTP date.
+    """
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_request_error(error: Optional[BaseException]) -> bool:
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in REQUEST_ERROR_STATUS_CODES
+
+
+def get_error_detail(response: httpx.Response) -> Any:
+    """
+    The upstream's error body, decoded when it is JSON.
+    """
+    try:
+        content = response.content
+    except httpx.ResponseNotRead:
+        return None
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return response.text or None
+
+
+def to_http_exception(error: Optional[BaseException]) -> HTTPException:
+    """
+    The gateway's answer once no provider succeeded: an upstream request error or 429 keeps its status
+    (and Retry-After, so clients back off), anything else is a 502.
+    """
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in REQUEST_ERROR_STATUS_CODES:
+        return HTTPException(status_code=error.response.status_code, detail=get_error_detail(error.response) or "Request rejected by the upstream provider")
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in RATE_LIMITED_STATUS_CODES:
+        retry_after = get_retry_after(error)
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after is not None else None
+        return HTTPException(status_code=429, detail="Rate limited by every upstream provider", headers=headers)
+    return HTTPException(status_code=502, detail=f"All providers failed: {str(error)}")
+
+
+def get_backoff(settings: RetrySettings, previous: float) -> float:
+    """
+    Decorrelated jitter: uniform between the base delay and three times the previous sleep, capped. In seconds.
+    """
+    base = settings.base_delay_ms / 1000
+    return min(settings.max_delay_ms / 1000, random.uniform(base, max(base, previous * 3)))
+
+
+# --------------------------
+# Retry Registry
+# --------------------------
+class RetryRegistry:
+    def __init__(self) -> None:
+        self.budgets: Dict[Tuple[str, RetrySettings], RetryBudget] = {}
+        self.settings_cache = PolicySettingsCache(DEFAULT_RETRY)
+
+    def get_settings(self, policy: Mapping[str, Any]) -> RetrySettings:
+        return self.settings_cache.get((policy.get("routing_criteria") or {}).get("retry"))
+
+    def get_budget(self, provider_name: str, settings: RetrySettings) -> RetryBudget:
+        budget = self.budgets.get((provider_name, settings))
+        if budget is None:
+            budget = self.budgets[(provider_name, settings)] = RetryBudget(settings.burst)
+        return budget
+
+    async def run(self, provider_name: str, settings: RetrySettings, deadline: Deadline, attempts_left: int, attempt: Callable[[PhaseTimeouts], Awaitable[T]]) -> T:
+        """
+        Call `attempt` with its share of the deadline, retrying on the same provider while the error is
+        retryable, the retry budget allows it and the backoff still leaves `min_attempt_seconds` of the deadline.
+        The last error is raised for the caller to fail over.
+        """
+        budget = self.get_budget(provider_name, settings)
+        budget.deposit(settings)
+        retries = 0
+        delay = 0.0
+        while True:
+            try:
+                return await attempt(deadline.attempt_timeouts(attempts_left))
+            except Exception as e:
+                error_class = classify_error(e)
+                if not settings.enabled or error_class == FATAL or retries >= settings.max_retries:
+                    raise
+                delay = get_backoff(settings, delay)
+                retry_after = get_retry_after(e)
+                if retry_after is not None:
+                    if retry_after > settings.max_retry_after_seconds:
+                        raise
+                    delay = max(delay, retry_after)
+                if delay + deadline.settings.min_attempt_seconds > deadline.remaining():
+                    raise
+                if not budget.withdraw():
+                    retry_budget_exhausted_total.labels(provider_name).inc()
+                    raise
+                retries += 1
+                upstream_retries_total.labels(provider_name, error_class).inc()
+                logger.info("Retrying upstream attempt", extra={"provider": provider_name, "reason": error_class, "retry": retries, "delay": delay})
+            await asyncio.sleep(delay)
+
+
+# --------------------------
+# Retry Registry Singleton
+# --------------------------
+retry_registry = RetryRegistry()
@@ -1,10 +1,28 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import deque
+from functools import partial
+from typing import Any, AsyncGenerator, Dict, List, Mapping, NoReturn, Optional, Set, Tuple
 
 from fastapi import HTTPException
 
 from src.helpers.adapters import get_provider_adapter
+from src.helpers.adapters.base import PhaseTimeouts, phase_timeout
+from src.helpers.utilities.custom.metrics import completion_tokens_total, prompt_tokens_estimated, prompt_tokens_total, routing_rejections_total, stream_tokens_per_second, stream_tokens_total, stream_ttft_seconds
+from src.helpers.utilities.custom.tokens import count_prompt_tokens, get_token_counter
 from src.helpers.utilities.custom.yaml_config import yamlConfig
+from src.services.circuit_breaker import CircuitOpenError, circuit_breakers
+from src.services.coalescing import request_coalescer
+from src.services.concurrency import concurrency_limiters
+from src.services.deadlines import Deadline, deadline_registry, get_timeout_phase, requests_cancelled_total, upstream_attempts_cancelled_total, upstream_timeouts_total
+from src.services.hedging import HedgingSettings, get_hedge_delay, hedge_budget_exhausted_total, hedge_requests_total, hedge_wins_total, hedging_registry
+from src.services.journal import record_ttft, record_usage, track_attempt
+from src.services.response_cache import build_cache_key, is_cacheable, response_cache
+from src.services.retries import is_request_error, retry_registry, to_http_exception
+from src.services.routing_index import RoutingIndex
+from src.services.scoring import ProviderCandidate, RequestProfile, build_request_profile, estimate_request_cost, scoring_engine, supports_modalities
+from src.services.telemetry import DEFAULT_MAX_ERROR_RATE, telemetry_store
 
 logger = logging.getLogger(__name__)
 
@@ -13,43 +31,24 @@ logger = logging.getLogger(__name__)
 # Routing Policy Engine
 # --------------------------
 class RoutingPolicyEngine:
-    def __init__(self, routing_policies: Dict, models_catalog: Dict):
-        self.policies = routing_policies or {}
-        self.models_catalog = models_catalog or {}
+    def __init__(self, routing_index: RoutingIndex):
+        self.index = routing_index
 
     def get_series_by_model_name(self, model_name: str) -> Optional[str]:
         """
         Given a model name (e.g. gpt-3.5-turbo),
         find which series it belongs to in models_catalog (e.g. gpt).
         """
-        for series_name, series_info in self.models_catalog.items():
-            for model in series_info.get("models", []):
-                if model.get("name") == model_name:
-                    return series_name
-        return None
+        return self.index.get_series(model_name)
 
-    def get_tenant_policy(self, tenant_id: str, model_name: str) -> Dict:
+    def get_tenant_policy(self, tenant_id: str, model_name: str) -> Mapping[str, Any]:
         """
         Get routing policy for a given tenant+model series:
           1. Tenant-specific policy for that series
           2. Global/shared policy for that series
           3. Global default policy
         """
-        series_name = self.get_series_by_model_name(model_name)
-        if not series_name:
-            return {}  # unknown model
-
-        # 1️⃣ Tenant-specific policy for that series
-        tenant_policy = self.policies.get(tenant_id, {})
-        if series_name in tenant_policy:
-            return tenant_policy[series_name]
-
-        # 2️⃣ Global/shared policy for that series
-        if series_name in self.policies:
-            return self.policies[series_name]
-
-        # 3️⃣ Fallback to generic global section
-        return self.policies.get("global", {})
+        return self.index.get_policy(tenant_id, model_name)
 
     def get_failover_providers(self, tenant_id: str, model_name: str, failed_provider: str) -> List[str]:
         """
@@ -64,83 +63,420 @@ class RoutingPolicyEngine:
 # Model Router
 # --------------------------
 class ModelRouter:
-    def __init__(self):
-        self.models_catalog = yamlConfig.models_catalog
-        self.routing_engine = RoutingPolicyEngine(yamlConfig.routing_policies, self.models_catalog)
+    def __init__(self, models_catalog: Optional[Dict] = None, routing_policies: Optional[Dict] = None):
+        self.models_catalog = yamlConfig.models_catalog if models_catalog is None else models_catalog
+        self.routing_index = RoutingIndex.build(self.models_catalog, yamlConfig.routing_policies if routing_policies is None else routing_policies)
+        self.routing_engine = RoutingPolicyEngine(self.routing_index)
 
     def get_model_providers(self, model_name: str) -> List[str]:
-        for series in self.models_catalog.values():
-            for model in series.get("models", []):
-                if model.get("name") == model_name:
-                    return [provider["name"] for provider in model.get("providers", [])]
-        return []
+        return list(self.routing_index.get_providers(model_name))
 
     @staticmethod
-    def get_provider_health(provider_name: str) -> bool:
-        return True  # stub
+    def get_provider_health(provider_name: str, model_name: str, max_error_rate: float = DEFAULT_MAX_ERROR_RATE) -> bool:
+        return telemetry_store.is_healthy(provider_name, model_name, max_error_rate)
 
     @staticmethod
-    def get_provider_latency(provider_name: str) -> float:
-        simulated_latencies = {"openai": 120, "azure_openai": 140, "anthropic": 180, "google": 100, "xyzcloud": 160, "partnerai": 130}
-        return simulated_latencies.get(provider_name, 100)
+    def get_provider_latency(provider_name: str, model_name: str) -> float:
+        return telemetry_store.get_latency(provider_name, model_name)
 
     @staticmethod
-    def get_provider_cost(model_name: str, provider_info: dict) -> float:
-        prompt_pricing = provider_info.get("prompt_pricing", {})
-        return prompt_pricing.get("text", float("inf"))
-
-    def get_provider_info(self, model_name: str, provider_name: str) -> Optional[Dict]:
-        for series in self.models_catalog.values():
-            for model in series.get("models", []):
-                if model.get("name") == model_name:
-                    for provider in model.get("providers", []):
-                        if provider["name"] == provider_name:
-                            return provider
-        return None
-
-    def select_primary_provider(self, tenant_id: str, model_name: str) -> Optional[str]:
+    def get_provider_cost(provider_info: Mapping[str, Any], profile: Optional[RequestProfile]) -> float:
+        if profile is None:
+            return (provider_info.get("prompt_pricing") or {}).get("text", 0.0)
+        return estimate_request_cost(provider_info, profile.prompt_tokens, profile.completion_tokens, profile.modalities)
+
+    def get_provider_info(self, model_name: str, provider_name: str) -> Optional[Mapping[str, Any]]:
+        return self.routing_index.get_provider_info(model_name, provider_name)
+
+    def fits_context(self, model_name: str, provider_name: str, required_tokens: int) -> bool:
+        """
+        Whether the provider serves the model and prompt plus max_tokens fit its `context_length.max` (providers without one always fit).
+        """
+        provider_info = self.get_provider_info(model_name, provider_name)
+        if not provider_info:
+            return False
+        max_tokens = (provider_info.get("context_length") or {}).get("max")
+        return max_tokens is None or required_tokens <= max_tokens
+
+    def can_serve(self, model_name: str, provider_name: str, profile: Optional[RequestProfile]) -> bool:
+        """
+        Whether the provider fits the request's context length and accepts all of its input modalities.
+        """
+        if profile is None:
+            return self.get_provider_info(model_name, provider_name) is not None
+        provider_info = self.get_provider_info(model_name, provider_name)
+        return provider_info is not None and self.fits_context(model_name, provider_name, profile.required_tokens) and supports_modalities(provider_info, profile.modalities)
+
+    async def get_prompt_tokens(self, model_name: str, payload: dict) -> int:
+        prompt_tokens = await count_prompt_tokens(self.routing_engine.get_series_by_model_name(model_name), payload)
+        prompt_tokens_estimated.labels(model_name).observe(prompt_tokens)
+        return prompt_tokens
+
+    def select_primary_provider(self, tenant_id: str, model_name: str, profile: Optional[RequestProfile] = None) -> Optional[str]:
+        """
+        Pick a primary provider with the policy's scoring engine (see ScoringSettings): estimated request
+        cost, live latency, error rate and load, weighted by `routing_criteria.scoring`.
+        Providers that cannot serve the request profile (context length, modalities) are skipped.
+        Unhealthy providers are skipped when `routing_criteria.health_check` is on, and providers
+        slower than `routing_criteria.latency_threshold_ms` only win when no candidate is within it.
+        Providers with an open circuit breaker rank last.
+        If every candidate is unhealthy the health filter is dropped rather than failing the request.
+        """
         policy = self.routing_engine.get_tenant_policy(tenant_id, model_name)
         candidate_providers = policy.get("primary_providers", [])
-        provider_scores = []
+        routing_criteria = policy.get("routing_criteria", {})
+        health_check = routing_criteria.get("health_check", True)
+        max_error_rate = routing_criteria.get("max_error_rate", DEFAULT_MAX_ERROR_RATE)
+        latency_threshold_ms = routing_criteria.get("latency_threshold_ms")
+        candidates: List[ProviderCandidate] = []
 
         for provider_name in candidate_providers:
             provider_info = self.get_provider_info(model_name, provider_name)
-            if not provider_info or not self.get_provider_health(provider_name):
+            if not provider_info or not self.can_serve(model_name, provider_name, profile):
                 continue
-            latency = self.get_provider_latency(provider_name)
-            cost = self.get_provider_cost(model_name, provider_info)
-            score = latency + cost * 10000  # weight cost heavily
-            provider_scores.append((provider_name, score))
-
-        if not provider_scores:
-            return None
-
-        provider_scores.sort(key=lambda x: x[1])
-        return provider_scores[0][0]
+            circuit_open = circuit_breakers.get(provider_name, policy).is_open()
+            healthy = not health_check or self.get_provider_health(provider_name, model_name, max_error_rate)
+            latency = self.get_provider_latency(provider_name, model_name)
+            over_threshold = latency_threshold_ms is not None and latency > latency_threshold_ms
+            candidates.append(
+                ProviderCandidate(
+                    name=provider_name,
+                    rank=(circuit_open, not healthy, over_threshold),
+                    cost=self.get_provider_cost(provider_info, profile),
+                    latency_ms=latency,
+                    error_rate=telemetry_store.get_error_rate(provider_name, model_name),
+                    load=telemetry_store.get_in_flight(provider_name, model_name),
+                )
+            )
+
+        return scoring_engine.select(candidates, scoring_engine.get_settings(policy))
+
+    def has_primary_provider(self, tenant_id: str, model_name: str) -> bool:
+        """
+        Whether any primary provider of the policy serves the model, whatever the request.
+        """
+        policy = self.routing_engine.get_tenant_policy(tenant_id, model_name)
+        return any(self.get_provider_info(model_name, provider_name) for provider_name in policy.get("primary_providers", []))
 
-    async def route_request(self, tenant_id: str, model_name: str, payload: dict) -> dict:
-        logging.info("Route request", extra={"tenant_id": tenant_id, "model_name": model_name})
-        primary_provider = self.select_primary_provider(tenant_id, model_name)
+    def get_providers_to_try(self, tenant_id: str, model_name: str, payload: dict, prompt_tokens: int = 0) -> List[str]:
+        """
+        Primary provider followed by the failover order, restricted to providers that can serve the request:
+        its context window fits the prompt plus `max_tokens` and it accepts the request's input modalities.
+        When no primary can, the request is rerouted to the failover order; when no provider can it is
+        rejected with 400 before any upstream call.
+        """
+        profile = build_request_profile(payload, prompt_tokens)
+        primary_provider = self.select_primary_provider(tenant_id, model_name, profile)
+
+        if not primary_provider and self.has_primary_provider(tenant_id, model_name):
+            failover_providers = self.routing_engine.get_failover_providers(tenant_id, model_name, "")
+            providers = [p for p in failover_providers if self.can_serve(model_name, p, profile)]
+            if not providers:
+                fits_any = any(self.fits_context(model_name, p, profile.required_tokens) for p in [*self.get_model_providers(model_name), *failover_providers])
+                reason = "unsupported_modality" if fits_any else "context_length"
+                routing_rejections_total.labels(tenant_id, model_name, reason).inc()
+                if fits_any:
+                    raise HTTPException(status_code=400, detail=f"No provider of {model_name} accepts {', '.join(sorted(profile.modalities))} inputs")
+                raise HTTPException(status_code=400, detail=f"Prompt of about {prompt_tokens} tokens plus max_tokens exceeds the context length of every provider of {model_name}")
+            return providers
 
         if not primary_provider:
             logging.error("Route Request Failed", exc_info=True, extra={"tenant_id": tenant_id, "model_name": model_name, "payload": payload})
             raise HTTPException(status_code=503, detail="No primary provider configured")
 
-        providers_to_try = [primary_provider] + self.routing_engine.get_failover_providers(tenant_id, model_name, primary_provider)
+        failover_providers = self.routing_engine.get_failover_providers(tenant_id, model_name, primary_provider)
+        return [primary_provider] + [p for p in failover_providers if self.can_serve(model_name, p, profile)]
 
-        last_exception = None
-        for provider_name in providers_to_try:
+    async def route_request(self, tenant_id: str, model_name: str, payload: dict, timeout: Optional[float] = None) -> dict:
+        """
+        `timeout` is the client's requested deadline in seconds; the policy's `deadline` applies otherwise.
+        """
+        logging.info("Route request", extra={"tenant_id": tenant_id, "model_name": model_name})
+        policy = self.routing_engine.get_tenant_policy(tenant_id, model_name)
+        deadline = deadline_registry.start(policy, timeout)
+
+        cache_settings = response_cache.get_settings(policy)
+        cacheable = cache_settings.enabled and is_cacheable(payload)
+        coalescing = request_coalescer.get_settings(policy)
+        coalescable = coalescing.enabled and not payload.get("stream") and (is_cacheable(payload) or not coalescing.deterministic_only)
+        if not cacheable and not coalescable:
+            return await self.dispatch_request(tenant_id, model_name, payload, policy, deadline)
+
+        cache_key = build_cache_key(tenant_id, model_name, payload)
+        if cacheable:
+            cached_response = await response_cache.get(cache_key, cache_settings.ttl_seconds)
+            if cached_response is not None:
+                return cached_response
+
+        async def fetch() -> dict:
+            response = await self.dispatch_request(tenant_id, model_name, payload, policy, deadline)
+            if cacheable:
+                await response_cache.set(cache_key, response, cache_settings.ttl_seconds)
+            return response
+
+        if coalescable:
+            try:
+                return await request_coalescer.run(tenant_id, cache_key, fetch, deadline.remaining())
+            except TimeoutError:
+                # a caller that joined a longer-running flight gave up at its own deadline
+                raise_failure(tenant_id, model_name, deadline, TimeoutError("still waiting on a coalesced identical request"))
+        return await fetch()
+
+    async def dispatch_request(self, tenant_id: str, model_name: str, payload: dict, policy: Mapping[str, Any], deadline: Deadline) -> dict:
+        """
+        Send the request upstream: primary provider first, then the failover order (or hedged when enabled).
+        Transient errors and 429s are retried on the same provider first (see RetrySettings); a request the
+        upstream rejected as invalid is returned to the client rather than failed over.
+        Each attempt gets a share of what is left of the deadline; once it has passed no further provider is tried.
+        """
+        prompt_tokens = await self.get_prompt_tokens(model_name, payload)
+        providers_to_try = self.get_providers_to_try(tenant_id, model_name, payload, prompt_tokens)
+        candidates = [(provider_name, provider_info) for provider_name in providers_to_try if (provider_info := self.get_provider_info(model_name, provider_name))]
+
+        hedging = hedging_registry.get_settings(policy)
+        if hedging.enabled and len(candidates) > 1:
+            return await self.route_hedged_request(tenant_id, model_name, payload, policy, candidates, hedging, prompt_tokens, deadline)
+
+        retry = retry_registry.get_settings(policy)
+        last_exception: Optional[Exception] = None
+        for index, (provider_name, provider_info) in enumerate(candidates):
+            if deadline.expired:
+                break
+            try:
+                response = await retry_registry.run(provider_name, retry, deadline, len(candidates) - index, partial(self.attempt_request, provider_name, provider_info, model_name, payload, policy))
+            except Exception as e:
+                if is_request_error(e):
+                    raise to_http_exception(e) from e
+                last_exception = e
+                continue
+            record_token_usage(tenant_id, provider_name, model_name, response, prompt_tokens)
+            return response
+
+        raise_failure(tenant_id, model_name, deadline, last_exception)
+
+    async def attempt_request(self, provider_name: str, provider_info: Mapping[str, Any], model_name: str, payload: dict, policy: Mapping[str, Any], timeouts: PhaseTimeouts) -> dict:
+        """
+        One upstream call, bounded by `timeouts.total` from the moment it queues for a concurrency slot.
+        """
+        with track_attempt(provider_name):
+            breaker = circuit_breakers.get(provider_name, policy)
+            if not circuit_breakers.allow_request(breaker):
+                raise CircuitOpenError(provider_name)
+            slot = breaker.half_open_slot()
+            adapter = get_provider_adapter(provider_name, provider_info)
+            expires_at = time.monotonic() + timeouts.total
+            # a half-open slot is returned unless breaker.track() was entered to record the call's outcome:
+            # the attempt may be shed or cancelled (lost hedge, disconnect, deadline) while queued for concurrency
+            tracked = False
+            try:
+                async with concurrency_limiters.limit(provider_name, timeouts.total):
+                    tracked = True
+                    with telemetry_store.track(provider_name, model_name), breaker.track(slot):
+                        async with phase_timeout("total", max(0.0, expires_at - time.monotonic())):
+                            return await adapter.send_request(model_name, payload, timeouts)
+            except asyncio.CancelledError:
+                upstream_attempts_cancelled_total.labels(provider_name).inc()
+                raise
+            except Exception as e:
+                if (phase := get_timeout_phase(e)) is not None:
+                    upstream_timeouts_total.labels(provider_name, phase).inc()
+                raise
+            finally:
+                if not tracked:
+                    breaker.release(slot)
+
+    async def route_hedged_request(self, tenant_id: str, model_name: str, payload: dict, policy: Mapping[str, Any], candidates: List[Tuple[str, Mapping[str, Any]]], hedging: HedgingSettings, prompt_tokens: int, deadline: Deadline) -> dict:
+        """
+        Start the primary and, if it has not answered within the hedge delay, race the next provider
+        of the failover order against it. The first success wins and the other attempts are cancelled.
+        A failed attempt with nothing else pending fails over immediately, as in route_request.
+        Hedges are drawn from the tenant's hedge budget. Attempts run concurrently, so each may use all of the remaining deadline.
+        Each attempt retries transient errors on its own provider, as in dispatch_request.
+        """
+        budget = hedging_registry.get_budget(tenant_id, hedging)
+        budget.deposit(hedging)
+        retry = retry_registry.get_settings(policy)
+        remaining = deque(candidates)
+        primary_name = remaining[0][0]
+        delay = get_hedge_delay(hedging, telemetry_store.get_percentile(primary_name, model_name, hedging.delay_percentile))
+        attempts: Dict[asyncio.Task, str] = {}
+        hedge_attempts: Set[asyncio.Task] = set()
+        hedges = 0
+        last_exception: Optional[BaseException] = None
+
+        def launch() -> asyncio.Task:
+            provider_name, provider_info = remaining.popleft()
+            task = asyncio.create_task(retry_registry.run(provider_name, retry, deadline, 1, partial(self.attempt_request, provider_name, provider_info, model_name, payload, policy)))
+            attempts[task] = provider_name
+            return task
+
+        launch()
+        try:
+            while attempts:
+                can_hedge = hedges < hedging.max_hedges and bool(remaining) and not deadline.expired
+                done, _ = await asyncio.wait(attempts, timeout=delay if can_hedge else None, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if budget.withdraw():
+                        hedges += 1
+                        hedge_requests_total.labels(tenant_id, remaining[0][0]).inc()
+                        hedge_attempts.add(launch())
+                    else:
+                        hedge_budget_exhausted_total.labels(tenant_id).inc()
+                        hedges = hedging.max_hedges
+                    continue
+                for task in done:
+                    provider_name = attempts.pop(task)
+                    if task.exception() is None:
+                        if task in hedge_attempts:
+                            hedge_wins_total.labels(tenant_id, provider_name).inc()
+                        record_token_usage(tenant_id, provider_name, model_name, task.result(), prompt_tokens)
+                        return task.result()
+                    last_exception = task.exception()
+                    if is_request_error(last_exception):
+                        raise to_http_exception(last_exception) from last_exception
+                if not attempts and remaining and not deadline.expired:
+                    launch()
+        finally:
+            for task in attempts:
+                task.cancel()
+            if attempts:
+                await asyncio.gather(*attempts, return_exceptions=True)
+
+        raise_failure(tenant_id, model_name, deadline, last_exception)
+
+    async def route_stream_request(self, tenant_id: str, model_name: str, payload: dict, timeout: Optional[float] = None) -> AsyncGenerator[bytes, None]:
+        """
+        Open an upstream stream with failover and return it once its first chunk has arrived.
+        Failover is only possible up to that point: after the first byte is relayed the client is committed to that provider.
+        The deadline bounds the wait for the first chunk, split across attempts as in dispatch_request,
+        and errors before it are retried on the same provider as well.
+        """
+        logging.info("Route stream request", extra={"tenant_id": tenant_id, "model_name": model_name})
+        start = time.monotonic()
+        policy = self.routing_engine.get_tenant_policy(tenant_id, model_name)
+        deadline = deadline_registry.start(policy, timeout)
+        prompt_tokens = await self.get_prompt_tokens(model_name, payload)
+        providers_to_try = self.get_providers_to_try(tenant_id, model_name, payload, prompt_tokens)
+
+        retry = retry_registry.get_settings(policy)
+        last_exception: Optional[Exception] = None
+        for index, provider_name in enumerate(providers_to_try):
+            if deadline.expired:
+                break
             provider_info = self.get_provider_info(model_name, provider_name)
             if not provider_info:
                 continue
-            adapter = get_provider_adapter(provider_name, provider_info)
             try:
-                response = await adapter.send_request(model_name, payload)
-                return response
+                first_chunk, chunks = await retry_registry.run(provider_name, retry, deadline, len(providers_to_try) - index, partial(self.attempt_stream, provider_name, provider_info, model_name, payload, policy))
             except Exception as e:
+                if is_request_error(e):
+                    raise to_http_exception(e) from e
                 last_exception = e
+                continue
+            stream_ttft_seconds.labels(provider_name, model_name).observe(time.monotonic() - start)
+            record_ttft(time.monotonic() - start)
+            return self.relay_stream(tenant_id, provider_name, model_name, prompt_tokens, first_chunk, chunks)
 
-        raise HTTPException(status_code=502, detail=f"All providers failed: {str(last_exception)}")
+        raise_failure(tenant_id, model_name, deadline, last_exception)
+
+    async def attempt_stream(self, provider_name: str, provider_info: Mapping[str, Any], model_name: str, payload: dict, policy: Mapping[str, Any], timeouts: PhaseTimeouts) -> Tuple[bytes, AsyncGenerator[bytes, None]]:
+        """
+        Open one upstream stream and wait for its first chunk, bounded by `timeouts.total`.
+        The stream is closed if the attempt fails; otherwise the caller owns it.
+        """
+        with track_attempt(provider_name):
+            breaker = circuit_breakers.get(provider_name, policy)
+            if not circuit_breakers.allow_request(breaker):
+                raise CircuitOpenError(provider_name)
+            slot = breaker.half_open_slot()
+            adapter = get_provider_adapter(provider_name, provider_info)
+            chunks = adapter.stream_request(model_name, payload, timeouts)
+            try:
+                # a stream attempt is measured up to its first chunk, the part failover can still act on
+                with telemetry_store.track(provider_name, model_name), breaker.track(slot):
+                    async with phase_timeout("total", timeouts.total):
+                        return await anext(chunks, b""), chunks
+            except asyncio.CancelledError:
+                upstream_attempts_cancelled_total.labels(provider_name).inc()
+                await chunks.aclose()
+                raise
+            except Exception as e:
+                if (phase := get_timeout_phase(e)) is not None:
+                    upstream_timeouts_total.labels(provider_name, phase).inc()
+                await chunks.aclose()
+                raise
+
+    @staticmethod
+    async def relay_stream(tenant_id: str, provider_name: str, model_name: str, prompt_tokens: int, first_chunk: bytes, chunks: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
+        """
+        Relay upstream chunks one at a time; each is only pulled once the previous one was sent, so a slow client backpressures the upstream read.
+        Tokens are counted as SSE data events (OpenAI-compatible upstreams send one delta per token).
+        A client disconnect cancels or closes this generator, which closes the upstream stream.
+        """
+        first_byte_at = time.monotonic()
+        tokens = 0
+        try:
+            if first_chunk:
+                tokens += count_stream_tokens(first_chunk)
+                yield first_chunk
+            async for chunk in chunks:
+                tokens += count_stream_tokens(chunk)
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            upstream_attempts_cancelled_total.labels(provider_name).inc()
+            requests_cancelled_total.labels(tenant_id, model_name, "client_disconnect").inc()
+            raise
+        finally:
+            await chunks.aclose()
+            elapsed = time.monotonic() - first_byte_at
+            stream_tokens_total.labels(provider_name, model_name).inc(tokens)
+            prompt_tokens_total.labels(tenant_id, provider_name, model_name, "estimate").inc(prompt_tokens)
+            completion_tokens_total.labels(tenant_id, provider_name, model_name, "estimate").inc(tokens)
+            record_usage(provider_name, prompt_tokens, tokens, "estimate")
+            if tokens and elapsed > 0:
+                stream_tokens_per_second.labels(provider_name, model_name).observe(tokens / elapsed)
+
+
+def raise_failure(tenant_id: str, model_name: str, deadline: Deadline, last_exception: Optional[BaseException]) -> NoReturn:
+    """
+    504 when the deadline ran out before any provider answered, 429 when the last provider tried was
+    rate limiting, 502 when every provider failed in time.
+    """
+    if deadline.expired:
+        requests_cancelled_total.labels(tenant_id, model_name, "deadline").inc()
+        raise HTTPException(status_code=504, detail=f"Deadline of {deadline.timeout:g}s exceeded: {str(last_exception)}")
+    raise to_http_exception(last_exception)
+
+
+async def probe_provider(provider_name: str) -> bool:
+    """
+    Background circuit breaker probe: reachability check against any catalog entry of the provider.
+    """
+    for (_, candidate_name), provider_info in get_model_router().routing_index.provider_info.items():
+        if candidate_name == provider_name:
+            return await get_provider_adapter(provider_name, provider_info).probe()
+    return False
+
+
+def record_token_usage(tenant_id: str, provider_name: str, model_name: str, response: Mapping[str, Any], prompt_tokens: int) -> None:
+    """
+    Count a completion's tokens for billing: the provider's `usage` when it reports one, otherwise estimated.
+    """
+    usage = response.get("usage")
+    if isinstance(usage, dict) and "prompt_tokens" in usage:
+        prompt_tokens_total.labels(tenant_id, provider_name, model_name, "usage").inc(usage.get("prompt_tokens") or 0)
+        completion_tokens_total.labels(tenant_id, provider_name, model_name, "usage").inc(usage.get("completion_tokens") or 0)
+        record_usage(provider_name, usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0, "usage")
+        return
+    counter = get_token_counter(None)
+    completion_tokens = sum(counter.count_text(content) for choice in response.get("choices") or () if isinstance(content := (choice.get("message") or {}).get("content"), str))
+    prompt_tokens_total.labels(tenant_id, provider_name, model_name, "estimate").inc(prompt_tokens)
+    completion_tokens_total.labels(tenant_id, provider_name, model_name, "estimate").inc(completion_tokens)
+    record_usage(provider_name, prompt_tokens, completion_tokens, "estimate")
+
+
+def count_stream_tokens(chunk: bytes) -> int:
+    return max(chunk.count(b"data:") - chunk.count(b"[DONE]"), 0)
 
 
 # --------------------------
@@ -162,3 +498,8 @@ def get_model_router():
     if not model_router:
         model_router = ModelRouter()
     return model_router
+
+
+def replace_model_router(router: ModelRouter) -> None:
+    global model_router
+    model_router = router
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+GLOBAL_POLICY_KEY = "global"
+EMPTY_POLICY: Mapping[str, Any] = MappingProxyType({})
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively turn parsed YAML into read-only mappings and tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class RoutingIndex:
+    """
+    Immutable routing table compiled once from models_catalog and routing_policies.
+    Every hot-path lookup is a single dict access instead of a catalog scan.
+    """
+
+    model_series: Mapping[str, str]
+    model_providers: Mapping[str, Tuple[str, ...]]
+    provider_info: Mapping[Tuple[str, str], Mapping[str, Any]]
+    tenant_policies: Mapping[Tuple[str, str], Mapping[str, Any]]
+    series_policies: Mapping[str, Mapping[str, Any]]
+
+    @classmethod
+    def build(cls, models_catalog: Dict[str, Any], routing_policies: Dict[str, Any]) -> "RoutingIndex":
+        models_catalog = models_catalog or {}
+        routing_policies = routing_policies or {}
+
+        model_series: Dict[str, str] = {}
+        model_providers: Dict[str, Tuple[str, ...]] = {}
+        provider_info: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+        for series_name, series_info in models_catalog.items():
+            if not isinstance(series_info, dict) or "models" not in series_info:
+                continue  # not a series (e.g. http_clients, concurrency)
+            for model in series_info.get("models") or []:
+                model_name = model.get("name")
+                # first definition wins, matching the former linear scans
+                if model_name in model_series:
+                    continue
+                model_series[model_name] = series_name
+                providers = model.get("providers") or []
+                model_providers[model_name] = tuple(provider["name"] for provider in providers)
+                for provider in providers:
+                    provider_info.setdefault((model_name, provider["name"]), freeze(provider))
+
+        series_names = set(model_series.values())
+        global_policy = freeze(routing_policies.get(GLOBAL_POLICY_KEY, {}))
+        series_policies = {series_name: freeze(routing_policies[series_name]) if series_name in routing_policies else global_policy for series_name in series_names}
+
+        tenant_policies: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+        for tenant_id, tenant_policy in routing_policies.items():
+            if tenant_id == GLOBAL_POLICY_KEY or tenant_id in series_names or not isinstance(tenant_policy, dict):
+                continue
+            for series_name in series_names:
+                if series_name in tenant_policy:
+                    tenant_policies[(tenant_id, series_name)] = freeze(tenant_policy[series_name])
+
+        return cls(
+            model_series=MappingProxyType(model_series),
+            model_providers=MappingProxyType(model_providers),
+            provider_info=MappingProxyType(provider_info),
+            tenant_policies=MappingProxyType(tenant_policies),
+            series_policies=MappingProxyType(series_policies),
+        )
+
+    def get_series(self, model_name: str) -> Optional[str]:
+        return self.model_series.get(model_name)
+
+    def get_providers(self, model_name: str) -> Tuple[str, ...]:
+        return self.model_providers.get(model_name, ())
+
+    def get_provider_info(self, model_name: str, provider_name: str) -> Optional[Mapping[str, Any]]:
+        return self.provider_info.get((model_name, provider_name))
+
+    def get_policy(self, tenant_id: str, model_name: str) -> Mapping[str, Any]:
+        """
+        Resolved routing policy for a tenant+model series:
+          1. Tenant-specific policy for that series
+          2. Global/shared policy for that series
+          3. Global default policy
+        """
+        series_name = self.model_series.get(model_name)
+        if series_name is None:
+            return EMPTY_POLICY  # unknown model
+        policy = self.tenant_policies.get((tenant_id, series_name))
+        if policy is None:
+            policy = self.series_policies[series_name]
+        return policy
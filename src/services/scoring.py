@@ -0,0 +1,209 @@
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from src.helpers.utilities.custom.tokens import get_max_completion_tokens
+from src.services.policy_settings import PolicySettingsCache, settings_from_config
+
+# content part types of OpenAI-style chat messages, by modality
+PART_MODALITIES = {"text": "text", "image_url": "image", "image": "image", "input_audio": "audio", "audio": "audio", "file": "file", "input_file": "file"}
+DEFAULT_COMPLETION_TOKENS = 256
+# prices in models_catalog are per 1K tokens for text and per item for other modalities
+TOKENS_PER_PRICE_UNIT = 1000
+
+
+def get_request_modalities(payload: Mapping[str, Any]) -> Dict[str, int]:
+    """
+    Input modalities of a request with their item counts; text is always present.
+    """
+    modalities: Dict[str, int] = Counter({"text": 1})
+    for message in payload.get("messages") or ():
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            modality = PART_MODALITIES.get(part.get("type", "")) if isinstance(part, dict) else None
+            if modality and modality != "text":
+                modalities[modality] += 1
+    return modalities
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    """
+    What a provider must accommodate to serve a request.
+    """
+
+    prompt_tokens: int
+    completion_tokens: int
+    required_tokens: int
+    modalities: Mapping[str, int]
+
+
+def build_request_profile(payload: Mapping[str, Any], prompt_tokens: int) -> RequestProfile:
+    """
+    `required_tokens` counts the requested max_tokens against the context window; the cost estimate
+    assumes DEFAULT_COMPLETION_TOKENS when the request sets none.
+    """
+    max_completion_tokens = get_max_completion_tokens(payload)
+    return RequestProfile(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=max_completion_tokens or DEFAULT_COMPLETION_TOKENS,
+        required_tokens=prompt_tokens + max_completion_tokens if prompt_tokens else 0,
+        modalities=get_request_modalities(payload),
+    )
+
+
+def supports_modalities(provider_info: Mapping[str, Any], modalities: Mapping[str, int]) -> bool:
+    supported = provider_info.get("modalities")
+    return not supported or all(modality in supported for modality in modalities)
+
+
+def estimate_request_cost(provider_info: Mapping[str, Any], prompt_tokens: int, completion_tokens: int, modalities: Mapping[str, int]) -> float:
+    """
+    Expected price of the request on a provider: prompt and completion tokens at the text prices
+    (`completion_pricing` falls back to `prompt_pricing`), plus each non-text input at its modality price.
+    """
+    prompt_pricing = provider_info.get("prompt_pricing") or {}
+    completion_pricing = provider_info.get("completion_pricing") or prompt_pricing
+    cost = prompt_tokens / TOKENS_PER_PRICE_UNIT * prompt_pricing.get("text", 0.0)
+    cost += completion_tokens / TOKENS_PER_PRICE_UNIT * completion_pricing.get("text", 0.0)
+    for modality, count in modalities.items():
+        if modality != "text":
+            cost += count * prompt_pricing.get(modality, 0.0)
+    return cost
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    cost: float = 1.0
+    latency: float = 1.0
+    error_rate: float = 1.0
+    load: float = 0.5
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+# `cost_priority: false` without explicit weights: cost only breaks near-ties
+LATENCY_FIRST_WEIGHTS = ScoringWeights(cost=0.1)
+
+
+@dataclass(frozen=True)
+class ScoringSettings:
+    """
+    Read from `routing_criteria.scoring` of a routing policy: the scoring `strategy`, the `selection`
+    among scored providers (best, weighted or least_loaded) and the metric `weights`.
+    Without explicit weights, `routing_criteria.cost_priority` chooses between cost-aware and latency-first defaults.
+    """
+
+    strategy: str = "weighted_sum"
+    selection: str = "best"
+    weights: ScoringWeights = field(default=DEFAULT_WEIGHTS)
+
+    @classmethod
+    def from_criteria(cls, routing_criteria: Mapping[str, Any]) -> "ScoringSettings":
+        config = routing_criteria.get("scoring") or {}
+        weights = DEFAULT_WEIGHTS if routing_criteria.get("cost_priority", True) else LATENCY_FIRST_WEIGHTS
+        if config.get("weights"):
+            weights = settings_from_config(ScoringWeights, {**vars(weights), **config["weights"]})
+        return cls(strategy=config.get("strategy", cls.strategy), selection=config.get("selection", cls.selection), weights=weights)
+
+
+DEFAULT_SCORING = ScoringSettings()
+
+
+@dataclass(slots=True)
+class ProviderCandidate:
+    """
+    One provider able to serve the request. `rank` orders hard tiers before the score
+    (e.g. open circuit, unhealthy, over the latency threshold); lower is better everywhere.
+    """
+
+    name: str
+    rank: Tuple[bool, ...]
+    cost: float
+    latency_ms: float
+    error_rate: float
+    load: float
+    score: float = 0.0
+
+
+# --------------------------
+# Scoring Strategies
+# --------------------------
+class ScoringStrategy:
+    """
+    Sets `score` on every candidate. Must be overridden by subclasses.
+    """
+
+    def score(self, candidates: Sequence[ProviderCandidate], weights: ScoringWeights) -> None:
+        raise NotImplementedError("score must be implemented in subclass")
+
+
+class WeightedSumStrategy(ScoringStrategy):
+    """
+    Weighted sum of each metric divided by its maximum over the candidates, so weights are unitless
+    and dollars, milliseconds and rates are comparable. Builtin max() passes for the maxima, then one scoring pass.
+    """
+
+    def score(self, candidates: Sequence[ProviderCandidate], weights: ScoringWeights) -> None:
+        max_cost = max((candidate.cost for candidate in candidates), default=0.0)
+        max_latency = max((candidate.latency_ms for candidate in candidates), default=0.0)
+        max_error_rate = max((candidate.error_rate for candidate in candidates), default=0.0)
+        max_load = max((candidate.load for candidate in candidates), default=0.0)
+        cost_factor = weights.cost / max_cost if max_cost else 0.0
+        latency_factor = weights.latency / max_latency if max_latency else 0.0
+        error_rate_factor = weights.error_rate / max_error_rate if max_error_rate else 0.0
+        load_factor = weights.load / max_load if max_load else 0.0
+        for candidate in candidates:
+            candidate.score = candidate.cost * cost_factor + candidate.latency_ms * latency_factor + candidate.error_rate * error_rate_factor + candidate.load * load_factor
+
+
+scoring_strategies: Dict[str, ScoringStrategy] = {"weighted_sum": WeightedSumStrategy()}
+
+
+# --------------------------
+# Selection Strategies
+# --------------------------
+def select_best(candidates: Sequence[ProviderCandidate]) -> ProviderCandidate:
+    return min(candidates, key=lambda candidate: (candidate.rank, candidate.score, candidate.name))
+
+
+def select_weighted(candidates: Sequence[ProviderCandidate]) -> ProviderCandidate:
+    """
+    Random pick within the best tier, with probability inversely proportional to the score,
+    so traffic spreads across comparable providers instead of piling onto a single winner.
+    """
+    best_rank = min(candidate.rank for candidate in candidates)
+    tier = [candidate for candidate in candidates if candidate.rank == best_rank]
+    return random.choices(tier, weights=[1.0 / (candidate.score + 0.05) for candidate in tier])[0]
+
+
+def select_least_loaded(candidates: Sequence[ProviderCandidate]) -> ProviderCandidate:
+    return min(candidates, key=lambda candidate: (candidate.rank, candidate.load, candidate.score, candidate.name))
+
+
+selection_strategies: Dict[str, Callable[[Sequence[ProviderCandidate]], ProviderCandidate]] = {"best": select_best, "weighted": select_weighted, "least_loaded": select_least_loaded}
+
+
+# --------------------------
+# Scoring Engine
+# --------------------------
+class ScoringEngine:
+    def __init__(self) -> None:
+        self.settings_cache = PolicySettingsCache(DEFAULT_SCORING, ScoringSettings.from_criteria)
+
+    def get_settings(self, policy: Mapping[str, Any]) -> ScoringSettings:
+        return self.settings_cache.get(policy.get("routing_criteria"))
+
+    def select(self, candidates: List[ProviderCandidate], settings: ScoringSettings) -> Optional[str]:
+        if not candidates:
+            return None
+        scoring_strategies.get(settings.strategy, scoring_strategies["weighted_sum"]).score(candidates, settings.weights)
+        return selection_strategies.get(settings.selection, select_best)(candidates).name
+
+
+# --------------------------
+# Scoring Engine Singleton
+# --------------------------
+scoring_engine = ScoringEngine()
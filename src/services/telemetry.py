@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 128
+MIN_SAMPLES_FOR_HEALTH = 5
+DEFAULT_MAX_ERROR_RATE = 0.5
+# the error rate halves every this many seconds without new attempts, so a provider ranked out of selection
+# for being unhealthy is eventually tried again instead of staying unhealthy forever
+ERROR_RATE_HALF_LIFE_SECONDS = 30.0
+
+
+# --------------------------
+# Provider Stats
+# --------------------------
+class ProviderStats:
+    """
+    Rolling latency and error statistics of one (provider, model) pair. The error rate is an EWMA per
+    attempt that also decays with time (ERROR_RATE_HALF_LIFE_SECONDS). Only touched from the event loop thread, so plain attribute updates need no locking.
+    """
+
+    __slots__ = ("ewma_latency_ms", "error_rate", "error_rate_updated_at", "in_flight", "requests", "errors", "latencies", "sorted_latencies")
+
+    def __init__(self) -> None:
+        self.ewma_latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.error_rate_updated_at = time.monotonic()
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.sorted_latencies: Optional[List[float]] = None
+
+    def record(self, latency_ms: float, success: bool) -> None:
+        self.requests += 1
+        now = time.monotonic()
+        error_rate = self.get_error_rate(now)
+        self.error_rate = error_rate + EWMA_ALPHA * ((0.0 if success else 1.0) - error_rate)
+        self.error_rate_updated_at = now
+        if not success:
+            self.errors += 1
+            return  # failed attempts would skew latency towards timeouts or instant rejections
+        self.ewma_latency_ms = latency_ms if self.ewma_latency_ms is None else self.ewma_latency_ms + EWMA_ALPHA * (latency_ms - self.ewma_latency_ms)
+        self.latencies.append(latency_ms)
+        self.sorted_latencies = None
+
+    def get_error_rate(self, now: Optional[float] = None) -> float:
+        elapsed = (now if now is not None else time.monotonic()) - self.error_rate_updated_at
+        return self.error_rate * 0.5 ** (elapsed / ERROR_RATE_HALF_LIFE_SECONDS) if elapsed > 0 else self.error_rate
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Latency percentile (0-100) over the last LATENCY_WINDOW successful calls, sorted lazily once per change.
+        """
+        if not self.latencies:
+            return None
+        if self.sorted_latencies is None:
+            self.sorted_latencies = sorted(self.latencies)
+        index = min(len(self.sorted_latencies) - 1, int(q / 100 * len(self.sorted_latencies)))
+        return self.sorted_latencies[index]
+
+
+# --------------------------
+# Telemetry Store
+# --------------------------
+class TelemetryStore:
+    def __init__(self) -> None:
+        self.stats: Dict[Tuple[str, str], ProviderStats] = {}
+
+    def get_stats(self, provider_name: str, model_name: str) -> ProviderStats:
+        stats = self.stats.get((provider_name, model_name))
+        if stats is None:
+            stats = self.stats[(provider_name, model_name)] = ProviderStats()
+        return stats
+
+    @contextmanager
+    def track(self, provider_name: str, model_name: str) -> Iterator[ProviderStats]:
+        """
+        Count an upstream call as in flight and record its latency and outcome when it ends.
+        Cancellation (e.g. a client disconnect) is not held against the provider.
+        """
+        stats = self.get_stats(provider_name, model_name)
+        stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            yield stats
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.record((time.monotonic() - start) * 1000, success=False)
+            raise
+        else:
+            stats.record((time.monotonic() - start) * 1000, success=True)
+        finally:
+            stats.in_flight -= 1
+
+    def get_latency(self, provider_name: str, model_name: str) -> float:
+        """
+        EWMA latency in ms; 0 for providers without samples, so they get explored.
+        """
+        stats = self.stats.get((provider_name, model_name))
+        if stats is None or stats.ewma_latency_ms is None:
+            return 0.0
+        return stats.ewma_latency_ms
+
+    def get_percentile(self, provider_name: str, model_name: str, q: float) -> Optional[float]:
+        stats = self.stats.get((provider_name, model_name))
+        return stats.percentile(q) if stats else None
+
+    def get_error_rate(self, provider_name: str, model_name: str) -> float:
+        stats = self.stats.get((provider_name, model_name))
+        return stats.get_error_rate() if stats else 0.0
+
+    def get_in_flight(self, provider_name: str, model_name: str) -> int:
+        stats = self.stats.get((provider_name, model_name))
+        return stats.in_flight if stats else 0
+
+    def is_healthy(self, provider_name: str, model_name: str, max_error_rate: float = DEFAULT_MAX_ERROR_RATE) -> bool:
+        stats = self.stats.get((provider_name, model_name))
+        if stats is None or stats.requests < MIN_SAMPLES_FOR_HEALTH:
+            return True
+        return stats.get_error_rate() <= max_error_rate
+
+
+class TelemetryCollector(Collector):
+    """
+    Reports the telemetry store on every /metrics scrape.
+    """
+
+    def __init__(self, store: TelemetryStore) -> None:
+        self.store = store
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        labels = ["provider", "model"]
+        ewma = GaugeMetricFamily("upstream_latency_ewma_ms", "EWMA upstream latency", labels=labels)
+        p95 = GaugeMetricFamily("upstream_latency_p95_ms", "p95 upstream latency over the recent window", labels=labels)
+        error_rate = GaugeMetricFamily("upstream_error_rate", "EWMA upstream error rate, decaying while a provider gets no attempts", labels=labels)
+        in_flight = GaugeMetricFamily("upstream_model_requests_in_flight", "Upstream calls in flight", labels=labels)
+        for (provider_name, model_name), stats in list(self.store.stats.items()):
+            ewma.add_metric([provider_name, model_name], stats.ewma_latency_ms or 0.0)
+            p95.add_metric([provider_name, model_name], stats.percentile(95) or 0.0)
+            error_rate.add_metric([provider_name, model_name], stats.get_error_rate())
+            in_flight.add_metric([provider_name, model_name], stats.in_flight)
+        yield ewma
+        yield p95
+        yield error_rate
+        yield in_flight
+
+
+# --------------------------
+# Telemetry Store Singleton
+# --------------------------
+telemetry_store = TelemetryStore()
+REGISTRY.register(TelemetryCollector(telemetry_store))